@@ -14,18 +14,34 @@
 #    under the License.
 
 import abc
+import time
 
 import jsonschema
+from oslo_config import cfg
 import six
 
+from rally.common import broker
 from rally.common import log as logging
 from rally.common import utils
 from rally import exceptions
 
 LOG = logging.getLogger(__name__)
 
+CONTEXT_OPTS = [
+    cfg.BoolOpt("parallel_context_setup", default=True,
+                help="Set up and clean up contexts which do not depend on "
+                     "each other concurrently"),
+    cfg.IntOpt("context_workers", default=20,
+               help="Number of threads used by a context to prepare "
+                    "resources of different tenants concurrently")
+]
 
-def context(name, order, hidden=False):
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark", title="benchmark options")
+CONF.register_opts(CONTEXT_OPTS, group=benchmark_group)
+
+
+def context(name, order, hidden=False, depends_on=None):
     """Context class wrapper.
 
     Each context class has to be wrapped by context() wrapper. It
@@ -38,11 +54,17 @@ def context(name, order, hidden=False):
                   Contexts with smaller order are run first
     :param hidden: If it is true you won't be able to specify context via
                    task config
+    :param depends_on: Names of contexts that have to be set up before this
+                       one, if they are used in the task. Only contexts with
+                       smaller order are taken into account. None means that
+                       the context depends on all contexts with smaller order
     """
     def wrapper(cls):
         cls._ctx_name = name
         cls._ctx_order = order
         cls._ctx_hidden = hidden
+        cls._ctx_depends_on = (None if depends_on is None
+                               else frozenset(depends_on))
         return cls
 
     return wrapper
@@ -96,6 +118,10 @@ class Context(object):
     def get_order(cls):
         return cls._ctx_order
 
+    @classmethod
+    def get_dependencies(cls):
+        return cls._ctx_depends_on
+
     @staticmethod
     def get_by_name(name):
         """Return Context class by name."""
@@ -125,6 +151,7 @@ class ContextManager(object):
     def __init__(self, context_obj):
         self._visited = []
         self.context_obj = context_obj
+        self.durations = {}
 
     @staticmethod
     def validate(context, non_hidden=False):
@@ -135,27 +162,82 @@ class ContextManager(object):
         ctxlst = map(Context.get_by_name, self.context_obj["config"])
         return sorted(map(lambda ctx: ctx(self.context_obj), ctxlst))
 
+    @staticmethod
+    def _get_dependencies(ctxlst):
+        """Return indexes of contexts each of the sorted contexts depends on.
+
+        :param ctxlst: list of contexts sorted by order
+        """
+        dependencies = []
+        for i, ctx in enumerate(ctxlst):
+            depends_on = ctx.get_dependencies()
+            dependencies.append(set(
+                j for j in range(i) if ctxlst[j] < ctx and
+                (depends_on is None or ctxlst[j].get_name() in depends_on)))
+        return dependencies
+
+    def _run_context_method(self, ctx, method):
+        """Call setup or cleanup of the context and save its duration."""
+        start = time.time()
+        try:
+            getattr(ctx, method)()
+        finally:
+            self.durations.setdefault(ctx.get_name(), {})[method] = (
+                time.time() - start)
+
     def setup(self):
-        """Creates benchmark environment from config."""
+        """Creates benchmark environment from config.
+
+        Contexts, that do not depend on each other, are set up concurrently
+        if it is enabled in config. On failure no more contexts are
+        started and the first error is re-raised.
+        """
 
         self._visited = []
-        for ctx in self._get_sorted_context_lst():
+        ctxlst = self._get_sorted_context_lst()
+        if not CONF.benchmark.parallel_context_setup:
+            for ctx in ctxlst:
+                self._visited.append(ctx)
+                self._run_context_method(ctx, "setup")
+            return self.context_obj
+
+        def run(ctx):
             self._visited.append(ctx)
-            ctx.setup()
+            self._run_context_method(ctx, "setup")
 
+        errors = broker.run_graph(run, ctxlst,
+                                  self._get_dependencies(ctxlst),
+                                  stop_on_error=True)
+        if errors:
+            six.reraise(*errors[0])
         return self.context_obj
 
     def cleanup(self):
-        """Destroys benchmark environment."""
+        """Destroys benchmark environment.
+
+        Each context is cleaned up after all the contexts that depend on it.
+        """
 
-        ctxlst = self._visited or self._get_sorted_context_lst()
-        for ctx in ctxlst[::-1]:
+        ctxlst = sorted(self._visited) or self._get_sorted_context_lst()
+
+        def run(ctx):
             try:
-                ctx.cleanup()
+                self._run_context_method(ctx, "cleanup")
             except Exception as e:
                 LOG.error("Context %s failed during cleanup." % ctx.get_name())
                 LOG.exception(e)
 
+        if not CONF.benchmark.parallel_context_setup:
+            for ctx in ctxlst[::-1]:
+                run(ctx)
+            return
+
+        dependents = [set() for ctx in ctxlst]
+        for i, dependencies in enumerate(self._get_dependencies(ctxlst)):
+            for j in dependencies:
+                dependents[j].add(i)
+        broker.run_graph(run, ctxlst, dependents)
+
     def __enter__(self):
         try:
             self.setup()
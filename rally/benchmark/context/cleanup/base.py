@@ -18,7 +18,8 @@ from rally.benchmark import utils
 
 def resource(service, resource, order=0, admin_required=False,
              perform_for_admin_only=False, tenant_resource=False,
-             max_attempts=3, timeout=600, interval=1, threads=20):
+             max_attempts=3, timeout=600, interval=1, threads=20,
+             depends_on=None):
     """Decorator that overrides resource specification.
 
     Just put it on top of your resource class and specify arguments that you
@@ -38,6 +39,9 @@ def resource(service, resource, order=0, admin_required=False,
     :param interval: Resource status pooling interval
     :param threads: Amount of threads (workers) that are deleting resources
                     simultaneously
+    :param depends_on: Names of services, which resources have to be
+                       deleted before resources of this service. None
+                       means all the services with lower order
     """
 
     def inner(cls):
@@ -52,6 +56,7 @@ def resource(service, resource, order=0, admin_required=False,
         cls._interval = interval
         cls._threads = threads
         cls._tenant_resource = tenant_resource
+        cls._depends_on = depends_on
 
         return cls
 
@@ -67,8 +72,13 @@ class ResourceManager(object):
 
     If project python client is very specific, you can override delete(),
     list() and is_deleted() methods to make them fit to your case.
+
+    Set _synchronized_deletion to True, if resources are deleted by the
+    time delete() returns, so deletion doesn't have to be confirmed.
     """
 
+    _synchronized_deletion = False
+
     def __init__(self, resource=None, admin=None, user=None, tenant_uuid=None):
         self.admin = admin
         self.user = user
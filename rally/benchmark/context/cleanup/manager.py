@@ -13,18 +13,43 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import itertools
 import time
 
+from oslo_config import cfg
+
 from rally.benchmark.context.cleanup import base
+from rally.benchmark import utils
 from rally.common import broker
+from rally.common import costilius
 from rally.common.i18n import _
 from rally.common import log as logging
 from rally.common import utils as rutils
+from rally import exceptions
 from rally import osclients
 
 
 LOG = logging.getLogger(__name__)
 
+CLEANUP_OPTS = [
+    cfg.StrOpt("cleanup_mode", default="single",
+               choices=["single", "bulk"],
+               help="How resources are cleaned up: 'single' deletes "
+                    "resources one by one and polls each of them until it "
+                    "is deleted, 'bulk' lists resources of all tenants "
+                    "concurrently, deletes them and confirms the deletion "
+                    "by listing the resources of each tenant again"),
+    cfg.IntOpt("cleanup_workers", default=4,
+               help="Max number of services, which resources are cleaned "
+                    "up concurrently")
+]
+
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark", title="benchmark options")
+CONF.register_opts(CLEANUP_OPTS, group=benchmark_group)
+
+DELETED_STATUSES = ("DELETED", "DELETE_COMPLETE")
+
 
 class SeekAndDestroy(object):
 
@@ -58,6 +83,27 @@ class SeekAndDestroy(object):
 
         return cache[key]
 
+    @staticmethod
+    def _delete(resource):
+        """Send request to delete resource, retry it in case of failures.
+
+        :param resource: instance of resource manager initiated with resource
+                         that should be deleted.
+        :returns: True if the request succeeded
+        """
+        try:
+            rutils.retry(resource._max_attempts, resource.delete)
+        except Exception as e:
+            LOG.warning(
+                _("Resource deletion failed, max retries exceeded for "
+                  "%(service)s.%(resource)s: %(uuid)s. Reason: %(reason)s")
+                % {"uuid": resource.id(), "service": resource._service,
+                   "resource": resource._resource, "reason": e})
+            if logging.is_debug():
+                LOG.exception(e)
+            return False
+        return True
+
     def _delete_single_resource(self, resource):
         """Safe resource deletion with retries and timeouts.
 
@@ -76,17 +122,7 @@ class SeekAndDestroy(object):
             "resource": resource._resource
         }
 
-        try:
-            rutils.retry(resource._max_attempts, resource.delete)
-        except Exception as e:
-            msg_kw["reason"] = e
-            LOG.warning(
-                _("Resource deletion failed, max retries exceeded for "
-                  "%(service)s.%(resource)s: %(uuid)s. Reason: %(reason)s")
-                % msg_kw)
-            if logging.is_debug():
-                LOG.exception(e)
-        else:
+        if self._delete(resource):
             started = time.time()
             failures_count = 0
             while time.time() - started < resource._timeout:
@@ -113,6 +149,47 @@ class SeekAndDestroy(object):
                           "%(service)s.%(resource)s: %(uuid)s.")
                         % msg_kw)
 
+    def _iter_listers(self):
+        """Yield (user, manager) pairs that list resources to be deleted.
+
+        user is None for admin resources. In case of tenant based
+        resource, only one user per tenant is yielded.
+        """
+        if self.admin and (not self.users
+                           or self.manager_cls._perform_for_admin_only):
+            manager = self.manager_cls(
+                admin=self._get_cached_client(self.admin))
+            yield None, manager
+
+        else:
+            visited_tenants = set()
+            admin_client = self._get_cached_client(self.admin)
+            for user in self.users:
+                if (self.manager_cls._tenant_resource
+                   and user["tenant_id"] in visited_tenants):
+                    continue
+
+                visited_tenants.add(user["tenant_id"])
+                manager = self.manager_cls(
+                        admin=admin_client,
+                        user=self._get_cached_client(user),
+                        tenant_uuid=user["tenant_id"])
+
+                yield user, manager
+
+    @staticmethod
+    def _list(manager):
+        """Return resources listed by manager, empty list on failures."""
+        try:
+            return list(rutils.retry(3, manager.list))
+        except Exception as e:
+            LOG.warning(
+                _("Seems like %s.%s.list(self) method is broken. "
+                  "It shouldn't raise any exceptions.")
+                % (manager.__module__, type(manager).__name__))
+            LOG.exception(e)
+            return []
+
     def _gen_publisher(self):
         """Returns publisher for deletion jobs.
 
@@ -127,39 +204,9 @@ class SeekAndDestroy(object):
         """
 
         def publisher(queue):
-
-            def _publish(admin, user, manager):
-                try:
-                    for raw_resource in rutils.retry(3, manager.list):
-                        queue.append((admin, user, raw_resource))
-                except Exception as e:
-                    LOG.warning(
-                        _("Seems like %s.%s.list(self) method is broken. "
-                          "It shouldn't raise any exceptions.")
-                        % (manager.__module__, type(manager).__name__))
-                    LOG.exception(e)
-
-            if self.admin and (not self.users
-                               or self.manager_cls._perform_for_admin_only):
-                manager = self.manager_cls(
-                    admin=self._get_cached_client(self.admin))
-                _publish(self.admin, None, manager)
-
-            else:
-                visited_tenants = set()
-                admin_client = self._get_cached_client(self.admin)
-                for user in self.users:
-                    if (self.manager_cls._tenant_resource
-                       and user["tenant_id"] in visited_tenants):
-                        continue
-
-                    visited_tenants.add(user["tenant_id"])
-                    manager = self.manager_cls(
-                            admin=admin_client,
-                            user=self._get_cached_client(user),
-                            tenant_uuid=user["tenant_id"])
-
-                    _publish(self.admin, user, manager)
+            for user, manager in self._iter_listers():
+                for raw_resource in self._list(manager):
+                    queue.append((self.admin, user, raw_resource))
 
         return publisher
 
@@ -187,6 +234,168 @@ class SeekAndDestroy(object):
                    consumers_count=self.manager_cls._threads)
 
 
+class BulkSeekAndDestroy(object):
+
+    def __init__(self, manager_classes, admin, users):
+        """Bulk deletion of resources of several resource managers.
+
+        Resources of all the managers and tenants are listed and deleted
+        concurrently. Instead of polling every deleted resource, each
+        tenant's resources are listed again every _interval seconds, until
+        the deleted resources disappear or _timeout is exceeded.
+
+        :param manager_classes: subclasses of base.ResourceManager with the
+                                same _order
+        :param admin: admin endpoint like in context["admin"]
+        :param users: users endpoints like in context["users"]
+        """
+        self.manager_classes = manager_classes
+        self.destroyers = [SeekAndDestroy(manager_cls, admin, users)
+                           for manager_cls in manager_classes]
+        self.admin = admin
+        self.workers = max([cls._threads for cls in manager_classes] or [1])
+
+    def _list_all(self):
+        """List resources of all managers and tenants concurrently.
+
+        :returns: list of (destroyer, user, manager) and list of lists of
+                  raw resources listed by them
+        """
+        listers = [(destroyer, user, manager)
+                   for destroyer in self.destroyers
+                   for user, manager in destroyer._iter_listers()]
+        listings = broker.run_each(
+            lambda lister: lister[0]._list(lister[2]), listers, self.workers)
+        return listers, listings
+
+    def _delete_all(self, listers, listings):
+        """Send delete requests for all the listed resources.
+
+        :returns: list of sets of ids of deleted resources of each lister
+        """
+        deleted = [set() for lister in listers]
+
+        def publish(queue):
+            for i, raw_resources in enumerate(listings):
+                for raw_resource in raw_resources:
+                    queue.append((i, raw_resource))
+
+        def consume(cache, args):
+            i, raw_resource = args
+            destroyer, user, _manager = listers[i]
+            resource = destroyer.manager_cls(
+                resource=raw_resource,
+                admin=destroyer._get_cached_client(self.admin, cache=cache),
+                user=destroyer._get_cached_client(user, cache=cache),
+                tenant_uuid=user and user["tenant_id"])
+            if destroyer._delete(resource):
+                deleted[i].add(resource.id())
+
+        broker.run(publish, consume, self.workers)
+        return deleted
+
+    @staticmethod
+    def _list_ids(destroyer, manager):
+        """Return ids of resources of the manager that are not deleted.
+
+        :returns: set of ids, or None if resources can't be listed
+        """
+        try:
+            raw_resources = list(rutils.retry(3, manager.list))
+        except Exception as e:
+            LOG.warning(_("Failed to list %(service)s.%(resource)s to confirm "
+                          "deletion: %(error)s")
+                        % {"service": destroyer.manager_cls._service,
+                           "resource": destroyer.manager_cls._resource,
+                           "error": e})
+            return None
+        ids = set()
+        for raw_resource in raw_resources:
+            if utils.get_status(raw_resource) not in DELETED_STATUSES:
+                ids.add(destroyer.manager_cls(resource=raw_resource).id())
+        return ids
+
+    def _confirm_all(self, listers, deleted, started):
+        """Wait until deleted resources disappear from listings.
+
+        :returns: list of sets of ids of resources of each lister that
+                  were not deleted in time, and list of times when
+                  deletion of resources of each lister was finished
+        """
+        now = time.time()
+        unconfirmed = [set() for lister in listers]
+        finished = [now] * len(listers)
+        pending = dict(
+            (i, set(ids)) for i, ids in enumerate(deleted)
+            if ids and not listers[i][0].manager_cls._synchronized_deletion)
+
+        while pending:
+            time.sleep(min(listers[i][0].manager_cls._interval
+                           for i in pending))
+            indexes = list(pending)
+            listed = broker.run_each(
+                lambda i: self._list_ids(listers[i][0], listers[i][2]),
+                indexes, self.workers)
+
+            now = time.time()
+            for i, ids in zip(indexes, listed):
+                # NOTE(rally): failed listing confirms nothing, so resources
+                #              are checked again in the next round
+                if ids is not None:
+                    pending[i] &= ids
+                    finished[i] = now
+                manager_cls = listers[i][0].manager_cls
+                if not pending[i]:
+                    del pending[i]
+                elif now - started > manager_cls._timeout:
+                    unconfirmed[i] = pending.pop(i)
+                    for uuid in unconfirmed[i]:
+                        LOG.warning(
+                            _("Resource deletion failed, timeout occurred "
+                              "for %(service)s.%(resource)s: %(uuid)s.")
+                            % {"service": manager_cls._service,
+                               "resource": manager_cls._resource,
+                               "uuid": uuid})
+        return unconfirmed, finished
+
+    def exterminate(self):
+        """Delete all resources for passed users, admin and managers.
+
+        :returns: list of per manager summaries of deletion
+        """
+        started = time.time()
+        listers, listings = self._list_all()
+        deleted = self._delete_all(listers, listings)
+        unconfirmed, finished = self._confirm_all(listers, deleted, started)
+
+        summaries = []
+        for destroyer in self.destroyers:
+            indexes = [i for i, lister in enumerate(listers)
+                       if lister[0] is destroyer]
+            summary = {
+                "service": destroyer.manager_cls._service,
+                "resource": destroyer.manager_cls._resource,
+                "listed": sum(len(listings[i]) for i in indexes),
+                "deleted": sum(len(deleted[i] - unconfirmed[i])
+                               for i in indexes),
+                "unconfirmed": sum(len(unconfirmed[i]) for i in indexes),
+                "duration": max([finished[i] for i in indexes] or
+                                [started]) - started
+            }
+            summary["failed"] = (summary["listed"] - summary["deleted"] -
+                                 summary["unconfirmed"])
+            summary["throughput"] = (summary["deleted"] / summary["duration"]
+                                     if summary["duration"] else 0.0)
+            if summary["listed"]:
+                LOG.info(_("Cleanup of %(service)s.%(resource)s: "
+                           "%(deleted)d of %(listed)d resources deleted in "
+                           "%(duration).2f sec (%(throughput).2f per sec), "
+                           "%(failed)d failed, %(unconfirmed)d not "
+                           "confirmed") % summary)
+            summaries.append(summary)
+        return summaries
+
+
 def list_resource_names(admin_required=None):
     """List all resource managers names.
 
@@ -244,6 +453,54 @@ def find_resource_managers(names=None, admin_required=None):
     return resource_managers
 
 
+def get_service_groups(managers):
+    """Group resource managers by service and find dependencies of groups.
+
+    Services depend on the services declared in depends_on of their
+    resource managers, managers without depends_on make the service depend
+    on all the services with lower order, except the ones that depend on
+    it themselves.
+
+    :param managers: resource managers sorted by order
+    :returns: list of lists of managers of the same service sorted by
+              order, and list of sets of indexes of groups, which have to
+              be cleaned up before the group with the same index
+    :raises InvalidArgumentsException: if services depend on each other
+    """
+    groups = costilius.OrderedDict()
+    for mgr in managers:
+        groups.setdefault(mgr._service, []).append(mgr)
+    services = list(groups)
+
+    declared = []
+    for service in services:
+        depends_on = set()
+        for mgr in groups[service]:
+            if mgr._depends_on is not None:
+                depends_on.update(mgr._depends_on)
+        declared.append(set(j for j, dep in enumerate(services)
+                            if dep in depends_on and dep != service))
+
+    dependencies = []
+    for i, service in enumerate(services):
+        depends_on = set(declared[i])
+        if any(mgr._depends_on is None for mgr in groups[service]):
+            depends_on.update(j for j in range(i) if i not in declared[j])
+        dependencies.append(depends_on)
+
+    cleaned = set()
+    while len(cleaned) < len(services):
+        ready = [i for i in range(len(services))
+                 if i not in cleaned and dependencies[i] <= cleaned]
+        if not ready:
+            raise exceptions.InvalidArgumentsException(
+                message=_("Cleanup dependencies of services %s are cyclic")
+                % ", ".join(services[i] for i in range(len(services))
+                            if i not in cleaned))
+        cleaned.update(ready)
+    return list(groups.values()), dependencies
+
+
 def cleanup(names=None, admin_required=None, admin=None, users=None):
     """Generic cleaner.
 
@@ -251,7 +508,8 @@ def cleanup(names=None, admin_required=None, admin=None, users=None):
     with _service from services or _resource from resources.
 
     Then goes through all passed users and using cleaners cleans all related
-    resources.
+    resources. Resources of services, that don't depend on each other, are
+    cleaned up concurrently.
 
     :param names: Use only resource manages that has name from this list.
                   There are in as _service or
@@ -270,5 +528,19 @@ def cleanup(names=None, admin_required=None, admin=None, users=None):
 
                   }
     """
-    for manager in find_resource_managers(names, admin_required):
-        SeekAndDestroy(manager, admin, users).exterminate()
+    bulk = CONF.benchmark.cleanup_mode == "bulk"
+
+    def clean(group):
+        for order, managers in itertools.groupby(group,
+                                                 key=lambda m: m._order):
+            if bulk:
+                BulkSeekAndDestroy(list(managers), admin, users).exterminate()
+            else:
+                for manager in managers:
+                    SeekAndDestroy(manager, admin, users).exterminate()
+
+    groups, dependencies = get_service_groups(
+        find_resource_managers(names, admin_required))
+    broker.raise_errors(broker.run_graph(
+        clean, groups, dependencies,
+        workers=CONF.benchmark.cleanup_workers))
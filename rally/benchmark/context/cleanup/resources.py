@@ -31,6 +31,8 @@ def get_order(start):
 
 class SynchronizedDeletion(object):
 
+    _synchronized_deletion = True
+
     def is_deleted(self):
         return True
 
@@ -49,7 +51,7 @@ class QuotaMixin(SynchronizedDeletion):
 
 # HEAT
 
-@base.resource("heat", "stacks", order=100)
+@base.resource("heat", "stacks", order=100, depends_on=())
 class HeatStack(base.ResourceManager):
     pass
 
@@ -59,17 +61,20 @@ class HeatStack(base.ResourceManager):
 _nova_order = get_order(200)
 
 
-@base.resource("nova", "servers", order=next(_nova_order))
+@base.resource("nova", "servers", order=next(_nova_order),
+               depends_on=("heat",))
 class NovaServer(base.ResourceManager):
     pass
 
 
-@base.resource("nova", "keypairs", order=next(_nova_order))
+@base.resource("nova", "keypairs", order=next(_nova_order),
+               depends_on=("heat",))
 class NovaKeypair(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
-@base.resource("nova", "security_groups", order=next(_nova_order))
+@base.resource("nova", "security_groups", order=next(_nova_order),
+               depends_on=("heat",))
 class NovaSecurityGroup(SynchronizedDeletion, base.ResourceManager):
 
     def list(self):
@@ -78,7 +83,7 @@ class NovaSecurityGroup(SynchronizedDeletion, base.ResourceManager):
 
 
 @base.resource("nova", "quotas", order=next(_nova_order),
-               admin_required=True, tenant_resource=True)
+               admin_required=True, tenant_resource=True, depends_on=("heat",))
 class NovaQuotas(QuotaMixin, base.ResourceManager):
     pass
 
@@ -112,7 +117,7 @@ class NeutronMixin(SynchronizedDeletion, base.ResourceManager):
 
 
 @base.resource("neutron", "port", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat", "nova", "sahara"))
 class NeutronPort(NeutronMixin):
 
     def delete(self):
@@ -131,25 +136,26 @@ class NeutronPort(NeutronMixin):
 
 
 @base.resource("neutron", "router", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat", "nova", "sahara"))
 class NeutronRouter(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "subnet", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat", "nova", "sahara"))
 class NeutronSubnet(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "network", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat", "nova", "sahara"))
 class NeutronNetwork(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "quota", order=next(_neutron_order),
-               admin_required=True, tenant_resource=True)
+               admin_required=True, tenant_resource=True,
+               depends_on=("heat", "nova", "sahara"))
 class NeutronQuota(QuotaMixin, NeutronMixin):
 
     def delete(self):
@@ -162,38 +168,40 @@ _cinder_order = get_order(400)
 
 
 @base.resource("cinder", "backups", order=next(_cinder_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat", "nova", "sahara"))
 class CinderVolumeBackup(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "volume_snapshots", order=next(_cinder_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat", "nova", "sahara"))
 class CinderVolumeSnapshot(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "transfers", order=next(_cinder_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat", "nova", "sahara"))
 class CinderVolumeTransfer(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "volumes", order=next(_cinder_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat", "nova", "sahara"))
 class CinderVolume(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "quotas", order=next(_cinder_order),
-               admin_required=True, tenant_resource=True)
+               admin_required=True, tenant_resource=True,
+               depends_on=("heat", "nova", "sahara"))
 class CinderQuotas(QuotaMixin, base.ResourceManager):
     pass
 
 
 # GLANCE
 
-@base.resource("glance", "images", order=500, tenant_resource=True)
+@base.resource("glance", "images", order=500, tenant_resource=True,
+               depends_on=("heat", "nova"))
 class GlanceImage(base.ResourceManager):
 
     def list(self):
@@ -206,37 +214,37 @@ _sahara_order = get_order(600)
 
 
 @base.resource("sahara", "job_executions", order=next(_sahara_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat",))
 class SaharaJobExecution(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "jobs", order=next(_sahara_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat",))
 class SaharaJob(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "job_binary_internals", order=next(_sahara_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat",))
 class SaharaJobBinaryInternals(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "job_binaries", order=next(_sahara_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat",))
 class SaharaJobBinary(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "data_sources", order=next(_sahara_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat",))
 class SaharaDataSource(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "clusters", order=next(_sahara_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat",))
 class SaharaCluster(base.ResourceManager):
 
     # Need special treatment for Sahara Cluster because of the way the
@@ -253,20 +261,21 @@ class SaharaCluster(base.ResourceManager):
 
 
 @base.resource("sahara", "cluster_templates", order=next(_sahara_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat",))
 class SaharaClusterTemplate(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "node_group_templates", order=next(_sahara_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=("heat",))
 class SaharaNodeGroup(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 # CEILOMETER
 
-@base.resource("ceilometer", "alarms", order=700, tenant_resource=True)
+@base.resource("ceilometer", "alarms", order=700, tenant_resource=True,
+               depends_on=())
 class CeilometerAlarms(SynchronizedDeletion, base.ResourceManager):
 
     def id(self):
@@ -283,7 +292,7 @@ class CeilometerAlarms(SynchronizedDeletion, base.ResourceManager):
 
 # ZAQAR
 
-@base.resource("zaqar", "queues", order=800)
+@base.resource("zaqar", "queues", order=800, depends_on=())
 class ZaqarQueues(SynchronizedDeletion, base.ResourceManager):
 
     def list(self):
@@ -295,20 +304,22 @@ class ZaqarQueues(SynchronizedDeletion, base.ResourceManager):
 _designate_order = get_order(900)
 
 
-@base.resource("designate", "domains", order=next(_designate_order))
+@base.resource("designate", "domains", order=next(_designate_order),
+               depends_on=())
 class Designate(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("designate", "servers", order=next(_designate_order),
-               admin_required=True, perform_for_admin_only=True)
+               admin_required=True, perform_for_admin_only=True, depends_on=())
 class DesignateServer(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 # MISTRAL
 
-@base.resource("mistral", "workbooks", order=1100, tenant_resource=True)
+@base.resource("mistral", "workbooks", order=1100, tenant_resource=True,
+               depends_on=())
 class MistralWorkbooks(SynchronizedDeletion, base.ResourceManager):
     def delete(self):
         self._manager().delete(self.raw_resource.name)
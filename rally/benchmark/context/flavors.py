@@ -22,7 +22,7 @@ from rally import osclients
 LOG = logging.getLogger(__name__)
 
 
-@base.context(name="flavors", order=340)
+@base.context(name="flavors", order=340, depends_on=())
 class FlavorsGenerator(base.Context):
     """Context creates a list of flavors."""
 
@@ -15,6 +15,7 @@
 from rally.benchmark.context import base
 from rally.benchmark.context.cleanup import manager as resource_manager
 from rally.benchmark.scenarios.glance import utils as glance_utils
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import log as logging
 from rally.common import utils as rutils
@@ -25,7 +26,8 @@ from rally import osclients
 LOG = logging.getLogger(__name__)
 
 
-@base.context(name="images", order=410)
+@base.context(name="images", order=410,
+              depends_on=("users", "roles", "quotas"))
 class ImageGenerator(base.Context):
     """Context class for adding images to each user for benchmarks."""
 
@@ -75,8 +77,8 @@ class ImageGenerator(base.Context):
         images_per_tenant = self.config["images_per_tenant"]
         image_name = self.config.get("image_name")
 
-        for user, tenant_id in rutils.iterate_per_tenants(
-                self.context["users"]):
+        def create_images(args):
+            user, tenant_id = args
             current_images = []
             clients = osclients.Clients(user["endpoint"])
             glance_scenario = glance_utils.GlanceScenario(
@@ -98,6 +100,10 @@ class ImageGenerator(base.Context):
 
             self.context["tenants"][tenant_id]["images"] = current_images
 
+        broker.run_each(create_images,
+                        rutils.iterate_per_tenants(self.context["users"]),
+                        base.CONF.benchmark.context_workers)
+
     @rutils.log_task_wrapper(LOG.info, _("Exit context: `Images`"))
     def cleanup(self):
         # TODO(boris-42): Delete only resources created by this context
@@ -17,6 +17,7 @@ import novaclient.exceptions
 
 from rally.benchmark.context import base
 from rally.benchmark.context.cleanup import manager as resource_manager
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import log as logging
 from rally.common import utils
@@ -26,7 +27,7 @@ from rally import osclients
 LOG = logging.getLogger(__name__)
 
 
-@base.context(name="keypair", order=310)
+@base.context(name="keypair", order=310, depends_on=("users", "quotas"))
 class Keypair(base.Context):
     KEYPAIR_NAME = "rally_ssh_key"
 
@@ -51,9 +52,12 @@ class Keypair(base.Context):
 
     @utils.log_task_wrapper(LOG.info, _("Enter context: `keypair`"))
     def setup(self):
-        for user in self.context["users"]:
+        def generate_keypair(user):
             user["keypair"] = self._generate_keypair(user["endpoint"])
 
+        broker.run_each(generate_keypair, self.context["users"],
+                        base.CONF.benchmark.context_workers)
+
     @utils.log_task_wrapper(LOG.info, _("Exit context: `keypair`"))
     def cleanup(self):
         # TODO(boris-42): Delete only resources created by this context
@@ -27,7 +27,8 @@ from rally import osclients
 LOG = logging.getLogger(__name__)
 
 
-@base.context(name="network", order=350)
+@base.context(name="network", order=350,
+              depends_on=("users", "roles", "quotas"))
 class Network(base.Context):
     CONFIG_SCHEMA = {
         "type": "object",
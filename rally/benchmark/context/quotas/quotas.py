@@ -18,6 +18,7 @@ from rally.benchmark.context.quotas import cinder_quotas
 from rally.benchmark.context.quotas import designate_quotas
 from rally.benchmark.context.quotas import neutron_quotas
 from rally.benchmark.context.quotas import nova_quotas
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import log as logging
 from rally.common import utils
@@ -28,7 +29,7 @@ from rally import osclients
 LOG = logging.getLogger(__name__)
 
 
-@base.context(name="quotas", order=300)
+@base.context(name="quotas", order=300, depends_on=("users",))
 class Quotas(base.Context):
     """Context class for updating benchmarks' tenants quotas."""
 
@@ -60,12 +61,15 @@ class Quotas(base.Context):
 
     @utils.log_task_wrapper(LOG.info, _("Enter context: `quotas`"))
     def setup(self):
-        for tenant_id in self.context["tenants"]:
+        def update_quotas(tenant_id):
             for service in self.manager:
                 if self._service_has_quotas(service):
                     self.manager[service].update(tenant_id,
                                                  **self.config[service])
 
+        broker.run_each(update_quotas, self.context["tenants"],
+                        base.CONF.benchmark.context_workers)
+
     @utils.log_task_wrapper(LOG.info, _("Exit context: `quotas`"))
     def cleanup(self):
         for service in self.manager:
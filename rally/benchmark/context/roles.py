@@ -25,7 +25,7 @@ from rally import osclients
 LOG = logging.getLogger(__name__)
 
 
-@base.context(name="roles", order=330)
+@base.context(name="roles", order=330, depends_on=("users",))
 class RoleGenerator(base.Context):
     """Context class for adding temporary roles for benchmarks."""
 
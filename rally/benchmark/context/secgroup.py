@@ -17,6 +17,8 @@ import six
 
 from rally.benchmark.context import base
 from rally.benchmark.wrappers import network
+from rally.common import broker
+from rally.common import costilius
 from rally.common.i18n import _
 from rally.common import log as logging
 from rally.common import utils
@@ -85,7 +87,7 @@ def _prepare_open_secgroup(endpoint, secgroup_name):
     return rally_open.to_dict()
 
 
-@base.context(name="allow_ssh", order=320)
+@base.context(name="allow_ssh", order=320, depends_on=("users", "quotas"))
 class AllowSSH(base.Context):
 
     def __init__(self, context):
@@ -108,9 +110,19 @@ class AllowSSH(base.Context):
         secgroup_name = "%s_%s" % (SSH_GROUP_NAME,
                                    self.context["task"]["uuid"])
 
+        # NOTE(rally): users of the same tenant share the security group,
+        #              so they are processed one by one
+        tenant_users = costilius.OrderedDict()
         for user in self.context["users"]:
-            user["secgroup"] = _prepare_open_secgroup(user["endpoint"],
-                                                      secgroup_name)
+            tenant_users.setdefault(user["tenant_id"], []).append(user)
+
+        def prepare_secgroups(users):
+            for user in users:
+                user["secgroup"] = _prepare_open_secgroup(user["endpoint"],
+                                                          secgroup_name)
+
+        broker.run_each(prepare_secgroups, tenant_users.values(),
+                        base.CONF.benchmark.context_workers)
 
     @utils.log_task_wrapper(LOG.info, _("Exit context: `allow_ssh`"))
     def cleanup(self):
@@ -16,6 +16,7 @@ from rally.benchmark.context import base
 from rally.benchmark.context.cleanup import manager as resource_manager
 from rally.benchmark.scenarios.nova import utils as nova_utils
 from rally.benchmark import types as types
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import log as logging
 from rally.common import utils as rutils
@@ -26,7 +27,9 @@ from rally import osclients
 LOG = logging.getLogger(__name__)
 
 
-@base.context(name="servers", order=430)
+@base.context(name="servers", order=430,
+              depends_on=("users", "roles", "quotas", "network", "flavors",
+                          "images"))
 class ServerGenerator(base.Context):
     """Context class for adding temporary servers for benchmarks.
 
@@ -78,8 +81,8 @@ class ServerGenerator(base.Context):
         flavor_id = types.FlavorResourceType.transform(clients=clients,
                                                        resource_config=flavor)
 
-        for user, tenant_id in rutils.iterate_per_tenants(
-                self.context["users"]):
+        def boot_servers(args):
+            user, tenant_id = args
             LOG.debug("Booting servers for user tenant %s "
                       % (user["tenant_id"]))
             clients = osclients.Clients(user["endpoint"])
@@ -104,6 +107,10 @@ class ServerGenerator(base.Context):
             self.context["tenants"][tenant_id][
                 "servers"] = current_servers
 
+        broker.run_each(boot_servers,
+                        rutils.iterate_per_tenants(self.context["users"]),
+                        base.CONF.benchmark.context_workers)
+
     @rutils.log_task_wrapper(LOG.info, _("Exit context: `Servers`"))
     def cleanup(self):
         resource_manager.cleanup(names=["nova.servers"],
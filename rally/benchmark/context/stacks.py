@@ -25,7 +25,8 @@ from rally import osclients
 LOG = logging.getLogger(__name__)
 
 
-@base.context(name="stacks", order=435)
+@base.context(name="stacks", order=435,
+              depends_on=("users", "roles", "quotas"))
 class StackGenerator(base.Context):
     """Context class for create temporary stacks with resources.
 
@@ -140,7 +140,8 @@ class BaseCustomImageGenerator(base.Context):
                 tenant = self.context["tenants"][tenant_id]
                 tenant["custom_image"] = self.create_one_image(user)
 
-            broker.run(publish, consume, self.config["workers"])
+            broker.raise_errors(
+                broker.run(publish, consume, self.config["workers"]))
 
     def create_one_image(self, user, **kwargs):
         """Create one image for the user."""
@@ -26,7 +26,8 @@ from rally import osclients
 LOG = logging.getLogger(__name__)
 
 
-@base.context(name="volumes", order=420)
+@base.context(name="volumes", order=420,
+              depends_on=("users", "roles", "quotas"))
 class VolumeGenerator(base.Context):
     """Context class for adding volumes to each user for benchmarks."""
 
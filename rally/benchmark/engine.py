@@ -19,13 +19,18 @@ import time
 import traceback
 
 import jsonschema
+from oslo_config import cfg
 import six
 
 from rally.benchmark.context import base as base_ctx
 from rally.benchmark.context import users as users_ctx
+from rally.benchmark.processing import utils as processing_utils
 from rally.benchmark.runners import base as base_runner
 from rally.benchmark.scenarios import base as base_scenario
 from rally.benchmark.sla import base as base_sla
+from rally.benchmark import types
+from rally.benchmark import validation
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import log as logging
 from rally.common import utils as rutils
@@ -37,6 +42,26 @@ from rally import osclients
 
 LOG = logging.getLogger(__name__)
 
+ENGINE_OPTS = [
+    cfg.IntOpt("results_chunk_size",
+               default=1000,
+               help="Max number of iteration results that are stored "
+                    "in DB at once while a benchmark is running"),
+    cfg.FloatOpt("results_flush_interval",
+                 default=10.0,
+                 help="Time in seconds after which collected iteration "
+                      "results are stored in DB even if there are less "
+                      "of them than results_chunk_size"),
+    cfg.IntOpt("validation_workers",
+               default=10,
+               help="Number of scenario config entries of a task that are "
+                    "validated concurrently"),
+]
+
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark", title="benchmark options")
+CONF.register_opts(ENGINE_OPTS, group=benchmark_group)
+
 
 CONFIG_SCHEMA = {
     "type": "object",
@@ -109,6 +134,8 @@ class BenchmarkEngine(object):
         self.admin = admin and objects.Endpoint(**admin) or None
         self.users = map(lambda u: objects.Endpoint(**u), users or [])
         self.abort_on_sla_failure = abort_on_sla_failure
+        self.context_durations = {}
+        self.resource_cache = types.ResourceCache()
 
     @rutils.log_task_wrapper(LOG.info, _("Task validation check cloud."))
     def _check_cloud(self):
@@ -167,11 +194,29 @@ class BenchmarkEngine(object):
             admin = osclients.Clients(self.admin)
             user = osclients.Clients(context["users"][0]["endpoint"])
 
-            for name, values in six.iteritems(config):
-                for pos, kwargs in enumerate(values):
-                    self._validate_config_semantic_helper(admin, user, name,
-                                                          pos, deployment,
-                                                          kwargs)
+            entries = [(name, pos, kwargs)
+                       for name, values in six.iteritems(config)
+                       for pos, kwargs in enumerate(values)]
+
+            def validate(entry):
+                name, pos, kwargs = entry
+                self._validate_config_semantic_helper(admin, user, name, pos,
+                                                      deployment, kwargs)
+
+            with validation.ValidationCache() as cache:
+                try:
+                    broker.run_each(validate, entries,
+                                    CONF.benchmark.validation_workers)
+                finally:
+                    self._log_validation_stats(cache.stats)
+
+    def _log_validation_stats(self, stats):
+        for name, item in sorted(six.iteritems(stats),
+                                 key=lambda x: x[1]["duration"],
+                                 reverse=True):
+            LOG.info("Task %(task)s | Validator %(name)s: %(calls)d calls "
+                     "(%(deduplicated)d deduplicated) in %(duration).2f sec"
+                     % dict(item, task=self.task["uuid"], name=name))
 
     @rutils.log_task_wrapper(LOG.info, _("Task validation."))
     def validate(self):
@@ -181,7 +226,8 @@ class BenchmarkEngine(object):
             jsonschema.validate(self.config, CONFIG_SCHEMA)
             self._validate_config_scenarios_name(self.config)
             self._validate_config_syntax(self.config)
-            self._validate_config_semantic(self.config)
+            with self.resource_cache:
+                self._validate_config_semantic(self.config)
         except Exception as e:
             log = [str(type(e)), str(e), json.dumps(traceback.format_exc())]
             self.task.set_failed(log=log)
@@ -216,6 +262,11 @@ class BenchmarkEngine(object):
                   corresponding benchmark test launches
         """
         self.task.update_status(consts.TaskStatus.RUNNING)
+        with self.resource_cache:
+            self._run()
+        self.task.update_status(consts.TaskStatus.FINISHED)
+
+    def _run(self):
         for name in self.config:
             for n, kw in enumerate(self.config[name]):
                 key = {"name": name, "pos": n, "kw": kw}
@@ -231,9 +282,11 @@ class BenchmarkEngine(object):
                                                     name, self.admin)
                 self.duration = 0
                 self.full_duration = 0
+                context_manager = base_ctx.ContextManager(context_obj)
+                self.context_durations = context_manager.durations
                 try:
                     with rutils.Timer() as timer:
-                        with base_ctx.ContextManager(context_obj):
+                        with context_manager:
                             self.duration = runner.run(name, context_obj,
                                                        kw.get("args", {}))
                 except Exception as e:
@@ -241,14 +294,17 @@ class BenchmarkEngine(object):
                 finally:
                     self.full_duration = timer.duration()
                     is_done.set()
+                    runner.notify()
                     consumer.join()
-        self.task.update_status(consts.TaskStatus.FINISHED)
 
     def consume_results(self, key, task, is_done, runner):
         """Consume scenario runner results from queue and send them to db.
 
         Has to be run from different thread simultaneously with the runner.run
-        method.
+        method. Iteration results are stored in DB in chunks while the runner
+        is working, so they are neither kept in memory nor lost if the
+        process dies. A compact summary of the iterations is computed on the
+        fly and stored with the result when the runner finishes.
 
         :param key: Scenario identifier
         :param task: Running task
@@ -256,21 +312,42 @@ class BenchmarkEngine(object):
                         runner finishes it's work.
         :param runner: ScenarioRunner object that was used to run a task
         """
+        task_result = task.append_results(key, {"raw": [],
+                                                "load_duration": 0,
+                                                "full_duration": 0,
+                                                "sla": []})
         results = []
+        last_flush = time.time()
         sla_checker = base_sla.SLAChecker(key["kw"])
+        summary = processing_utils.ScenarioSummary()
         while True:
             if runner.result_queue:
                 result = runner.result_queue.popleft()
                 results.append(result)
+                summary.add(result)
                 success = sla_checker.add_iteration(result)
                 if self.abort_on_sla_failure and not success:
                     runner.abort()
             elif is_done.isSet():
                 break
             else:
-                time.sleep(0.1)
-
-        task.append_results(key, {"raw": results,
-                                  "load_duration": self.duration,
-                                  "full_duration": self.full_duration,
-                                  "sla": sla_checker.results()})
+                runner.wait_for_results(timeout=1)
+
+            if results and (
+                    len(results) >= CONF.benchmark.results_chunk_size or
+                    time.time() - last_flush >=
+                    CONF.benchmark.results_flush_interval):
+                task.append_raw_results(task_result["id"], results)
+                results = []
+                last_flush = time.time()
+
+        if results:
+            task.append_raw_results(task_result["id"], results)
+
+        task.update_results(task_result["id"],
+                            {"raw": [],
+                             "load_duration": self.duration,
+                             "full_duration": self.full_duration,
+                             "context_durations": self.context_durations,
+                             "sla": sla_checker.results(),
+                             "summary": summary.to_dict()})
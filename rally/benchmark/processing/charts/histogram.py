@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import bisect
 import math
 
 
@@ -50,13 +51,16 @@ class Histogram:
                 for i in range(1, self.number_of_bins + 1)]
 
     def _calculate_y_axis(self):
-        """Return a list with the values of the y axis."""
+        """Return a list with the values of the y axis.
+
+        Each data point goes to the first bin which upper bound is not
+        less than the point, the bin is found with binary search.
+        """
         y_axis = [0] * len(self.x_axis)
         for data_point in self.data:
-            for i, bin in enumerate(self.x_axis):
-                if data_point <= bin:
-                    y_axis[i] += 1
-                    break
+            i = bisect.bisect_left(self.x_axis, data_point)
+            if i < len(y_axis):
+                y_axis[i] += 1
         return y_axis
 
 
@@ -13,104 +13,128 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import copy
 import json
+import math
+import multiprocessing
 
+from oslo_config import cfg
 import six
 
 from rally.benchmark.processing.charts import histogram as histo
 from rally.benchmark.processing import utils
+from rally.benchmark import results as bench_results
 from rally.ui import utils as ui_utils
 
 
-def _prepare_data(data):
-    durations = []
-    idle_durations = []
-    atomic_durations = {}
-    output = {}
-    output_errors = []
-    output_stacked = []
-    errors = []
+REPORT_OPTS = [
+    cfg.IntOpt("report_workers",
+               default=0,
+               help="Number of processes that prepare data of scenarios "
+                    "for HTML report in parallel, 0 means the number of "
+                    "CPUs"),
+]
 
-    # NOTE(maretskiy): We need this extra iteration
-    # to determine something that we should know about the data
-    # before starting its processing.
-    atomic_names = set()
-    output_names = set()
-    for r in data["result"]:
-        atomic_names.update(r["atomic_actions"].keys())
-        output_names.update(r["scenario_output"]["data"].keys())
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark", title="benchmark options")
+CONF.register_opts(REPORT_OPTS, group=benchmark_group)
 
-    for idx, r in enumerate(data["result"]):
-        # NOTE(maretskiy): Sometimes we miss iteration data.
-        # So we care about data integrity by setting zero values
-        if len(r["atomic_actions"]) < len(atomic_names):
-            for atomic_name in atomic_names:
-                r["atomic_actions"].setdefault(atomic_name, 0)
+# NOTE(rally): max number of points of a chart series, series of
+#              iterations are compressed to it and histograms have no more
+#              bins than it. Charts are a few hundred pixels wide, so more
+#              points only make the report bigger.
+MAX_POINTS = 200
 
-        if len(r["scenario_output"]["data"]) < len(output_names):
-            for output_name in output_names:
-                r["scenario_output"]["data"].setdefault(output_name, 0)
+# NOTE(rally): errors are grouped by type and message, only MAX_ERRORS
+#              groups are embedded into the report, each with the traceback
+#              of its first iteration and at most MAX_ERROR_ITERATIONS
+#              numbers of failed iterations
+MAX_ERRORS = 50
+MAX_ERROR_ITERATIONS = 20
 
-        if r["scenario_output"]["errors"]:
-            output_errors.append((idx, r["scenario_output"]["errors"]))
 
-        for param, value in r["scenario_output"]["data"].items():
-            try:
-                output[param].append(value)
-            except KeyError:
-                output[param] = [value]
+def _zero_nan(values):
+    return [0 if math.isnan(v) else v for v in values]
 
-        if r["error"]:
-            type_, message, traceback = r["error"]
-            errors.append({"iteration": idx,
-                           "type": type_,
-                           "message": message,
-                           "traceback": traceback})
 
-            # NOTE(maretskiy): Reset failed durations (no sense to display)
-            r["duration"] = 0
-            r["idle_duration"] = 0
+def _group_errors(iterations):
+    """Group errors of iterations by type and message.
 
-        durations.append(r["duration"])
-        idle_durations.append(r["idle_duration"])
+    :param iterations: IterationResults object
+    :returns: list of at most MAX_ERRORS dicts with type, message and
+              traceback of the error, number of iterations failed with it
+              and numbers of the first MAX_ERROR_ITERATIONS of them
+    """
+    errors = []
+    groups = {}
+    for idx in sorted(iterations.errors):
+        type_, message, traceback = iterations.error(idx)
+        error = groups.get((type_, message))
+        if error is None:
+            if len(errors) == MAX_ERRORS:
+                continue
+            error = {"type": type_,
+                     "message": message,
+                     "traceback": traceback,
+                     "count": 0,
+                     "iterations": []}
+            groups[(type_, message)] = error
+            errors.append(error)
+        error["count"] += 1
+        if len(error["iterations"]) < MAX_ERROR_ITERATIONS:
+            error["iterations"].append(idx)
+    return errors
 
-        for met, duration in r["atomic_actions"].items():
-            try:
-                atomic_durations[met].append(duration)
-            except KeyError:
-                atomic_durations[met] = [duration]
 
-    for k, v in six.iteritems(output):
-        output_stacked.append({"key": k, "values": utils.compress(v)})
+def _prepare_data(data):
+    iterations = data["result"]
 
-    for k, v in six.iteritems(atomic_durations):
-        atomic_durations[k] = utils.compress(v)
+    output_errors = sorted(six.iteritems(iterations.output_errors))
+    output_errors = output_errors[:MAX_ERRORS]
+    output_stacked = []
+    for k, v in six.iteritems(iterations.output_data):
+        # NOTE(maretskiy): Sometimes we miss iteration data.
+        # So we care about data integrity by setting zero values
+        output_stacked.append({"key": k, "values": utils.compress(
+            _zero_nan(v), limit=MAX_POINTS)})
+
+    atomic_durations = {}
+    for k, v in six.iteritems(iterations.atomic_actions):
+        atomic_durations[k] = utils.compress(_zero_nan(v), limit=MAX_POINTS)
+
+    # NOTE(maretskiy): Reset failed durations (no sense to display)
+    durations = [0 if idx in iterations.errors else d
+                 for idx, d in enumerate(iterations.durations)]
+    idle_durations = [0 if idx in iterations.errors else d
+                      for idx, d in enumerate(iterations.idle_durations)]
 
     return {
         "total_durations": {
-            "duration": utils.compress(durations),
-            "idle_duration": utils.compress(idle_durations)},
+            "duration": utils.compress(durations, limit=MAX_POINTS),
+            "idle_duration": utils.compress(idle_durations,
+                                            limit=MAX_POINTS)},
         "atomic_durations": atomic_durations,
         "output": output_stacked,
         "output_errors": output_errors,
-        "errors": errors,
+        "errors": _group_errors(iterations),
+        "errors_num": len(iterations.errors),
         "sla": data["sla"],
         "load_duration": data["load_duration"],
         "full_duration": data["full_duration"],
     }
 
 
+def _histograms(values, key=None):
+    """Build histograms of values with all the methods of binning."""
+    if not values:
+        return []
+    return [histo.Histogram(values, min(variety["number_of_bins"], MAX_POINTS),
+                            variety["method"], key)
+            for variety in histo.hvariety(values)]
+
+
 def _process_main_duration(result, data):
-    histogram_data = [r["duration"] for r in result["result"]
-                      if not r["error"]]
-    histograms = []
-    if histogram_data:
-        hvariety = histo.hvariety(histogram_data)
-        for i in range(len(hvariety)):
-            histograms.append(histo.Histogram(histogram_data,
-                                              hvariety[i]["number_of_bins"],
-                                              hvariety[i]["method"]))
+    histogram_data = result["result"].successful_durations()
+    histograms = _histograms(histogram_data)
 
     stacked_area = []
     for key in "duration", "idle_duration":
@@ -123,7 +147,7 @@ def _process_main_duration(result, data):
     return {
         "pie": [
             {"key": "success", "value": len(histogram_data)},
-            {"key": "errors", "value": len(data["errors"])},
+            {"key": "errors", "value": data["errors_num"]},
         ],
         "iter": stacked_area,
         "histogram": [
@@ -143,64 +167,33 @@ def _process_atomic(result, data):
         lst = lst if not key else map(lambda x: x[key], lst)
         return utils.mean(lst)
 
-    # NOTE(boris-42): In our result["result"] we have next structure:
-    #                 {"error": NoneOrDict,
-    #                  "atomic_actions": {
-    #                       "action1": <duration>,
-    #                       "action2": <duration>
-    #                   }
-    #                 }
-    #                 Our goal is to get next structure:
-    #                 [{"key": $atomic_actions.action,
-    #                   "values": [[order, $atomic_actions.duration
-    #                              if not $error else 0], ...}]
-    #
-    #                 Order of actions in "atomic_action" is similiar for
+    # NOTE(boris-42): Order of actions in "atomic_action" is similiar for
     #                 all iteration. So we should take first non "error"
-    #                 iteration. And get in atomitc_iter list:
-    #                 [{"key": "action", "values":[]}]
-    stacked_area = []
-    for row in result["result"]:
-        if not row["error"] and "atomic_actions" in row:
-            stacked_area = [{"key": a, "values": []}
-                            for a in row["atomic_actions"]]
+    #                 iteration and get names of actions from it.
+    iterations = result["result"]
+    actions = []
+    for idx in six.moves.range(len(iterations)):
+        if not iterations.is_error(idx):
+            actions = list(iterations[idx]["atomic_actions"])
             break
 
-    # NOTE(boris-42): pie is similiar to stacked_area, only difference is in
-    #                 structure of values. In case of $error we shouldn't put
-    #                 anything in pie. In case of non error we should put just
-    #                 $atomic_actions.duration (without order)
+    # NOTE(boris-42): In case of $error we shouldn't put anything in pie and
+    #                 histogram. In case of non error we should put just
+    #                 $atomic_actions.duration (without order), failed
+    #                 atomic actions are counted as 0
     pie = []
-    histogram_data = []
-    if stacked_area:
-        pie = copy.deepcopy(stacked_area)
-        histogram_data = copy.deepcopy(stacked_area)
-        for i, res in enumerate(result["result"]):
-            # in case of error put (order, 0.0) to all actions of stacked area
-            if res["error"]:
-                for k in range(len(stacked_area)):
-                    stacked_area[k]["values"].append([i + 1, 0.0])
-                continue
-
-            # in case of non error put real durations to pie and stacked area
-            for j, action in enumerate(res["atomic_actions"].keys()):
-                # in case any single atomic action failed, put 0
-                action_duration = res["atomic_actions"][action] or 0.0
-                pie[j]["values"].append(action_duration)
-                histogram_data[j]["values"].append(action_duration)
+    for action in actions:
+        pie.append({"key": action, "values": [
+            0.0 if math.isnan(d) else d
+            for idx, d in enumerate(iterations.atomic_actions[action])
+            if not iterations.is_error(idx)]})
 
     # filter out empty action lists in pie / histogram to avoid errors
-    pie = filter(lambda x: x["values"], pie)
-    histogram_data = [x for x in histogram_data if x["values"]]
-
-    histograms = [[] for atomic_action in range(len(histogram_data))]
-    for i, atomic_action in enumerate(histogram_data):
-        hvariety = histo.hvariety(atomic_action["values"])
-        for v in range(len(hvariety)):
-            histograms[i].append(histo.Histogram(atomic_action["values"],
-                                                 hvariety[v]["number_of_bins"],
-                                                 hvariety[v]["method"],
-                                                 atomic_action["key"]))
+    pie = [x for x in pie if x["values"]]
+    histogram_data = pie
+
+    histograms = [_histograms(atomic_action["values"], atomic_action["key"])
+                  for atomic_action in histogram_data]
     stacked_area = []
     for name, durations in six.iteritems(data["atomic_durations"]):
         stacked_area.append({
@@ -225,80 +218,110 @@ def _process_atomic(result, data):
 
 
 def _get_atomic_action_durations(result):
-    raw = result.get("result", [])
-    actions_data = utils.get_atomic_actions_data(raw)
+    summary = result["summary"]
+    iterations = summary["iterations"]
     table = []
-    total = []
-    for action in actions_data:
-        durations = actions_data[action]
-        if durations:
-            data = [action,
-                    round(min(durations), 3),
-                    round(utils.mean(durations), 3),
-                    round(max(durations), 3),
-                    round(utils.percentile(durations, 0.90), 3),
-                    round(utils.percentile(durations, 0.95), 3),
-                    "%.1f%%" % (len(durations) * 100.0 / len(raw)),
-                    len(raw)]
+    for action in summary["atomic_actions"]:
+        if action["count"]:
+            table.append([action["name"],
+                          round(action["min"], 3),
+                          round(action["mean"], 3),
+                          round(action["max"], 3),
+                          round(action["p90"], 3),
+                          round(action["p95"], 3),
+                          "%.1f%%" % (action["count"] * 100.0 / iterations),
+                          iterations])
         else:
-            data = [action, None, None, None, None, None, 0, len(raw)]
-
-        # Save 'total' - it must be appended last
-        if action == "total":
-            total = data
-            continue
-        table.append(data)
+            table.append([action["name"], None, None, None, None, None, 0,
+                          iterations])
+    return table
 
-    if total:
-        table.append(total)
 
-    return table
+def _load_result(result):
+    """Convert iterations of the result to columnar storage.
+
+    Iterations are consumed in a single pass, so they can be streamed
+    from DB, the pass also computes the summary for results of old tasks
+    that have none. All the processing below works with columns.
+
+    :param result: result dict, where "result" is an iterable of
+                   iteration result dicts
+    """
+    iterations = bench_results.IterationResults()
+    summary = result.get("summary")
+    collector = None if summary else utils.ScenarioSummary()
+    for iteration in result["result"]:
+        iterations.append(iteration)
+        if collector is not None:
+            collector.add(iteration)
+    return dict(result, result=iterations,
+                summary=summary or collector.to_dict())
+
+
+def _process_result(result):
+    table_cols = ["Action",
+                  "Min (sec)",
+                  "Avg (sec)",
+                  "Max (sec)",
+                  "90 percentile",
+                  "95 percentile",
+                  "Success",
+                  "Count"]
+    table_rows = _get_atomic_action_durations(result)
+    scenario_name, kw, pos = (result["key"]["name"],
+                              result["key"]["kw"], result["key"]["pos"])
+    data = _prepare_data(result)
+    cls = scenario_name.split(".")[0]
+    met = scenario_name.split(".")[1]
+    name = "%s%s" % (met, (pos and " [%d]" % (int(pos) + 1) or ""))
+
+    return scenario_name, kw, {
+        "cls": cls,
+        "met": met,
+        "pos": int(pos),
+        "name": name,
+        "runner": kw["runner"]["type"],
+        "config": json.dumps({scenario_name: [kw]}, indent=2),
+        "iterations": _process_main_duration(result, data),
+        "atomic": _process_atomic(result, data),
+        "table_cols": table_cols,
+        "table_rows": table_rows,
+        "output": data["output"],
+        "output_errors": data["output_errors"],
+        "errors": data["errors"],
+        "errors_num": data["errors_num"],
+        "load_duration": data["load_duration"],
+        "full_duration": data["full_duration"],
+        "sla": data["sla"],
+        "sla_success": all([sla["success"] for sla in data["sla"]]),
+        "iterations_num": len(result["result"]),
+    }
 
 
 def _process_results(results):
+    # NOTE(rally): iterations are loaded here rather than in the workers,
+    #              because they may be streamed from DB, which can't be
+    #              passed to other processes
+    results = [_load_result(result) for result in results]
+    workers = min(CONF.benchmark.report_workers or
+                  multiprocessing.cpu_count(), len(results))
+    if workers > 1:
+        # NOTE(rally): processing of iterations is CPU bound, so scenarios
+        #              are processed by a pool of processes
+        pool = multiprocessing.Pool(workers)
+        try:
+            processed = pool.map(_process_result, results, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        processed = [_process_result(result) for result in results]
+
     output = []
     source_dict = {}
-    for result in results:
-        table_cols = ["Action",
-                      "Min (sec)",
-                      "Avg (sec)",
-                      "Max (sec)",
-                      "90 percentile",
-                      "95 percentile",
-                      "Success",
-                      "Count"]
-        table_rows = _get_atomic_action_durations(result)
-        scenario_name, kw, pos = (result["key"]["name"],
-                                  result["key"]["kw"], result["key"]["pos"])
-        data = _prepare_data(result)
-        cls = scenario_name.split(".")[0]
-        met = scenario_name.split(".")[1]
-        name = "%s%s" % (met, (pos and " [%d]" % (int(pos) + 1) or ""))
-
-        try:
-            source_dict[scenario_name].append(kw)
-        except KeyError:
-            source_dict[scenario_name] = [kw]
-        output.append({
-            "cls": cls,
-            "met": met,
-            "pos": int(pos),
-            "name": name,
-            "runner": kw["runner"]["type"],
-            "config": json.dumps({scenario_name: [kw]}, indent=2),
-            "iterations": _process_main_duration(result, data),
-            "atomic": _process_atomic(result, data),
-            "table_cols": table_cols,
-            "table_rows": table_rows,
-            "output": data["output"],
-            "output_errors": data["output_errors"],
-            "errors": data["errors"],
-            "load_duration": data["load_duration"],
-            "full_duration": data["full_duration"],
-            "sla": data["sla"],
-            "sla_success": all([sla["success"] for sla in data["sla"]]),
-            "iterations_num": len(result["result"]),
-        })
+    for scenario_name, kw, scenario in processed:
+        source_dict.setdefault(scenario_name, []).append(kw)
+        output.append(scenario)
     source = json.dumps(source_dict, indent=2, sort_keys=True)
     scenarios = sorted(output, key=lambda r: "%s%s" % (r["cls"], r["name"]))
     return source, scenarios
@@ -307,5 +330,7 @@ def _process_results(results):
 def plot(results):
     template = ui_utils.get_template("task/report.mako")
     source, scenarios = _process_results(results)
-    return template.render(data=json.dumps(scenarios),
+    # NOTE(rally): data of all the scenarios is embedded into the report,
+    #              compact separators make it noticeably smaller
+    return template.render(data=json.dumps(scenarios, separators=(",", ":")),
                            source=json.dumps(source))
@@ -13,8 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import array
 import math
 
+import six
+
+from rally.common import costilius
 from rally import exceptions
 
 
@@ -42,6 +46,10 @@ def percentile(values, percent):
     if not values:
         return None
     values.sort()
+    return _sorted_percentile(values, percent)
+
+
+def _sorted_percentile(values, percent):
     k = (len(values) - 1) * percent
     f = math.floor(k)
     c = math.ceil(k)
@@ -61,20 +69,344 @@ def get_atomic_actions_data(raw_data):
               for all atomic action keys
     """
     atomic_actions = []
+    durations = {}
+    total = []
     for row in raw_data:
-        # find first non-error result to get atomic actions names
-        if not row["error"] and "atomic_actions" in row:
-            atomic_actions = row["atomic_actions"].keys()
-    actions_data = {}
-    for atomic_action in atomic_actions:
-        actions_data[atomic_action] = [
-            r["atomic_actions"][atomic_action]
-            for r in raw_data
-            if r["atomic_actions"].get(atomic_action) is not None]
-    actions_data["total"] = [r["duration"] for r in raw_data if not r["error"]]
+        if not row["error"]:
+            total.append(row["duration"])
+            # find last non-error result to get atomic actions names
+            if "atomic_actions" in row:
+                atomic_actions = list(row["atomic_actions"])
+        for name, duration in six.iteritems(row.get("atomic_actions") or {}):
+            if duration is not None:
+                durations.setdefault(name, []).append(duration)
+    actions_data = dict((name, durations.get(name, []))
+                        for name in atomic_actions)
+    actions_data["total"] = total
     return actions_data
 
 
+def _update_period(period, row):
+    if "timestamp" not in row:
+        return
+    finished = row["timestamp"] + row["duration"] + row.get("idle_duration", 0)
+    if period["started"] is None or row["timestamp"] < period["started"]:
+        period["started"] = row["timestamp"]
+    if period["finished"] is None or finished > period["finished"]:
+        period["finished"] = finished
+
+
+def _throughput(period, success):
+    wall_time = (period["finished"] - period["started"]
+                 if period["started"] is not None else 0)
+    return success / wall_time if wall_time > 0 else None
+
+
+def get_load_level_data(raw_data):
+    """Retrieve throughput and latency of each load level.
+
+    Iterations are grouped by "load_level" field, which is set by runners
+    that change the load during the run.
+
+    :parameter raw_data: list of raw records (scenario runner output)
+
+    :returns: OrderedDict {load_level: {"count": total iterations,
+              "success": successful iterations, "throughput": successful
+              iterations per second, "durations": list of durations of
+              successful iterations}}, ordered by load level
+    """
+    levels = {}
+    for row in raw_data:
+        if row.get("load_level") is None:
+            continue
+        level = levels.setdefault(row["load_level"],
+                                  {"count": 0, "durations": [],
+                                   "started": None, "finished": None})
+        level["count"] += 1
+        if not row["error"]:
+            level["durations"].append(row["duration"])
+        _update_period(level, row)
+
+    result = costilius.OrderedDict()
+    for load_level in sorted(levels):
+        level = levels[load_level]
+        result[load_level] = {
+            "count": level["count"],
+            "success": len(level["durations"]),
+            "throughput": _throughput(level, len(level["durations"])),
+            "durations": level["durations"]
+        }
+    return result
+
+
+PERCENTILES = (("p50", 0.50), ("p90", 0.90), ("p95", 0.95), ("p99", 0.99))
+
+# NOTE(rally): streaming stats keep up to EXACT_LIMIT values as they are,
+#              larger streams are moved to buckets that are wider than
+#              PRECISION relative to the values in them
+EXACT_LIMIT = 10000
+PRECISION = 0.01
+
+
+class StreamingStats(object):
+    """Statistics of a stream of numbers computed in a single pass.
+
+    Count, min, max and mean are exact. Values are kept as they are while
+    there are at most `exact_limit` of them, so percentiles of small
+    streams are exact as well. After that values are counted in buckets of
+    a logarithmic histogram (in the manner of HDR histogram): memory does
+    not depend on the number of values any more, and percentiles are
+    computed with a relative error of `precision`.
+    """
+
+    def __init__(self, exact_limit=EXACT_LIMIT, precision=PRECISION):
+        """Init the stats.
+
+        :param exact_limit: max number of values stored as they are, None
+                            means that the values are never bucketed
+        :param precision: max relative error of bucketed percentiles
+        """
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._sum = 0.0
+        self._sum_error = 0.0
+        self._values = array.array("d")
+        self._buckets = None
+        self._log_base = math.log1p(2 * precision)
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return (self._sum + self._sum_error) / self.count
+
+    def _bucket(self, value):
+        if value == 0:
+            return 0, 0
+        return (1 if value > 0 else -1,
+                int(math.floor(math.log(abs(value)) / self._log_base)))
+
+    def _bucket_value(self, bucket):
+        sign, idx = bucket
+        return sign * math.exp((idx + 0.5) * self._log_base)
+
+    def add(self, value):
+        """Add one more value.
+
+        :param value: number
+        """
+        value = float(value)
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        # NOTE(rally): compensated (Neumaier) summation, the mean is as
+        #              accurate as math.fsum of all the values
+        total = self._sum + value
+        if abs(self._sum) >= abs(value):
+            self._sum_error += (self._sum - total) + value
+        else:
+            self._sum_error += (value - total) + self._sum
+        self._sum = total
+
+        if self._buckets is None:
+            self._values.append(value)
+            if (self.exact_limit is not None and
+                    len(self._values) > self.exact_limit):
+                self._buckets = {}
+                for stored in self._values:
+                    self._add_to_bucket(stored)
+                self._values = None
+        else:
+            self._add_to_bucket(value)
+
+    def _add_to_bucket(self, value):
+        bucket = self._bucket(value)
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def percentiles(self, percents):
+        """Find several percentiles of the values at once.
+
+        :param percents: list of float values from 0.0 to 1.0
+
+        :returns: list of percentiles, None if there are no values
+        """
+        if not self.count:
+            return [None] * len(percents)
+        if self._buckets is None:
+            self._values = array.array("d", sorted(self._values))
+            return [_sorted_percentile(self._values, percent)
+                    for percent in percents]
+
+        buckets = sorted((self._bucket_value(bucket), count)
+                         for bucket, count in six.iteritems(self._buckets))
+        result = []
+        for percent in percents:
+            rank = int(round((self.count - 1) * percent))
+            if rank == 0:
+                result.append(self.min)
+                continue
+            if rank == self.count - 1:
+                result.append(self.max)
+                continue
+            seen = 0
+            for value, count in buckets:
+                seen += count
+                if seen > rank:
+                    break
+            result.append(min(max(value, self.min), self.max))
+        return result
+
+    def percentile(self, percent):
+        """Find the percentile of the values.
+
+        :param percent: float value from 0.0 to 1.0
+        """
+        return self.percentiles([percent])[0]
+
+    def to_dict(self):
+        """Return the stats as a dict.
+
+        :returns: dict with "count", "min", "mean", "max", "p50", "p90",
+                  "p95" and "p99" keys, statistics are None if there are
+                  no values
+        """
+        stats = {"count": self.count, "min": self.min, "mean": self.mean,
+                 "max": self.max}
+        stats.update(zip([name for name, percent in PERCENTILES],
+                         self.percentiles([percent for name, percent
+                                           in PERCENTILES])))
+        return stats
+
+
+def get_stats(values):
+    """Compute count, min, mean, max and percentiles of a list of values.
+
+    :parameter values: iterable of numbers
+
+    :returns: dict, see StreamingStats.to_dict()
+    """
+    stats = StreamingStats(exact_limit=None)
+    for value in values:
+        stats.add(value)
+    return stats.to_dict()
+
+
+class ScenarioSummary(object):
+    """Compact summary of scenario iterations.
+
+    Iterations are added one by one while the scenario is running and
+    all the statistics are computed in this single pass with streaming
+    stats, so memory used by the summary of a long run is bounded. The
+    summary is stored with the task result and used to display it without
+    loading all the iterations.
+    """
+
+    def __init__(self):
+        self.iterations = 0
+        self.errors = 0
+        self._period = {"started": None, "finished": None}
+        self._total = StreamingStats()
+        self._action_names = []
+        self._actions = {}
+        self._output = costilius.OrderedDict()
+        self._output_errors = 0
+        self._levels = {}
+
+    def add(self, row):
+        """Add result of one more iteration.
+
+        :parameter row: raw record (scenario runner output)
+        """
+        self.iterations += 1
+        if row["error"]:
+            self.errors += 1
+        else:
+            self._total.add(row["duration"])
+            # NOTE(rally): names of actions are taken from the last
+            #              successful iteration, like get_atomic_actions_data
+            if "atomic_actions" in row:
+                self._action_names = list(row["atomic_actions"])
+        for name, duration in six.iteritems(row.get("atomic_actions") or {}):
+            if duration is not None:
+                if name not in self._actions:
+                    self._actions[name] = StreamingStats()
+                self._actions[name].add(duration)
+
+        output = row.get("scenario_output") or {}
+        for key, value in six.iteritems(output.get("data") or {}):
+            if key not in self._output:
+                self._output[key] = StreamingStats()
+            self._output[key].add(value)
+        if output.get("errors"):
+            self._output_errors += 1
+
+        _update_period(self._period, row)
+        if row.get("load_level") is not None:
+            level = self._levels.setdefault(
+                row["load_level"], {"count": 0, "durations": StreamingStats(),
+                                    "started": None, "finished": None})
+            level["count"] += 1
+            if not row["error"]:
+                level["durations"].add(row["duration"])
+            _update_period(level, row)
+
+    def to_dict(self):
+        """Return the summary as a JSON serializable dict.
+
+        :returns: dict with "iterations" and "errors" counts, "throughput"
+                  (successful iterations per second), "atomic_actions"
+                  (list of duration stats of each action and "total" as
+                  the last item), "load_levels" (list of stats of each load
+                  level ordered by level), "output" (list of stats of each
+                  scenario output key) and "output_errors" (number of
+                  iterations with scenario output errors)
+        """
+        atomic_actions = [
+            dict(self._actions.get(name, StreamingStats()).to_dict(),
+                 name=name)
+            for name in self._action_names]
+        atomic_actions.append(dict(self._total.to_dict(), name="total"))
+
+        load_levels = []
+        for load_level in sorted(self._levels):
+            level = self._levels[load_level]
+            load_levels.append({
+                "load_level": load_level,
+                "count": level["count"],
+                "success": level["durations"].count,
+                "throughput": _throughput(level, level["durations"].count),
+                "duration": level["durations"].to_dict()})
+
+        return {
+            "iterations": self.iterations,
+            "errors": self.errors,
+            "throughput": _throughput(self._period, self._total.count),
+            "atomic_actions": atomic_actions,
+            "load_levels": load_levels,
+            "output": [dict(stats.to_dict(), key=key)
+                       for key, stats in six.iteritems(self._output)],
+            "output_errors": self._output_errors
+        }
+
+
+def get_summary(raw_data):
+    """Compute summary of scenario iterations.
+
+    :parameter raw_data: iterable of raw records (scenario runner output)
+
+    :returns: dict, see ScenarioSummary.to_dict()
+    """
+    summary = ScenarioSummary()
+    for row in raw_data:
+        summary.add(row)
+    return summary.to_dict()
+
+
 def compress(data, limit=1000, merge=None, normalize=None):
     """Enumerate and reduce list of values.
 
@@ -0,0 +1,182 @@
+# Copyright 2015: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import array
+import math
+
+import six
+
+from rally.common import costilius
+
+
+NAN = float("nan")
+
+
+def _column(size=0):
+    return array.array("d", [NAN]) * size
+
+
+class IterationResults(object):
+    """Columnar storage of scenario iteration results.
+
+    Each iteration of a scenario is represented by a dict (see
+    rally.benchmark.runners.base.ScenarioRunnerResult), so keeping results
+    of a long run as a list of dicts takes a lot of memory. This class
+    stores numbers of all iterations in arrays (one per field, atomic action
+    or scenario output key) and keeps each unique error string only once.
+    Dicts are built only on demand, when a single iteration is requested.
+
+    Missing numbers are stored as NaN.
+    """
+
+    def __init__(self, iterations=None):
+        self.durations = _column()
+        self.timestamps = _column()
+        self.idle_durations = _column()
+        self.start_lags = _column()
+        self.load_levels = _column()
+        self.atomic_actions = costilius.OrderedDict()
+        self.output_data = costilius.OrderedDict()
+        # NOTE(rally): sparse fields, stored only for the iterations
+        #              which have them
+        self.errors = {}
+        self.output_errors = {}
+        self._none_actions = {}
+        self._strings = []
+        self._string_ids = {}
+        if iterations:
+            self.extend(iterations)
+
+    def __len__(self):
+        return len(self.durations)
+
+    def __iter__(self):
+        for idx in six.moves.range(len(self)):
+            yield self[idx]
+
+    def __getitem__(self, idx):
+        size = len(self)
+        if idx < 0:
+            idx += size
+        if not 0 <= idx < size:
+            raise IndexError("iteration index out of range")
+
+        atomic_actions = costilius.OrderedDict()
+        for name, column in six.iteritems(self.atomic_actions):
+            if not math.isnan(column[idx]):
+                atomic_actions[name] = column[idx]
+            elif idx in self._none_actions.get(name, ()):
+                atomic_actions[name] = None
+
+        data = {}
+        for name, column in six.iteritems(self.output_data):
+            if not math.isnan(column[idx]):
+                data[name] = column[idx]
+
+        result = {
+            "duration": self.durations[idx],
+            "idle_duration": self.idle_durations[idx],
+            "error": self.error(idx),
+            "scenario_output": {"data": data,
+                                "errors": self.output_errors.get(idx, "")},
+            "atomic_actions": atomic_actions
+        }
+        if not math.isnan(self.timestamps[idx]):
+            result["timestamp"] = self.timestamps[idx]
+        if not math.isnan(self.start_lags[idx]):
+            result["start_lag"] = self.start_lags[idx]
+        if not math.isnan(self.load_levels[idx]):
+            result["load_level"] = self.load_levels[idx]
+        return result
+
+    def _intern(self, string):
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = self._string_ids[string] = len(self._strings)
+            self._strings.append(string)
+        return string_id
+
+    def _append_values(self, columns, values, idx):
+        for name, value in six.iteritems(values):
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = _column(idx)
+            column.append(NAN if value is None else value)
+        for column in six.itervalues(columns):
+            if len(column) == idx:
+                column.append(NAN)
+
+    def append(self, iteration):
+        """Add result of one more iteration.
+
+        :param iteration: iteration result dict
+        """
+        idx = len(self)
+
+        atomic_actions = iteration.get("atomic_actions") or {}
+        self._append_values(self.atomic_actions, atomic_actions, idx)
+        for name, value in six.iteritems(atomic_actions):
+            if value is None:
+                self._none_actions.setdefault(name, set()).add(idx)
+
+        output = iteration.get("scenario_output") or {}
+        self._append_values(self.output_data, output.get("data") or {}, idx)
+        if output.get("errors"):
+            self.output_errors[idx] = output["errors"]
+
+        if iteration.get("error"):
+            self.errors[idx] = tuple(self._intern(s)
+                                     for s in iteration["error"])
+
+        self.timestamps.append(iteration.get("timestamp", NAN))
+        self.idle_durations.append(iteration.get("idle_duration", 0))
+        self.start_lags.append(iteration.get("start_lag", NAN))
+        self.load_levels.append(iteration.get("load_level", NAN))
+        # NOTE(rally): duration goes last because it defines the length
+        self.durations.append(iteration["duration"])
+
+    def extend(self, iterations):
+        """Add results of several iterations.
+
+        :param iterations: iterable of iteration result dicts
+        """
+        for iteration in iterations:
+            self.append(iteration)
+
+    def error(self, idx):
+        """Return error of the iteration in format [type, message, tb]."""
+        return [self._strings[i] for i in self.errors.get(idx, ())]
+
+    def is_error(self, idx):
+        return idx in self.errors
+
+    def atomic_action_durations(self, name):
+        """Return list of durations of the atomic action.
+
+        Iterations where the action was not completed are skipped.
+
+        :param name: atomic action name
+        """
+        return [d for d in self.atomic_actions.get(name, ())
+                if not math.isnan(d)]
+
+    def successful_durations(self):
+        """Return list of durations of iterations without errors."""
+        return [d for idx, d in enumerate(self.durations)
+                if idx not in self.errors]
+
+    def to_list(self):
+        """Convert to the list of iteration result dicts."""
+        return list(self)
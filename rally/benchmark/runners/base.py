@@ -16,11 +16,14 @@
 import abc
 import collections
 import multiprocessing
+import numbers
 import random
-import time
+import threading
 
 import jsonschema
+from oslo_config import cfg
 import six
+from six.moves import queue as Queue
 
 from rally.benchmark.scenarios import base as scenario_base
 from rally.benchmark import types
@@ -34,6 +37,20 @@ from rally import osclients
 
 LOG = logging.getLogger(__name__)
 
+RUNNER_OPTS = [
+    cfg.StrOpt("runner_result_validation",
+               default="fast",
+               choices=("fast", "jsonschema"),
+               help="How results of scenario iterations are validated: "
+                    "'fast' uses simple type checks equivalent to the "
+                    "result schema, 'jsonschema' validates each result "
+                    "against the JSON schema (much slower)"),
+]
+
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark", title="benchmark options")
+CONF.register_opts(RUNNER_OPTS, group=benchmark_group)
+
 
 def format_result_on_timeout(exc, timeout):
     return {
@@ -95,8 +112,126 @@ def _run_scenario_once(args):
                 "atomic_actions": scenario.atomic_actions()}
 
 
-def _worker_thread(queue, args):
-    queue.put(_run_scenario_once(args))
+class _AbandonedIterations(object):
+    """Thread-safe counter of timed out iterations that are still running."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self):
+        with self._lock:
+            self.count += 1
+            return self.count
+
+    def remove(self):
+        with self._lock:
+            self.count -= 1
+            return self.count
+
+
+_abandoned_iterations = _AbandonedIterations()
+
+
+def _run_scenario_once_with_timeout(args, timeout=0, slot=None):
+    """Run scenario once, but wait for the result no longer than timeout.
+
+    If timeout is set, the iteration is run in a separate daemon thread.
+    When it is not finished in time, the timeout result is returned instead
+    and the thread is abandoned, so the caller doesn't wait for a hung
+    iteration. The abandoned thread keeps working with the cloud, so it
+    is counted and logged until it is really finished.
+
+    If slot is given, it must be acquired by the caller. It is released
+    only when the iteration is really finished, so an abandoned iteration
+    keeps its concurrency slot busy and the number of iterations running
+    against the cloud never exceeds the number of slots.
+
+    :param args: scenario arguments, see _run_scenario_once()
+    :param timeout: iteration timeout in seconds, 0 means no timeout
+    :param slot: acquired threading.Semaphore to be released when the
+                 iteration is finished, None means no slot
+    :returns: iteration result dict
+    """
+    if not timeout:
+        try:
+            return _run_scenario_once(args)
+        finally:
+            if slot is not None:
+                slot.release()
+
+    lock = threading.Lock()
+    result = []
+    finished = []
+    abandoned = []
+
+    def run():
+        try:
+            result.append(_run_scenario_once(args))
+        finally:
+            if slot is not None:
+                slot.release()
+            with lock:
+                finished.append(True)
+                late = bool(abandoned)
+            if late:
+                LOG.info("ITER: %(iteration)s finished after the timeout, "
+                         "%(count)s timed out iteration(s) are still "
+                         "running" % {"iteration": args[0],
+                                      "count": _abandoned_iterations.remove()})
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout)
+    with lock:
+        if result:
+            return result[0]
+        if not finished:
+            abandoned.append(thread)
+    if abandoned:
+        LOG.warning("ITER: %(iteration)s timed out after %(timeout)s sec, "
+                    "%(count)s timed out iteration(s) are still running" %
+                    {"iteration": args[0], "timeout": timeout,
+                     "count": _abandoned_iterations.add()})
+    return format_result_on_timeout(multiprocessing.TimeoutError(), timeout)
+
+
+def _worker_thread(queue, args, timeout=0, slot=None):
+    """Run scenario once and put the result to the queue.
+
+    :param queue: queue object to append results
+    :param args: scenario arguments, see _run_scenario_once()
+    :param timeout: iteration timeout in seconds, 0 means no timeout
+    :param slot: acquired semaphore released when the iteration is really
+                 finished, see _run_scenario_once_with_timeout()
+    """
+    queue.put(_run_scenario_once_with_timeout(args, timeout, slot))
+
+
+def _run_worker_process(worker_process, queue, *args):
+    """Run worker process target and report its exit via the queue.
+
+    None is used as the end marker, since every real result is a dict.
+    Numbers of HTTP connections opened and reused by the worker are sent
+    as osclients.ConnectionStats right before the end marker.
+
+    :param worker_process: target function of the worker process
+    :param queue: multiprocessing.Queue that receives the results
+    :param args: the rest of arguments for the target function
+    """
+    before = osclients.get_http_connection_stats()
+    try:
+        worker_process(queue, *args)
+    finally:
+        if _abandoned_iterations.count:
+            LOG.warning("Worker is done, %s timed out iteration(s) are "
+                        "still running and will be killed with it" %
+                        _abandoned_iterations.count)
+        after = osclients.get_http_connection_stats()
+        queue.put(osclients.ConnectionStats(after.opened - before.opened,
+                                            after.reused - before.reused))
+        queue.put(None)
 
 
 def _log_worker_info(**info):
@@ -126,6 +261,12 @@ class ScenarioRunnerResult(dict):
             "idle_duration": {
                 "type": "number"
             },
+            "start_lag": {
+                "type": "number"
+            },
+            "load_level": {
+                "type": "number"
+            },
             "scenario_output": {
                 "type": "object",
                 "properties": {
@@ -159,7 +300,71 @@ class ScenarioRunnerResult(dict):
 
     def __init__(self, result_list):
         super(ScenarioRunnerResult, self).__init__(result_list)
-        jsonschema.validate(result_list, self.RESULT_SCHEMA)
+        if CONF.benchmark.runner_result_validation == "jsonschema":
+            jsonschema.validate(result_list, self.RESULT_SCHEMA)
+        else:
+            self._validate_fast(result_list)
+
+    @staticmethod
+    def _is_number(value):
+        # NOTE(rally): booleans are not numbers in terms of JSON schema
+        return (isinstance(value, numbers.Number) and
+                not isinstance(value, bool))
+
+    @classmethod
+    def _validate_fast(cls, result):
+        """Check result with plain type checks instead of jsonschema.
+
+        This is equivalent to validation against RESULT_SCHEMA, but it is
+        much cheaper, which matters because it is done for each iteration.
+
+        :raises jsonschema.ValidationError: if result is not valid
+        """
+        def fail(message, *args):
+            raise jsonschema.ValidationError(message % args)
+
+        if not isinstance(result, dict):
+            fail("%r is not of type 'object'", result)
+
+        for key, value in six.iteritems(result):
+            if key in ("duration", "timestamp", "idle_duration",
+                       "start_lag", "load_level"):
+                if not cls._is_number(value):
+                    fail("%r is not of type 'number'", value)
+            elif key == "scenario_output":
+                if not isinstance(value, dict):
+                    fail("%r is not of type 'object'", value)
+                for out_key, out_value in six.iteritems(value):
+                    if out_key == "data":
+                        if not isinstance(out_value, dict):
+                            fail("%r is not of type 'object'", out_value)
+                        for data_value in six.itervalues(out_value):
+                            if not cls._is_number(data_value):
+                                fail("%r is not of type 'number'",
+                                     data_value)
+                    elif out_key == "errors":
+                        if not isinstance(out_value, six.string_types):
+                            fail("%r is not of type 'string'", out_value)
+                    else:
+                        fail("Additional properties are not allowed "
+                             "(%r was unexpected)", out_key)
+            elif key == "atomic_actions":
+                if not isinstance(value, dict):
+                    fail("%r is not of type 'object'", value)
+                for action_value in six.itervalues(value):
+                    if (action_value is not None and
+                            not cls._is_number(action_value)):
+                        fail("%r is not of type 'number', 'null'",
+                             action_value)
+            elif key == "error":
+                if not isinstance(value, list):
+                    fail("%r is not of type 'array'", value)
+                for item in value:
+                    if not isinstance(item, six.string_types):
+                        fail("%r is not of type 'string'", item)
+            else:
+                fail("Additional properties are not allowed "
+                     "(%r was unexpected)", key)
 
 
 class ScenarioRunner(object):
@@ -174,6 +379,10 @@ class ScenarioRunner(object):
 
     CONFIG_SCHEMA = {}
 
+    # NOTE: Interval of checking that worker processes are still alive
+    #       while there are no results from them
+    QUEUE_GET_TIMEOUT = 1
+
     def __init__(self, task, config):
         """Runner constructor.
 
@@ -186,7 +395,9 @@ class ScenarioRunner(object):
         self.task = task
         self.config = config
         self.result_queue = collections.deque()
+        self.result_added = threading.Condition()
         self.aborted = multiprocessing.Event()
+        self.http_connections = osclients.ConnectionStats(0, 0)
 
     @staticmethod
     def _get_cls(runner_type):
@@ -235,28 +446,55 @@ class ScenarioRunner(object):
         # NOTE(boris-42): processing @types decorators
         args = types.preprocess(cls, method_name, context, args)
 
+        # NOTE(rally): serial runner sends requests from this process
+        before = osclients.get_http_connection_stats()
         with rutils.Timer() as timer:
             self._run_scenario(cls, method_name, context, args)
+        after = osclients.get_http_connection_stats()
+        self._add_http_connections(
+            osclients.ConnectionStats(after.opened - before.opened,
+                                      after.reused - before.reused))
+        LOG.info("Task %(task)s | HTTP connections opened: %(opened)d, "
+                 "reused: %(reused)d" %
+                 {"task": self.task["uuid"],
+                  "opened": self.http_connections.opened,
+                  "reused": self.http_connections.reused})
         return timer.duration()
 
     def abort(self):
         """Abort the execution of further benchmark scenario iterations."""
         self.aborted.set()
 
+    def wait_for_results(self, timeout=None):
+        """Block until result_queue is not empty or notify() is called.
+
+        :param timeout: max time to wait in seconds, None means forever
+        """
+        with self.result_added:
+            if not self.result_queue:
+                self.result_added.wait(timeout)
+
+    def notify(self):
+        """Wake up all the consumers that wait for results."""
+        with self.result_added:
+            self.result_added.notify_all()
+
     def _create_process_pool(self, processes_to_start, worker_process,
                              worker_args_gen):
         """Create a pool of processes with some defined target function.
 
         :param processes_to_start: number of processes to create in the pool
-        :param worker_process: target function for all processes in the pool
+        :param worker_process: target function for all processes in the pool,
+                               its first argument should be the result queue
         :param worker_args_gen: generator of arguments for the target funciton
         :returns: the process pool as a deque
         """
         process_pool = collections.deque()
 
         for i in range(processes_to_start):
-            process = multiprocessing.Process(target=worker_process,
-                                              args=next(worker_args_gen))
+            args = (worker_process,) + tuple(next(worker_args_gen))
+            process = multiprocessing.Process(target=_run_worker_process,
+                                              args=args)
             process.start()
             process_pool.append(process)
 
@@ -265,20 +503,42 @@ class ScenarioRunner(object):
     def _join_processes(self, process_pool, result_queue):
         """Join the processes in the pool and send their results to the queue.
 
+        Results are received with blocking get(), each worker process puts
+        None to the queue on exit, so no busy polling is required.
+
         :param process_pool: pool of processes to join
         :result_queue: multiprocessing.Queue that receives the results
         """
+        running = len(process_pool)
+        while running:
+            try:
+                result = result_queue.get(timeout=self.QUEUE_GET_TIMEOUT)
+            except Queue.Empty:
+                # NOTE: worker process could be killed without sending the
+                # end marker, so don't wait for it forever
+                if not any(p.is_alive() for p in process_pool):
+                    break
+                continue
+
+            if result is None:
+                running -= 1
+            elif isinstance(result, osclients.ConnectionStats):
+                self._add_http_connections(result)
+            else:
+                self._send_result(result)
+
         while process_pool:
-            while process_pool and not process_pool[0].is_alive():
-                process_pool.popleft().join()
+            process_pool.popleft().join()
+        result_queue.close()
 
-            if result_queue.empty():
-                # sleep a bit to avoid 100% usage of CPU by this method
-                time.sleep(0.001)
+    def _add_http_connections(self, stats):
+        """Add HTTP connections of a worker to the stats of the runner.
 
-            while not result_queue.empty():
-                self._send_result(result_queue.get())
-        result_queue.close()
+        :param stats: osclients.ConnectionStats of the worker
+        """
+        self.http_connections = osclients.ConnectionStats(
+            self.http_connections.opened + stats.opened,
+            self.http_connections.reused + stats.reused)
 
     def _send_result(self, result):
         """Send partial result to consumer.
@@ -287,7 +547,10 @@ class ScenarioRunner(object):
                        ScenarioRunnerResult schema, otherwise
                        ValidationError is raised.
         """
-        self.result_queue.append(ScenarioRunnerResult(result))
+        result = ScenarioRunnerResult(result)
+        with self.result_added:
+            self.result_queue.append(result)
+            self.result_added.notify_all()
 
     def _log_debug_info(self, **info):
         """Log runner parameters for debugging.
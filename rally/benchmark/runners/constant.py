@@ -13,13 +13,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import collections
 import multiprocessing
 import threading
 import time
 
 from rally.benchmark.runners import base
-from rally.benchmark import utils as butils
 from rally.common import log as logging
 from rally.common import utils
 from rally import consts
@@ -28,15 +26,52 @@ from rally import consts
 LOG = logging.getLogger(__name__)
 
 
+def _worker_thread_loop(queue, iteration_gen, timeout, times, context, cls,
+                        method_name, args, aborted, slots):
+    """Run scenario iterations one by one until the shared counter is drained.
+
+    Every thread of a worker process runs this loop, so the number of
+    threads equals the concurrency of the process and no extra bookkeeping
+    is required to keep the load constant. An iteration that exceeds the
+    timeout is abandoned, so it doesn't hold the thread, but it holds one
+    of the slots until it is really finished.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator shared among
+                          all the threads and processes
+    :param timeout: iteration timeout, 0 means no timeout
+    :param times: total number of scenario iterations to be run
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param slots: semaphore shared by the threads of the process that
+                  limits the number of running iterations
+    """
+    while not aborted.is_set():
+        slots.acquire()
+        iteration = next(iteration_gen)
+        if iteration >= times:
+            slots.release()
+            break
+        scenario_context = base._get_scenario_context(context)
+        scenario_args = (iteration, cls, method_name, scenario_context, args)
+        base._worker_thread(queue, scenario_args, timeout, slots)
+
+
 def _worker_process(queue, iteration_gen, timeout, concurrency, times, context,
                     cls, method_name, args, aborted):
     """Start the scenario within threads.
 
-    Spawn threads to support scenario execution for a fixed number of times.
-    This generates a constant load on the cloud under test by executing each
-    scenario iteration without pausing between iterations. Each thread runs
-    the scenario method once with passed scenario arguments and context.
-    After execution the result is appended to the queue.
+    Spawn a fixed pool of long-lived threads to support scenario execution
+    for a fixed number of times. This generates a constant load on the cloud
+    under test by executing each scenario iteration without pausing between
+    iterations. Each thread takes the next iteration number from the shared
+    counter, runs the scenario method once with passed scenario arguments
+    and context and appends the result to the queue, until all the
+    iterations are taken.
 
     :param queue: queue object to append results
     :param iteration_gen: next iteration number generator
@@ -51,52 +86,95 @@ def _worker_process(queue, iteration_gen, timeout, concurrency, times, context,
                     the flag is set
     """
 
-    pool = collections.deque()
-    alive_threads_in_pool = 0
-    finished_threads_in_pool = 0
-
     base._log_worker_info(times=times, concurrency=concurrency,
                           timeout=timeout, cls=cls, method_name=method_name,
                           args=args)
 
-    iteration = next(iteration_gen)
-    while iteration < times and not aborted.is_set():
+    slots = threading.Semaphore(concurrency)
+    pool = []
+    for i in range(concurrency):
+        thread = threading.Thread(
+            target=_worker_thread_loop,
+            args=(queue, iteration_gen, timeout, times, context, cls,
+                  method_name, args, aborted, slots))
+        thread.start()
+        pool.append(thread)
+
+    # Wait until all threads are done
+    for thread in pool:
+        thread.join()
+
+
+def _worker_thread_loop_for_duration(queue, iteration_gen, timeout, start,
+                                     duration, context, cls, method_name,
+                                     args, aborted, slots):
+    """Run scenario iterations one by one until the duration is over.
+
+    The first iteration is always run, even if the duration is zero.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator shared among
+                          all the threads and processes
+    :param timeout: iteration timeout
+    :param start: time when the load has been started
+    :param duration: duration of the load in seconds
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param slots: semaphore shared by the threads of the process that
+                  limits the number of running iterations
+    """
+    while not aborted.is_set():
+        slots.acquire()
+        iteration = next(iteration_gen)
+        if iteration and time.time() - start > duration:
+            slots.release()
+            break
         scenario_context = base._get_scenario_context(context)
         scenario_args = (iteration, cls, method_name, scenario_context, args)
-        worker_args = (queue, scenario_args)
+        base._worker_thread(queue, scenario_args, timeout, slots)
+
 
-        thread = threading.Thread(target=base._worker_thread,
-                                  args=worker_args)
+def _worker_process_for_duration(queue, iteration_gen, timeout, concurrency,
+                                 start, duration, context, cls, method_name,
+                                 args, aborted):
+    """Start the scenario within threads for an interval of time.
+
+    Context is passed to the process once, when it is started. After that
+    only iteration numbers are taken from the shared counter.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator
+    :param timeout: iteration timeout
+    :param concurrency: number of concurrently running scenario iterations
+    :param start: time when the load has been started
+    :param duration: duration of the load in seconds
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    """
+    base._log_worker_info(duration=duration, concurrency=concurrency,
+                          timeout=timeout, cls=cls, method_name=method_name,
+                          args=args)
+
+    slots = threading.Semaphore(concurrency)
+    pool = []
+    for i in range(concurrency):
+        thread = threading.Thread(
+            target=_worker_thread_loop_for_duration,
+            args=(queue, iteration_gen, timeout, start, duration, context,
+                  cls, method_name, args, aborted, slots))
         thread.start()
-        pool.append((thread, time.time()))
-        alive_threads_in_pool += 1
-
-        while alive_threads_in_pool == concurrency:
-            prev_finished_threads_in_pool = finished_threads_in_pool
-            finished_threads_in_pool = 0
-            for t in pool:
-                if not t[0].isAlive():
-                    finished_threads_in_pool += 1
-
-            alive_threads_in_pool -= finished_threads_in_pool
-            alive_threads_in_pool += prev_finished_threads_in_pool
-
-            if alive_threads_in_pool < concurrency:
-                # NOTE(boris-42): cleanup pool array. This is required because
-                # in other case array length will be equal to times which
-                # is unlimited big
-                while pool and not pool[0][0].isAlive():
-                    pool.popleft()[0].join()
-                    finished_threads_in_pool -= 1
-                break
-
-            # we should wait to not create big noise with these checks
-            time.sleep(0.001)
-        iteration = next(iteration_gen)
+        pool.append(thread)
 
-    # Wait until all threads are done
-    while pool:
-        pool.popleft()[0].join()
+    for thread in pool:
+        thread.join()
 
 
 class ConstantScenarioRunner(base.ScenarioRunner):
@@ -110,6 +188,13 @@ class ConstantScenarioRunner(base.ScenarioRunner):
     number of concurrent scenarios which execute during a single
     iteration in order to simulate the activities of multiple users
     placing load on the cloud under test.
+
+    An iteration that is not finished within "timeout" seconds is recorded
+    as failed with a timeout error and abandoned, but its thread keeps
+    working with the cloud. Such an iteration still counts against the
+    concurrency until it is really finished, so the next iteration waits
+    for a free slot and the real load never exceeds the concurrency.
+    Timed out iterations that are still running are counted and logged.
     """
 
     __execution_type__ = consts.RunnerType.CONSTANT
@@ -197,6 +282,13 @@ class ConstantForDurationScenarioRunner(base.ScenarioRunner):
     number of concurrent scenarios which execute during a single
     iteration in order to simulate the activities of multiple users
     placing load on the cloud under test.
+
+    An iteration that is not finished within "timeout" seconds is recorded
+    as failed with a timeout error and abandoned, but its thread keeps
+    working with the cloud. Such an iteration still counts against the
+    concurrency until it is really finished, so the next iteration waits
+    for a free slot and the real load never exceeds the concurrency.
+    Timed out iterations that are still running are counted and logged.
     """
 
     __execution_type__ = consts.RunnerType.CONSTANT_FOR_DURATION
@@ -225,17 +317,13 @@ class ConstantForDurationScenarioRunner(base.ScenarioRunner):
         "additionalProperties": False
     }
 
-    @staticmethod
-    def _iter_scenario_args(cls, method, ctx, args, aborted):
-        def _scenario_args(i):
-            if aborted.is_set():
-                raise StopIteration()
-            return (i, cls, method, base._get_scenario_context(ctx), args)
-        return _scenario_args
-
     def _run_scenario(self, cls, method, context, args):
         """Runs the specified benchmark scenario with given arguments.
 
+        Iterations are run by a fixed pool of threads inside a bounded number
+        of processes, so the context is passed to each process once at
+        startup and only iteration numbers are shared between processes.
+
         :param cls: The Scenario class where the scenario is implemented
         :param method_name: Name of the method that implements the scenario
         :param context: Benchmark context that contains users, admin & other
@@ -248,27 +336,31 @@ class ConstantForDurationScenarioRunner(base.ScenarioRunner):
         timeout = self.config.get("timeout", 600)
         concurrency = self.config.get("concurrency", 1)
         duration = self.config.get("duration")
+        iteration_gen = utils.RAMInt()
+        cpu_count = multiprocessing.cpu_count()
+        processes_to_start = min(cpu_count, concurrency)
+        concurrency_per_worker, concurrency_overhead = divmod(
+                                            concurrency, processes_to_start)
 
-        pool = multiprocessing.Pool(concurrency)
-
-        run_args = butils.infinite_run_args_generator(
-                    self._iter_scenario_args(cls, method, context, args,
-                                             self.aborted))
-        iter_result = pool.imap(base._run_scenario_once, run_args)
+        self._log_debug_info(duration=duration, concurrency=concurrency,
+                             timeout=timeout, cpu_count=cpu_count,
+                             processes_to_start=processes_to_start,
+                             concurrency_per_worker=concurrency_per_worker,
+                             concurrency_overhead=concurrency_overhead)
 
+        result_queue = multiprocessing.Queue()
         start = time.time()
-        while True:
-            try:
-                result = iter_result.next(timeout)
-            except multiprocessing.TimeoutError as e:
-                result = base.format_result_on_timeout(e, timeout)
-            except StopIteration:
-                break
-
-            self._send_result(result)
 
-            if time.time() - start > duration:
-                break
+        def worker_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, iteration_gen, timeout,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       start, duration, context, cls, method, args,
+                       self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
 
-        pool.terminate()
-        pool.join()
+        process_pool = self._create_process_pool(
+            processes_to_start, _worker_process_for_duration,
+            worker_args_gen(concurrency_overhead))
+        self._join_processes(process_pool, result_queue)
@@ -0,0 +1,159 @@
+# Copyright 2015: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+import multiprocessing
+import socket
+
+from six import moves
+
+from rally.benchmark.runners import base
+from rally.benchmark.runners import constant
+from rally.common import log as logging
+from rally import consts
+from rally import db
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _get_shard(worker_index, workers, times):
+    """Return generator of global iteration numbers of the worker.
+
+    Iterations are distributed round-robin, so all the workers start and
+    finish at the same time. The generator is shared among the threads of
+    the worker process, so it is built from C-level iterators which are
+    safe to use from several threads. When the shard is exhausted it
+    returns `times`, which tells the thread to stop.
+
+    :param worker_index: index of the worker
+    :param workers: total number of workers
+    :param times: total number of scenario iterations to be run
+    """
+    return itertools.chain(moves.range(worker_index, times, workers),
+                           itertools.repeat(times))
+
+
+class DistributedScenarioRunner(base.ScenarioRunner):
+    """Creates constant load shared among several workers.
+
+    Iterations are sharded across worker processes by worker index, each
+    worker runs its iterations with a fixed number of threads and streams
+    results back to the runner. All the results are merged into the single
+    task result, iterations have global numbers and SLA is checked for the
+    whole load.
+
+    Workers are started locally as separate processes, which makes the
+    runner a stand-in for load generation from several hosts. Workers are
+    registered in Rally database only to make them visible while the
+    scenario runs, the records are not used for sharding.
+    """
+
+    __execution_type__ = consts.RunnerType.DISTRIBUTED
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "type": {
+                "type": "string"
+            },
+            "workers": {
+                "type": "integer",
+                "minimum": 1
+            },
+            "concurrency": {
+                "type": "integer",
+                "minimum": 1
+            },
+            "times": {
+                "type": "integer",
+                "minimum": 1
+            },
+            "timeout": {
+                "type": "number",
+                "minimum": 1
+            }
+        },
+        "required": ["type"],
+        "additionalProperties": False
+    }
+
+    def _register_workers(self, count):
+        hostnames = []
+        try:
+            for i in range(count):
+                hostname = "%s-%s-%d" % (socket.gethostname(),
+                                         self.task["uuid"], i)
+                db.register_worker({"hostname": hostname})
+                hostnames.append(hostname)
+        except Exception:
+            self._unregister_workers(hostnames)
+            raise
+        return hostnames
+
+    def _unregister_workers(self, hostnames):
+        for hostname in hostnames:
+            try:
+                db.unregister_worker(hostname)
+            except Exception as e:
+                LOG.warning("Failed to unregister worker %(worker)s: "
+                            "%(error)s" % {"worker": hostname, "error": e})
+
+    def _run_scenario(self, cls, method_name, context, args):
+        """Runs the specified benchmark scenario with given arguments.
+
+        :param cls: The Scenario class where the scenario is implemented
+        :param method_name: Name of the method that implements the scenario
+        :param context: Benchmark context that contains users, admin & other
+                        information, that was created before benchmark started.
+        :param args: Arguments to call the scenario method with
+
+        :returns: List of results fore each single scenario iteration,
+                  where each result is a dictionary
+        """
+        timeout = self.config.get("timeout", 0)  # 0 means no timeout
+        times = self.config.get("times", 1)
+        concurrency = self.config.get("concurrency", 1)
+        workers = min(self.config.get("workers",
+                                      multiprocessing.cpu_count()),
+                      times, concurrency)
+        concurrency_per_worker, concurrency_overhead = divmod(concurrency,
+                                                              workers)
+
+        hostnames = self._register_workers(workers)
+
+        self._log_debug_info(times=times, concurrency=concurrency,
+                             timeout=timeout, workers=hostnames,
+                             concurrency_per_worker=concurrency_per_worker,
+                             concurrency_overhead=concurrency_overhead)
+
+        result_queue = multiprocessing.Queue()
+
+        def worker_args_gen(concurrency_overhead):
+            for i in range(workers):
+                yield (result_queue, _get_shard(i, workers, times), timeout,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       times, context, cls, method_name, args, self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
+
+        try:
+            process_pool = self._create_process_pool(
+                workers, constant._worker_process,
+                worker_args_gen(concurrency_overhead))
+            self._join_processes(process_pool, result_queue)
+        finally:
+            self._unregister_workers(hostnames)
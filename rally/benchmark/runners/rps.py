@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import array
 import collections
 import multiprocessing
 import random
@@ -51,6 +52,7 @@ def _worker_process(queue, iteration_gen, timeout, rps, times,
     """
 
     pool = collections.deque()
+    slots = threading.BoundedSemaphore(max_concurrent)
     start = time.time()
     sleep = 1.0 / rps
 
@@ -68,7 +70,10 @@ def _worker_process(queue, iteration_gen, timeout, rps, times,
         scenario_context = base._get_scenario_context(context)
         scenario_args = (next(iteration_gen), cls, method_name,
                          scenario_context, args)
-        worker_args = (queue, scenario_args)
+        worker_args = (queue, scenario_args, timeout, slots)
+        # NOTE(rally): timed out iterations still hold their slots, so
+        #              threads abandoned by them are counted too
+        slots.acquire()
         thread = threading.Thread(target=base._worker_thread,
                                   args=worker_args)
         i += 1
@@ -96,6 +101,108 @@ def _worker_process(queue, iteration_gen, timeout, rps, times,
         thr.join()
 
 
+def _get_schedule(arrival, rps, times, start_rps=None):
+    """Calculate start times of iterations for open-loop load.
+
+    :param arrival: arrival pattern, one of "constant", "poisson", "ramp"
+    :param rps: target number of iterations per second (for "ramp" it is
+                the rate reached at the last iteration)
+    :param times: total number of iterations
+    :param start_rps: rate of the first iteration for "ramp" arrival
+    :returns: array of start times of iterations, in seconds from the
+              beginning of the load
+    """
+    schedule = array.array("d")
+    offset = 0.0
+    for i in range(times):
+        if arrival == "constant":
+            # NOTE(rally): calculated from the iteration number rather than
+            #              accumulated, so float errors do not add up
+            offset = float(i) / rps
+        schedule.append(offset)
+        if arrival == "poisson":
+            offset += random.expovariate(rps)
+        elif arrival == "ramp":
+            progress = float(i) / (times - 1) if times > 1 else 1.0
+            offset += 1.0 / (start_rps + (rps - start_rps) * progress)
+    return schedule
+
+
+def _scheduled_worker_thread(queue, args, timeout, scheduled_at, slots):
+    """Run scenario once and record how late it was started.
+
+    :param queue: queue object to append results
+    :param args: scenario arguments, see base._run_scenario_once()
+    :param timeout: iteration timeout, 0 means no timeout
+    :param scheduled_at: time when iteration should have been started
+    :param slots: semaphore limiting number of concurrent iterations,
+                  released once the iteration is really finished, even if
+                  it has timed out
+    """
+    start_lag = time.time() - scheduled_at
+    result = base._run_scenario_once_with_timeout(args, timeout, slots)
+    result["start_lag"] = start_lag
+    queue.put(result)
+
+
+def _open_loop_worker_process(queue, iteration_gen, timeout, times, schedule,
+                              start, max_concurrent, context, cls,
+                              method_name, args, aborted):
+    """Start scenario iterations at the scheduled moments.
+
+    Iterations are taken from the generator shared between all processes,
+    and each of them is started at start + schedule[iteration], independently
+    of how long previous iterations take. Since the schedule is absolute,
+    inaccuracy of sleeps does not accumulate. A new iteration is delayed
+    only if max_concurrent iterations are already running in this process.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator
+    :param timeout: operation's timeout
+    :param times: total number of scenario iterations to be run
+    :param schedule: start times of iterations relative to start
+    :param start: time when load starts, shared by all processes
+    :param max_concurrent: maximum worker concurrency
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    """
+    pool = collections.deque()
+    slots = threading.BoundedSemaphore(max_concurrent)
+
+    base._log_worker_info(times=times, timeout=timeout,
+                          max_concurrent=max_concurrent, cls=cls,
+                          method_name=method_name, args=args)
+
+    while not aborted.is_set():
+        iteration = next(iteration_gen)
+        if iteration >= times:
+            break
+
+        scheduled_at = start + schedule[iteration]
+        delay = scheduled_at - time.time()
+        if delay > 0 and aborted.wait(delay):
+            break
+
+        slots.acquire()
+        scenario_context = base._get_scenario_context(context)
+        scenario_args = (iteration, cls, method_name, scenario_context, args)
+        thread = threading.Thread(target=_scheduled_worker_thread,
+                                  args=(queue, scenario_args, timeout,
+                                        scheduled_at, slots))
+        thread.start()
+        pool.append(thread)
+
+        while pool and not pool[0].isAlive():
+            pool.popleft().join()
+
+    while pool:
+        pool.popleft().join()
+
+
 class RPSScenarioRunner(base.ScenarioRunner):
     """Scenario runner that does the job with specified frequency.
 
@@ -106,6 +213,20 @@ class RPSScenarioRunner(base.ScenarioRunner):
     An example of a rps scenario is booting 1 VM onse per second. This
     execution type is thus very helpful in understanding the maximal load that
     a certain cloud can handle.
+
+    If "arrival" is set, the runner works in open-loop mode: start time of
+    each iteration is calculated in advance with the given arrival pattern
+    ("constant", "poisson" or "ramp" from "start_rps" to "rps"), so the rate
+    does not depend on durations of iterations as long as there are no more
+    than "max_concurrency" of them running. The difference between scheduled
+    and actual start time of the iteration is saved as "start_lag".
+
+    An iteration that is not finished within "timeout" seconds is recorded
+    as failed with a timeout error and abandoned, but its thread keeps
+    working with the cloud. Such an iteration still counts against
+    "max_concurrency" until it is really finished, so timed out iterations
+    can't make the real concurrency higher than configured. Timed out
+    iterations that are still running are counted and logged.
     """
 
     __execution_type__ = consts.RunnerType.RPS
@@ -132,6 +253,15 @@ class RPSScenarioRunner(base.ScenarioRunner):
                 "type": "integer",
                 "minimum": 1
             },
+            "arrival": {
+                "type": "string",
+                "enum": ["constant", "poisson", "ramp"]
+            },
+            "start_rps": {
+                "type": "number",
+                "exclusiveMinimum": True,
+                "minimum": 0
+            },
         },
         "additionalProperties": False
     }
@@ -153,6 +283,9 @@ class RPSScenarioRunner(base.ScenarioRunner):
         :returns: List of results fore each single scenario iteration,
                   where each result is a dictionary
         """
+        if "arrival" in self.config:
+            return self._run_open_loop(cls, method_name, context, args)
+
         times = self.config["times"]
         timeout = self.config.get("timeout", 0)  # 0 means no timeout
         iteration_gen = utils.RAMInt()
@@ -204,3 +337,39 @@ class RPSScenarioRunner(base.ScenarioRunner):
             processes_to_start, _worker_process,
             worker_args_gen(times_overhead, concurrency_overhead))
         self._join_processes(process_pool, result_queue)
+
+    def _run_open_loop(self, cls, method_name, context, args):
+        times = self.config["times"]
+        timeout = self.config.get("timeout", 0)  # 0 means no timeout
+        max_concurrency = self.config.get("max_concurrency", times)
+        iteration_gen = utils.RAMInt()
+        cpu_count = multiprocessing.cpu_count()
+        processes_to_start = min(cpu_count, times, max_concurrency)
+        concurrency_per_worker, concurrency_overhead = divmod(
+            max_concurrency, processes_to_start)
+
+        schedule = _get_schedule(self.config["arrival"], self.config["rps"],
+                                 times, self.config.get("start_rps", 1))
+
+        self._log_debug_info(times=times, timeout=timeout, cpu_count=cpu_count,
+                             processes_to_start=processes_to_start,
+                             arrival=self.config["arrival"],
+                             concurrency_per_worker=concurrency_per_worker,
+                             concurrency_overhead=concurrency_overhead)
+
+        result_queue = multiprocessing.Queue()
+        start = time.time()
+
+        def worker_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, iteration_gen, timeout, times, schedule,
+                       start,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       context, cls, method_name, args, self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
+
+        process_pool = self._create_process_pool(
+            processes_to_start, _open_loop_worker_process,
+            worker_args_gen(concurrency_overhead))
+        self._join_processes(process_pool, result_queue)
@@ -0,0 +1,192 @@
+# Copyright 2015: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import array
+import multiprocessing
+import time
+
+from rally.benchmark.runners import base
+from rally.benchmark.runners import constant
+from rally.benchmark.runners import rps
+from rally.common import log as logging
+from rally.common import utils
+from rally import consts
+
+
+LOG = logging.getLogger(__name__)
+
+
+class StepScenarioRunner(base.ScenarioRunner):
+    """Increases the load in steps to find the saturation point of a cloud.
+
+    The load starts at "start" and is increased by "step" after each
+    "times" iterations, "steps" levels in total. The load is either the
+    number of concurrently running iterations ("load": "concurrency", the
+    same as constant runner), or the number of iterations started per
+    second ("load": "rps", the same as open-loop rps runner).
+
+    Each iteration result is tagged with "load_level", so throughput and
+    latency of every step are reported separately and the point where
+    the latency starts to grow is visible from a single run.
+    """
+
+    __execution_type__ = consts.RunnerType.STEP
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "type": {
+                "type": "string"
+            },
+            "load": {
+                "type": "string",
+                "enum": ["concurrency", "rps"]
+            },
+            "start": {
+                "type": "integer",
+                "minimum": 1
+            },
+            "step": {
+                "type": "integer",
+                "minimum": 1
+            },
+            "steps": {
+                "type": "integer",
+                "minimum": 1
+            },
+            "times": {
+                "type": "integer",
+                "minimum": 1
+            },
+            "max_concurrency": {
+                "type": "integer",
+                "minimum": 1
+            },
+            "timeout": {
+                "type": "number",
+                "minimum": 1
+            }
+        },
+        "required": ["type", "steps", "times"],
+        "additionalProperties": False
+    }
+
+    def __init__(self, task, config):
+        super(StepScenarioRunner, self).__init__(task, config)
+        self.load_level = None
+
+    def _send_result(self, result):
+        result["load_level"] = self.load_level
+        super(StepScenarioRunner, self)._send_result(result)
+
+    def _run_concurrency_step(self, iteration_gen, last_iteration, level,
+                              cls, method_name, context, args):
+        processes_to_start = min(multiprocessing.cpu_count(),
+                                 self.config["times"], level)
+        concurrency_per_worker, concurrency_overhead = divmod(
+            level, processes_to_start)
+        timeout = self.config.get("timeout", 0)
+        result_queue = multiprocessing.Queue()
+
+        def worker_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, iteration_gen, timeout,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       last_iteration, context, cls, method_name, args,
+                       self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
+
+        process_pool = self._create_process_pool(
+            processes_to_start, constant._worker_process,
+            worker_args_gen(concurrency_overhead))
+        self._join_processes(process_pool, result_queue)
+
+    def _run_rps_step(self, iteration_gen, last_iteration, level,
+                      cls, method_name, context, args):
+        times = self.config["times"]
+        max_concurrency = self.config.get("max_concurrency", times)
+        processes_to_start = min(multiprocessing.cpu_count(), times,
+                                 max_concurrency)
+        concurrency_per_worker, concurrency_overhead = divmod(
+            max_concurrency, processes_to_start)
+        timeout = self.config.get("timeout", 0)
+
+        # NOTE(rally): schedule is indexed by the global iteration number,
+        #              iterations of the previous steps are never started
+        schedule = (array.array("d", [0.0]) * (last_iteration - times) +
+                    rps._get_schedule("constant", level, times))
+        result_queue = multiprocessing.Queue()
+        start = time.time()
+
+        def worker_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, iteration_gen, timeout, last_iteration,
+                       schedule, start,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       context, cls, method_name, args, self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
+
+        process_pool = self._create_process_pool(
+            processes_to_start, rps._open_loop_worker_process,
+            worker_args_gen(concurrency_overhead))
+        self._join_processes(process_pool, result_queue)
+
+    def _run_scenario(self, cls, method_name, context, args):
+        """Runs the specified benchmark scenario with given arguments.
+
+        Steps are run one after another, each of them with its own pool of
+        processes. Iteration numbers are global for the whole run.
+
+        :param cls: The Scenario class where the scenario is implemented
+        :param method_name: Name of the method that implements the scenario
+        :param context: Benchmark context that contains users, admin & other
+                        information, that was created before benchmark started.
+        :param args: Arguments to call the scenario method with
+
+        :returns: List of results fore each single scenario iteration,
+                  where each result is a dictionary
+        """
+        load = self.config.get("load", "concurrency")
+        start = self.config.get("start", 1)
+        step = self.config.get("step", 1)
+        steps = self.config["steps"]
+        times = self.config["times"]
+        iteration_gen = utils.RAMInt()
+
+        self._log_debug_info(load=load, start=start, step=step, steps=steps,
+                             times=times,
+                             timeout=self.config.get("timeout", 0))
+
+        run_step = (self._run_rps_step if load == "rps"
+                    else self._run_concurrency_step)
+
+        for i in range(steps):
+            if self.aborted.is_set():
+                break
+            self.load_level = start + i * step
+            # NOTE(rally): workers of the previous step take a few extra
+            #              numbers from the counter before they stop
+            iteration_gen.reset(i * times)
+            with utils.Timer() as timer:
+                run_step(iteration_gen, (i + 1) * times, self.load_level,
+                         cls, method_name, context, args)
+            LOG.info("Task %(task)s | %(load)s %(level)s: %(times)s "
+                     "iterations in %(duration).2f sec" %
+                     {"task": self.task["uuid"], "load": load,
+                      "level": self.load_level, "times": times,
+                      "duration": timer.duration()})
@@ -27,7 +27,7 @@ class Authenticate(base.Scenario):
     @base.scenario()
     def keystone(self):
         """Check Keystone Client."""
-        self.clients("keystone")
+        self._clients.keystone(use_cache=False)
 
     @validation.number("repetitions", minval=1)
     @validation.required_openstack(users=True)
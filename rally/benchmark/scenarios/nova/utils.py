@@ -371,17 +371,18 @@ class NovaScenario(base.Scenario):
         # NOTE(msdubov): Nova python client returns only one server even when
         #                min_count > 1, so we have to rediscover all the
         #                created servers manually.
-        servers = filter(lambda server: server.name.startswith(name_prefix),
-                         self.clients("nova").servers.list())
+        servers = [server for server in self.clients("nova").servers.list()
+                   if server.name.startswith(name_prefix)]
         time.sleep(CONF.benchmark.nova_server_boot_prepoll_delay)
-        servers = [bench_utils.wait_for(
-            server,
+        # NOTE(rally): servers are booting at the same time, so they are
+        #              polled together instead of one after another
+        servers = bench_utils.wait_for_all(
+            servers,
             is_ready=bench_utils.resource_is("ACTIVE"),
-            update_resource=bench_utils.
-            get_from_manager(),
+            update_resource=bench_utils.get_from_manager(),
             timeout=CONF.benchmark.nova_server_boot_timeout,
             check_interval=CONF.benchmark.nova_server_boot_poll_interval
-        ) for server in servers]
+        )
         return servers
 
     @base.atomic_action_timer("nova.associate_floating_ip")
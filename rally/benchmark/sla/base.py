@@ -24,6 +24,7 @@ import abc
 import jsonschema
 import six
 
+from rally.benchmark.processing import utils as processing_utils
 from rally.common.i18n import _
 from rally.common import utils
 from rally import consts
@@ -203,10 +204,136 @@ class MaxAverageDuration(SLA):
         if not iteration.get("error"):
             self.total_duration += iteration["duration"]
             self.iterations += 1
-        self.avg = self.total_duration / self.iterations
+            self.avg = self.total_duration / self.iterations
         self.success = self.avg <= self.criterion_value
         return self.success
 
     def details(self):
         return (_("Maximum average duration of one iteration %.2fs <= %.2fs - "
                   "%s") % (self.avg, self.criterion_value, self.status()))
+
+
+class PercentileDuration(SLA):
+    """Maximum percentiles of iteration and atomic action durations.
+
+    Percentiles are checked by counting iterations that are not slower
+    than the limit (nearest-rank percentile), so the criterion takes
+    constant memory and can abort a load of any length. The load is not
+    aborted before a percentile has 100 / (100 - percentile) durations,
+    while a single slow iteration is enough to fail it.
+    """
+    OPTION_NAME = "max_percentile_duration"
+    PERCENTILES_SCHEMA = {
+        "type": "object",
+        "properties": dict((name, {"type": "number", "minimum": 0.0,
+                                   "exclusiveMinimum": True})
+                           for name, percent in processing_utils.PERCENTILES),
+        "additionalProperties": False
+    }
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": dict(
+            PERCENTILES_SCHEMA["properties"],
+            atomic_actions={"type": "object",
+                            "additionalProperties": PERCENTILES_SCHEMA}),
+        "additionalProperties": False
+    }
+
+    def __init__(self, criterion_value):
+        super(PercentileDuration, self).__init__(criterion_value)
+        # NOTE(rally): limits are (atomic action, percentile, max duration),
+        #              atomic action is None for the whole iteration
+        self.limits = [(None, name, limit) for name, limit
+                       in sorted(criterion_value.items())
+                       if name != "atomic_actions"]
+        for action, limits in sorted(
+                criterion_value.get("atomic_actions", {}).items()):
+            self.limits.extend((action, name, limit)
+                               for name, limit in sorted(limits.items()))
+        self.counts = dict((action, 0) for action, name, limit in self.limits)
+        self.within_limit = [0] * len(self.limits)
+        self.min_counts = [-(-100 // (100 - int(name[1:])))
+                           for action, name, limit in self.limits]
+
+    def add_iteration(self, iteration):
+        durations = dict(iteration.get("atomic_actions") or {})
+        durations[None] = (None if iteration.get("error")
+                           else iteration["duration"])
+        for action in self.counts:
+            if durations.get(action) is not None:
+                self.counts[action] += 1
+        for idx, (action, name, limit) in enumerate(self.limits):
+            duration = durations.get(action)
+            if duration is not None and duration <= limit:
+                self.within_limit[idx] += 1
+        passed = [self._passed(idx) for idx in range(len(self.limits))]
+        self.success = all(passed)
+        return all(passed[idx] or
+                   self.counts[action] < self.min_counts[idx]
+                   for idx, (action, name, limit) in enumerate(self.limits))
+
+    def _passed(self, idx):
+        action, name, limit = self.limits[idx]
+        # NOTE(rally): p95 <= limit if at least 95% of durations are within
+        #              the limit, integers make the comparison exact
+        return self.within_limit[idx] * 100 >= (int(name[1:]) *
+                                                self.counts[action])
+
+    def details(self):
+        checks = []
+        for idx, (action, name, limit) in enumerate(self.limits):
+            count = self.counts[action]
+            checks.append(
+                _("%(action)s %(percentile)s <= %(limit).2fs "
+                  "(%(within).1f%% of %(count)d)") %
+                {"action": action or _("iteration"), "percentile": name,
+                 "limit": limit, "count": count,
+                 "within": (self.within_limit[idx] * 100.0 / count
+                            if count else 100.0)})
+        return (_("Maximum percentile durations: %s - %s") %
+                ("; ".join(checks), self.status()))
+
+
+class MinThroughput(SLA):
+    """Minimum throughput in successful iterations per second.
+
+    Throughput is the number of successful iterations divided by the time
+    from the start of the first iteration to the end of the last one. It
+    is not known until the load is finished, so the criterion is checked
+    only when its result is requested and never aborts the load.
+    """
+    OPTION_NAME = "min_throughput"
+    CONFIG_SCHEMA = {"type": "number", "minimum": 0.0,
+                     "exclusiveMinimum": True}
+
+    def __init__(self, criterion_value):
+        super(MinThroughput, self).__init__(criterion_value)
+        self.successes = 0
+        self.started = None
+        self.finished = None
+        self.throughput = None
+
+    def add_iteration(self, iteration):
+        if not iteration.get("error"):
+            self.successes += 1
+        if "timestamp" in iteration:
+            finished = (iteration["timestamp"] + iteration["duration"] +
+                        iteration.get("idle_duration", 0))
+            if self.started is None or iteration["timestamp"] < self.started:
+                self.started = iteration["timestamp"]
+            if self.finished is None or finished > self.finished:
+                self.finished = finished
+        return True
+
+    def result(self):
+        if self.started is not None and self.finished > self.started:
+            self.throughput = self.successes / (self.finished - self.started)
+            self.success = self.throughput >= self.criterion_value
+        return super(MinThroughput, self).result()
+
+    def details(self):
+        throughput = ("%.2f" % self.throughput
+                      if self.throughput is not None else "n/a")
+        return (_("Minimum throughput %s >= %.2f iterations/sec - %s") %
+                (throughput, self.criterion_value, self.status()))
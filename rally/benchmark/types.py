@@ -14,9 +14,11 @@
 #    under the License.
 
 import abc
+import collections
 import copy
 import operator
 import re
+import threading
 
 from rally.benchmark.scenarios import base
 from rally import exceptions
@@ -62,6 +64,112 @@ def preprocess(cls, method_name, context, args):
     return processed_args
 
 
+class ResourceIndex(object):
+    """Resources indexed for lookups by name and by name pattern."""
+
+    def __init__(self, resources, get_name=operator.attrgetter("name")):
+        """Build the name index.
+
+        :param resources: iterable containing all resources
+        :param get_name: function which returns name of the resource
+        """
+        self.resources = list(resources)
+        self._get_name = get_name
+        self._by_name = collections.defaultdict(list)
+        for resource in self.resources:
+            self._by_name[get_name(resource)].append(resource)
+        self._by_pattern = {}
+
+    def find_by_name(self, name):
+        """Return list of resources with exactly the same name."""
+        return self._by_name.get(name, [])
+
+    def find_by_pattern(self, pattern):
+        """Return list of resources which names match the regex pattern."""
+        matching = self._by_pattern.get(pattern)
+        if matching is None:
+            regex = re.compile(pattern)
+            matching = [resource for resource in self.resources
+                        if regex.search(self._get_name(resource))]
+            self._by_pattern[pattern] = matching
+        return matching
+
+
+_active_caches = []
+
+
+def get_resource_cache():
+    """Return the cache entered last or None if there is no one."""
+    return _active_caches[-1] if _active_caches else None
+
+
+class ResourceCache(object):
+    """Task scoped cache of listed resources.
+
+    While the cache is entered, resource types look resources up in it
+    instead of listing all the resources for every lookup, so scenario
+    preprocessing, validation and contexts of a task share listings.
+    Resources are listed separately for each endpoint, as different
+    users may see different resources.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def __enter__(self):
+        _active_caches.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        _active_caches.remove(self)
+
+    def get(self, key, list_resources, refresh=False, **kwargs):
+        """Return ResourceIndex of resources, list them if required.
+
+        :param key: hashable key of the listing
+        :param list_resources: function which lists all resources
+        :param refresh: list resources even if they are cached
+        :param kwargs: additional arguments of ResourceIndex
+        """
+        with self._lock:
+            index = self._indexes.get(key)
+        if index is None or refresh:
+            index = ResourceIndex(list_resources(), **kwargs)
+            with self._lock:
+                self._indexes[key] = index
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+def _find(clients, resource_type, list_resources, find, **kwargs):
+    """Look resource up in listing shared within the task, if possible.
+
+    In case of a miss resources are listed again, as the resource may be
+    created after the listing, e.g. by a context.
+
+    :param clients: openstack client handles used to list resources
+    :param resource_type: name of the type of resources
+    :param list_resources: function which lists all resources
+    :param find: function which takes ResourceIndex and returns resource,
+                 raises InvalidScenarioArgument if it is not found
+    :param kwargs: additional arguments of ResourceIndex
+    """
+    cache = get_resource_cache()
+    if cache is None:
+        return find(ResourceIndex(list_resources(), **kwargs))
+
+    key = (resource_type, tuple(sorted(
+        clients.endpoint.to_dict(include_permission=True).items())))
+    try:
+        return find(cache.get(key, list_resources, **kwargs))
+    except exceptions.InvalidScenarioArgument:
+        return find(cache.get(key, list_resources, refresh=True, **kwargs))
+
+
 class ResourceType(object):
 
     @classmethod
@@ -86,15 +194,17 @@ def obj_from_name(resource_config, resources, typename):
     not match unambiguously.
 
     :param resource_config: resource to be transformed
-    :param resources: iterable containing all resources
+    :param resources: iterable containing all resources or ResourceIndex
     :param typename: name which describes the type of resource
 
     :returns: resource object uniquely mapped to `name` or `regex`
     """
+    if not isinstance(resources, ResourceIndex):
+        resources = ResourceIndex(resources)
+
     if "name" in resource_config:
         # In a case of pattern string exactly matches resource name
-        matching_exact = [resource for resource in resources
-                          if resource.name == resource_config["name"]]
+        matching_exact = resources.find_by_name(resource_config["name"])
         if len(matching_exact) == 1:
             return matching_exact[0]
         elif len(matching_exact) > 1:
@@ -116,18 +226,16 @@ def obj_from_name(resource_config, resources, typename):
             "in '{resource_config}' ".format(typename=typename.title(),
                                              resource_config=resource_config))
 
-    pattern = re.compile(patternstr)
-    matching = [resource for resource in resources
-                if re.search(pattern, resource.name)]
+    matching = resources.find_by_pattern(patternstr)
     if not matching:
         raise exceptions.InvalidScenarioArgument(
             "{typename} with pattern '{pattern}' not found".format(
-                typename=typename.title(), pattern=pattern.pattern))
+                typename=typename.title(), pattern=patternstr))
     elif len(matching) > 1:
         raise exceptions.InvalidScenarioArgument(
             "{typename} with name '{pattern}' is ambiguous, possible matches "
             "by id: {ids}".format(typename=typename.title(),
-                                  pattern=pattern.pattern,
+                                  pattern=patternstr,
                                   ids=", ".join(map(operator.attrgetter("id"),
                                                     matching))))
     return matching[0]
@@ -143,7 +251,7 @@ def _id_from_name(resource_config, resources, typename):
     not match unambiguously.
 
     :param resource_config: resource to be transformed
-    :param resources: iterable containing all resources
+    :param resources: iterable containing all resources or ResourceIndex
     :param typename: name which describes the type of resource
 
     :returns: resource id uniquely mapped to `name` or `regex`
@@ -164,10 +272,11 @@ class FlavorResourceType(ResourceType):
         """
         resource_id = resource_config.get("id")
         if not resource_id:
-            novaclient = clients.nova()
-            resource_id = _id_from_name(resource_config=resource_config,
-                                        resources=novaclient.flavors.list(),
-                                        typename="flavor")
+            resource_id = _find(
+                clients, "flavor", lambda: clients.nova().flavors.list(),
+                lambda flavors: _id_from_name(resource_config=resource_config,
+                                              resources=flavors,
+                                              typename="flavor"))
         return resource_id
 
 
@@ -184,11 +293,11 @@ class ImageResourceType(ResourceType):
         """
         resource_id = resource_config.get("id")
         if not resource_id:
-            glanceclient = clients.glance()
-            resource_id = _id_from_name(resource_config=resource_config,
-                                        resources=list(
-                                            glanceclient.images.list()),
-                                        typename="image")
+            resource_id = _find(
+                clients, "image", lambda: clients.glance().images.list(),
+                lambda images: _id_from_name(resource_config=resource_config,
+                                             resources=images,
+                                             typename="image"))
         return resource_id
 
 
@@ -205,11 +314,12 @@ class VolumeTypeResourceType(ResourceType):
         """
         resource_id = resource_config.get("id")
         if not resource_id:
-            cinderclient = clients.cinder()
-            resource_id = _id_from_name(resource_config=resource_config,
-                                        resources=cinderclient.
-                                        volume_types.list(),
-                                        typename="volume_type")
+            resource_id = _find(
+                clients, "volume_type",
+                lambda: clients.cinder().volume_types.list(),
+                lambda volume_types: _id_from_name(
+                    resource_config=resource_config, resources=volume_types,
+                    typename="volume_type"))
         return resource_id
 
 
@@ -227,15 +337,19 @@ class NeutronNetworkResourceType(ResourceType):
         resource_id = resource_config.get("id")
         if resource_id:
             return resource_id
-        else:
-            neutronclient = clients.neutron()
-            for net in neutronclient.list_networks()["networks"]:
-                if net["name"] == resource_config.get("name"):
-                    return net["id"]
 
-        raise exceptions.InvalidScenarioArgument(
-            "Neutron network with name '{name}' not found".format(
-                name=resource_config.get("name")))
+        def find(networks):
+            matching = networks.find_by_name(resource_config.get("name"))
+            if not matching:
+                raise exceptions.InvalidScenarioArgument(
+                    "Neutron network with name '{name}' not found".format(
+                        name=resource_config.get("name")))
+            return matching[0]["id"]
+
+        return _find(
+            clients, "network",
+            lambda: clients.neutron().list_networks()["networks"], find,
+            get_name=operator.itemgetter("name"))
 
 
 class FileType(ResourceType):
@@ -13,11 +13,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import itertools
+import random
+import threading
 import time
 import traceback
 
 from novaclient import exceptions as nova_exc
+from oslo_config import cfg
 import six
 
 from rally.common import log as logging
@@ -26,6 +30,36 @@ from rally import exceptions
 
 LOG = logging.getLogger(__name__)
 
+POLLER_OPTS = [
+    cfg.BoolOpt("batch_status_polling",
+                default=False,
+                help="Poll statuses of resources of the same type and "
+                     "tenant that are waited for at the same time with one "
+                     "list() call instead of one get() call per resource"),
+    cfg.StrOpt("poll_interval_policy",
+               default="constant",
+               choices=("constant", "backoff", "learned"),
+               help="How intervals between resource status checks are "
+                    "chosen: 'constant' uses the check interval of the "
+                    "action, 'backoff' starts with poll_min_interval and "
+                    "doubles it up to the check interval, 'learned' first "
+                    "waits for the median time of previous waits for the "
+                    "same resource type and status, then backs off"),
+    cfg.FloatOpt("poll_min_interval",
+                 default=0.1,
+                 help="First interval between status checks of 'backoff' "
+                      "and 'learned' poll interval policies"),
+    cfg.FloatOpt("poll_jitter",
+                 default=0.1,
+                 help="Random deviation of intervals of 'backoff' and "
+                      "'learned' poll interval policies, as a fraction of "
+                      "the interval"),
+]
+
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark", title="benchmark options")
+CONF.register_opts(POLLER_OPTS, group=benchmark_group)
+
 
 def get_status(resource):
     # workaround for heat resources - using stack_status instead of status
@@ -46,6 +80,19 @@ class resource_is(object):
         return str(self.desired_status)
 
 
+def _check_status(resource, error_statuses):
+    # catch abnormal status, such as "no valid host" for servers
+    status = get_status(resource)
+
+    if status in ("DELETED", "DELETE_COMPLETE"):
+        raise exceptions.GetResourceNotFound(resource=resource)
+    if status in error_statuses:
+        raise exceptions.GetResourceErrorStatus(resource=resource,
+                                                status=status, fault="")
+
+    return resource
+
+
 def get_from_manager(error_statuses=None):
     error_statuses = error_statuses or ["ERROR"]
     error_statuses = map(lambda str: str.upper(), error_statuses)
@@ -59,17 +106,10 @@ def get_from_manager(error_statuses=None):
                 raise exceptions.GetResourceNotFound(resource=resource)
             raise exceptions.GetResourceFailure(resource=resource, err=e)
 
-        # catch abnormal status, such as "no valid host" for servers
-        status = get_status(res)
-
-        if status in ("DELETED", "DELETE_COMPLETE"):
-            raise exceptions.GetResourceNotFound(resource=res)
-        if status in error_statuses:
-            raise exceptions.GetResourceErrorStatus(resource=res,
-                                                    status=status, fault="")
-
-        return res
+        return _check_status(res, error_statuses)
 
+    # NOTE(rally): allows StatusPoller to check resources got with list()
+    _get_from_manager.error_statuses = error_statuses
     return _get_from_manager
 
 
@@ -79,6 +119,320 @@ def manager_list_size(sizes):
     return _list
 
 
+class ConstantPollPolicy(object):
+    """Checks the resource status with the same interval."""
+
+    def __init__(self, check_interval, key=None):
+        """Create policy for a single wait.
+
+        :param check_interval: interval set for the wait by the caller
+        :param key: hashable key of the kind of wait, e.g. resource type
+                    and desired status
+        """
+        self.check_interval = check_interval
+        self.key = key
+
+    def next_interval(self):
+        """Return time to sleep before the next status check."""
+        return self.check_interval
+
+    def finished(self, duration):
+        """Report that the wait has been successfully finished.
+
+        :param duration: time spent on the wait
+        """
+
+
+class BackoffPollPolicy(ConstantPollPolicy):
+    """Exponential backoff with jitter, up to the check interval.
+
+    Fast actions are noticed soon after they are finished, while slow ones
+    are not polled more often than with the constant policy.
+    """
+
+    def __init__(self, check_interval, key=None):
+        super(BackoffPollPolicy, self).__init__(check_interval, key)
+        self._interval = min(CONF.benchmark.poll_min_interval,
+                             check_interval)
+
+    def _jitter(self, interval):
+        jitter = CONF.benchmark.poll_jitter
+        return interval * random.uniform(1 - jitter, 1 + jitter)
+
+    def next_interval(self):
+        interval = self._interval
+        self._interval = min(interval * 2, self.check_interval)
+        return self._jitter(interval)
+
+
+class LearnedPollPolicy(BackoffPollPolicy):
+    """Waits for the typical duration first, then backs off.
+
+    Durations of the finished waits are remembered per key in the process,
+    the first check is done after the median of the recent ones. Waits
+    without a key are not remembered.
+    """
+
+    HISTORY_SIZE = 100
+
+    _history = collections.defaultdict(
+        lambda: collections.deque(maxlen=LearnedPollPolicy.HISTORY_SIZE))
+    _history_lock = threading.Lock()
+
+    def __init__(self, check_interval, key=None):
+        super(LearnedPollPolicy, self).__init__(check_interval, key)
+        self._first = True
+
+    def _median(self):
+        if self.key is None:
+            return None
+        with self._history_lock:
+            durations = sorted(self._history.get(self.key, ()))
+        if durations:
+            return durations[len(durations) // 2]
+
+    def next_interval(self):
+        if self._first:
+            self._first = False
+            median = self._median()
+            if median:
+                return self._jitter(median)
+        return super(LearnedPollPolicy, self).next_interval()
+
+    def finished(self, duration):
+        if self.key is None:
+            return
+        with self._history_lock:
+            self._history[self.key].append(duration)
+
+
+_POLL_POLICIES = {
+    "constant": ConstantPollPolicy,
+    "backoff": BackoffPollPolicy,
+    "learned": LearnedPollPolicy
+}
+
+
+def get_poll_policy(check_interval, key=None):
+    """Return poll interval policy configured for waits.
+
+    :param check_interval: interval set for the wait by the caller
+    :param key: hashable key of the kind of wait
+    """
+    policy = _POLL_POLICIES.get(CONF.benchmark.poll_interval_policy,
+                                ConstantPollPolicy)
+    return policy(check_interval, key)
+
+
+def _wait_key(resource, is_ready):
+    """Return key of the kind of wait, None if the kind is unknown.
+
+    str() of closures and bound methods contains object addresses, so
+    only the desired status of resource_is and names of functions make
+    keys, otherwise the history of waits would grow without bound.
+    """
+    if isinstance(is_ready, resource_is):
+        kind = is_ready.desired_status
+    elif isinstance(is_ready, six.string_types):
+        kind = is_ready
+    else:
+        kind = getattr(is_ready, "__name__", None)
+        if kind == "<lambda>":
+            kind = None
+    if kind is not None:
+        return resource.__class__.__name__, kind
+
+
+# NOTE(rally): keyword arguments of list() calls that return only the
+#              resources with the given ids, for the managers which API
+#              supports such a filter
+_LIST_FILTERS = {
+    "heatclient.v1.stacks.StackManager": lambda ids: {"filters": {"id": ids}}
+}
+
+
+def _manager_name(manager):
+    return "%s.%s" % (manager.__class__.__module__,
+                      manager.__class__.__name__)
+
+
+def _poll_key(manager):
+    """Return the key of resources that can be listed with one call.
+
+    Every scenario iteration creates its own clients, so resources of the
+    same type are grouped by the cloud and the tenant they belong to rather
+    than by the manager object. If they are unknown, resources are grouped
+    by the manager object.
+    """
+    http_client = getattr(getattr(manager, "api", None), "client", None)
+    auth_url = getattr(http_client, "auth_url", None)
+    tenant = (getattr(http_client, "tenant_id", None) or
+              getattr(http_client, "projectid", None))
+    if not (auth_url and tenant):
+        return manager
+    return (_manager_name(manager),
+            getattr(getattr(manager, "resource_class", None), "__name__",
+                    None),
+            auth_url, tenant)
+
+
+class _Waiter(object):
+
+    def __init__(self, resource, is_ready, update_resource, check_interval):
+        self.resource = resource
+        self.is_ready = is_ready
+        self.update_resource = update_resource
+        self.policy = get_poll_policy(check_interval,
+                                      _wait_key(resource, is_ready))
+        self.started_at = time.time()
+        self.next_check = self.started_at
+        self.error = None
+        self.done = threading.Event()
+        self.key = None
+
+
+class StatusPoller(object):
+    """Polls statuses of many resources with one request per interval.
+
+    Waiters for resources of the same type, cloud and tenant are
+    coalesced (see _poll_key()): a single polling thread per key calls
+    list() once per interval, picks the waited resources from the result
+    by id and wakes each waiter when its resource is ready or failed. The
+    ids are passed to list() as a filter where the API supports it. A
+    single waited resource, as well as resources missing from the list
+    (e.g. because of pagination), are checked with the waiter's own
+    update_resource function, i.e. with one get() call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = {}
+        self._wakeups = {}
+
+    def wait_for(self, resource, is_ready, update_resource, timeout,
+                 check_interval):
+        """Wait for the resource, see wait_for() for parameters."""
+        return self.wait_for_all([resource], is_ready, update_resource,
+                                 timeout, check_interval)[0]
+
+    def wait_for_all(self, resources, is_ready, update_resource, timeout,
+                     check_interval):
+        """Wait for the resources, see wait_for_all() for parameters."""
+        waiters = []
+        with self._lock:
+            for resource in resources:
+                waiter = _Waiter(resource, is_ready, update_resource,
+                                 check_interval)
+                waiter.key = _poll_key(resource.manager)
+                key_waiters = self._waiters.get(waiter.key)
+                if key_waiters is None:
+                    key_waiters = self._waiters[waiter.key] = []
+                    self._wakeups[waiter.key] = threading.Event()
+                    thread = threading.Thread(target=self._poll,
+                                              args=(waiter.key,))
+                    thread.daemon = True
+                    thread.start()
+                key_waiters.append(waiter)
+                self._wakeups[waiter.key].set()
+                waiters.append(waiter)
+
+        deadline = time.time() + timeout
+        for waiter in waiters:
+            waiter.done.wait(max(deadline - time.time(), 0))
+            if not waiter.done.is_set() or waiter.error:
+                for other in waiters:
+                    self._remove(other.key, other)
+                if waiter.error:
+                    raise waiter.error
+                raise _timeout_exception(waiter.resource, is_ready)
+        return [waiter.resource for waiter in waiters]
+
+    def _remove(self, key, waiter):
+        with self._lock:
+            waiters = self._waiters.get(key, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+
+    def _finish(self, key, waiter, error=None):
+        waiter.error = error
+        if not error:
+            waiter.policy.finished(time.time() - waiter.started_at)
+        self._remove(key, waiter)
+        waiter.done.set()
+
+    def _poll(self, key):
+        wakeup = self._wakeups[key]
+        while True:
+            with self._lock:
+                waiters = list(self._waiters[key])
+                if not waiters:
+                    del self._waiters[key]
+                    del self._wakeups[key]
+                    return
+                wakeup.clear()
+            next_check = min(w.next_check for w in waiters)
+            delay = next_check - time.time()
+            if delay > 0:
+                # NOTE(rally): a new waiter wakes the thread up, so its
+                #              resource is checked without delay
+                wakeup.wait(delay)
+                continue
+            self._update(key, waiters)
+            now = time.time()
+            for waiter in waiters:
+                if waiter.next_check <= now:
+                    waiter.next_check = now + waiter.policy.next_interval()
+
+    def _list(self, waiters):
+        # NOTE(rally): listing is worth it only instead of several gets
+        if len(waiters) < 2:
+            return {}
+        manager = waiters[0].resource.manager
+        ids = [waiter.resource.id for waiter in waiters]
+        list_filter = _LIST_FILTERS.get(_manager_name(manager))
+        try:
+            resources = manager.list(**(list_filter(ids) if list_filter
+                                        else {}))
+            return dict((res.id, res) for res in resources)
+        except Exception as e:
+            LOG.debug("Failed to list resources of %(manager)s, getting "
+                      "them one by one: %(error)s" % {"manager": manager,
+                                                      "error": e})
+            return {}
+
+    def _update(self, key, waiters):
+        listed = self._list(waiters)
+        for waiter in waiters:
+            try:
+                res = listed.get(waiter.resource.id)
+                if res is None:
+                    res = waiter.update_resource(waiter.resource)
+                else:
+                    # NOTE(rally): the resource stays bound to the clients
+                    #              of the iteration that waits for it
+                    res.manager = waiter.resource.manager
+                    res = _check_status(res,
+                                        waiter.update_resource.error_statuses)
+            except Exception as e:
+                self._finish(key, waiter, error=e)
+                continue
+            waiter.resource = res
+            if waiter.is_ready(res):
+                self._finish(key, waiter)
+
+
+_status_poller = StatusPoller()
+
+
+def _timeout_exception(resource, is_ready):
+    return exceptions.TimeoutException(
+        desired_status=str(is_ready),
+        resource_name=getattr(resource, "name", repr(resource)),
+        resource_type=resource.__class__.__name__,
+        resource_id=getattr(resource, "id", "<no id>"),
+        resource_status=get_status(resource))
+
+
 def wait_for(resource, is_ready, update_resource=None, timeout=60,
              check_interval=1):
     """Waits for the given resource to come into the desired state.
@@ -86,6 +440,10 @@ def wait_for(resource, is_ready, update_resource=None, timeout=60,
     Uses the readiness check function passed as a parameter and (optionally)
     a function that updates the resource being waited for.
 
+    If update_resource is made by get_from_manager(), the resource is
+    polled by the process-wide StatusPoller together with the other waited
+    resources of the same manager.
+
     :param is_ready: A predicate that should take the resource object and
                      return True iff it is ready to be returned
     :param update_resource: Function that should take the resource object
@@ -98,7 +456,13 @@ def wait_for(resource, is_ready, update_resource=None, timeout=60,
 
     :returns: The "ready" resource object
     """
+    if (CONF.benchmark.batch_status_polling and
+            hasattr(update_resource, "error_statuses") and
+            getattr(resource, "manager", None) is not None):
+        return _status_poller.wait_for(resource, is_ready, update_resource,
+                                       timeout, check_interval)
 
+    policy = get_poll_policy(check_interval, _wait_key(resource, is_ready))
     start = time.time()
     while True:
         # NOTE(boden): mitigate 1st iteration waits by updating immediately
@@ -106,18 +470,48 @@ def wait_for(resource, is_ready, update_resource=None, timeout=60,
             resource = update_resource(resource)
         if is_ready(resource):
             break
-        time.sleep(check_interval)
+        time.sleep(policy.next_interval())
         if time.time() - start > timeout:
-            raise exceptions.TimeoutException(
-                desired_status=str(is_ready),
-                resource_name=getattr(resource, "name", repr(resource)),
-                resource_type=resource.__class__.__name__,
-                resource_id=getattr(resource, "id", "<no id>"),
-                resource_status=get_status(resource))
+            raise _timeout_exception(resource, is_ready)
 
+    policy.finished(time.time() - start)
     return resource
 
 
+def wait_for_all(resources, is_ready, update_resource=None, timeout=60,
+                 check_interval=1):
+    """Waits for several resources to come into the desired state.
+
+    If update_resource is made by get_from_manager(), the resources are
+    waited for together by the process-wide StatusPoller, so resources of
+    the same type and tenant are polled with one list() call per interval
+    whether batch_status_polling is enabled or not. Otherwise they are
+    waited for one by one with wait_for().
+
+    :param resources: List of resources to wait for
+    :param is_ready: A predicate that should take the resource object and
+                     return True iff it is ready
+    :param update_resource: Function that should take the resource object
+                          and return an 'updated' resource. If set to
+                          None, no result updating is performed
+    :param timeout: Timeout in seconds for all the resources after which a
+                    TimeoutException will be raised
+    :param check_interval: Interval in seconds between the two consecutive
+                           readiness checks
+
+    :returns: List of the "ready" resource objects
+    """
+    if (hasattr(update_resource, "error_statuses") and
+            all(getattr(resource, "manager", None) is not None
+                for resource in resources)):
+        return _status_poller.wait_for_all(resources, is_ready,
+                                           update_resource, timeout,
+                                           check_interval)
+    return [wait_for(resource, is_ready, update_resource=update_resource,
+                     timeout=timeout, check_interval=check_interval)
+            for resource in resources]
+
+
 def wait_for_delete(resource, update_resource=None, timeout=60,
                     check_interval=1):
     """Wait for the full deletion of resource.
@@ -132,13 +526,15 @@ def wait_for_delete(resource, update_resource=None, timeout=60,
     :param check_interval: Interval in seconds between the two consecutive
                            readiness checks
     """
+    policy = get_poll_policy(check_interval, _wait_key(resource, "deleted"))
     start = time.time()
     while True:
         try:
             resource = update_resource(resource)
         except exceptions.GetResourceNotFound:
+            policy.finished(time.time() - start)
             break
-        time.sleep(check_interval)
+        time.sleep(policy.next_interval())
         if time.time() - start > timeout:
             raise exceptions.TimeoutException(
                 desired_status="deleted",
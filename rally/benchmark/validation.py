@@ -15,11 +15,16 @@
 #    under the License.
 
 import functools
+import json
 import os
 import re
+import sys
+import threading
+import time
 
 from glanceclient import exc as glance_exc
 from novaclient import exceptions as nova_exc
+import six
 
 from rally.benchmark.context import flavors as flavors_ctx
 from rally.benchmark import types as types
@@ -36,6 +41,73 @@ class ValidationResult(object):
         self.msg = msg
 
 
+_active_caches = []
+
+
+def get_validation_cache():
+    """Return the cache entered last or None if there is no one."""
+    return _active_caches[-1] if _active_caches else None
+
+
+class ValidationCache(object):
+    """Results and durations of validators within validation of a task.
+
+    While the cache is entered, identical validator calls, i.e. calls of
+    the same validator with the same arguments, scenario config and
+    clients, are done only once, even if they are done concurrently.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {}
+
+    def __enter__(self):
+        _active_caches.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        _active_caches.remove(self)
+
+    def _add_stats(self, name, duration=0.0, deduplicated=0):
+        with self._lock:
+            stats = self.stats.setdefault(
+                name, {"calls": 0, "deduplicated": 0, "duration": 0.0})
+            stats["calls"] += 1
+            stats["deduplicated"] += deduplicated
+            stats["duration"] += duration
+
+    def call(self, key, name, func):
+        """Return result of func(), call it once for the same key.
+
+        :param key: hashable key of the validator call
+        :param name: name of the validator used in stats
+        :param func: function which does the validation
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_new = call is None
+            if is_new:
+                call = self._calls[key] = {"done": threading.Event()}
+
+        if is_new:
+            start = time.time()
+            try:
+                call["result"] = func()
+            except Exception:
+                call["exc_info"] = sys.exc_info()
+            finally:
+                self._add_stats(name, duration=time.time() - start)
+                call["done"].set()
+        else:
+            call["done"].wait()
+            self._add_stats(name, deduplicated=1)
+
+        if "exc_info" in call:
+            six.reraise(*call["exc_info"])
+        return call["result"]
+
+
 def validator(fn):
     """Decorator that constructs a scenario validator from given function.
 
@@ -56,8 +128,21 @@ def validator(fn):
         @functools.wraps(fn)
         def wrap_validator(config, clients, deployment):
             # NOTE(amaretskiy): validator is successful by default
-            return (fn(config, clients, deployment, *args, **kwargs) or
-                    ValidationResult(True))
+            def validate():
+                return (fn(config, clients, deployment, *args, **kwargs) or
+                        ValidationResult(True))
+
+            cache = get_validation_cache()
+            if cache is None:
+                return validate()
+            try:
+                key = (fn.__module__, fn.__name__, repr(args),
+                       repr(sorted(kwargs.items())),
+                       json.dumps(config, sort_keys=True),
+                       id(clients), id(deployment))
+            except (TypeError, ValueError):
+                return validate()
+            return cache.call(key, fn.__name__, validate)
 
         def wrap_scenario(scenario):
             # TODO(boris-42): remove this in future.
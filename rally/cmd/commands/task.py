@@ -16,6 +16,7 @@
 """ Rally command: task """
 
 from __future__ import print_function
+import itertools
 import json
 import os
 import pprint
@@ -45,6 +46,29 @@ class FailedToLoadTask(exceptions.RallyException):
     msg_fmt = _("Failed to load task")
 
 
+class _JSONStream(list):
+    """Iterable that json serializes as a list without loading it.
+
+    json encodes lists with indentation by iterating over them, so items
+    are produced one by one while the output is written.
+    """
+
+    def __init__(self, iterable):
+        super(_JSONStream, self).__init__()
+        self._iterator = iter(iterable)
+        # NOTE(rally): the first item is loaded to know if there are any,
+        #              json encodes empty lists as "[]"
+        self._head = list(itertools.islice(self._iterator, 1))
+
+    def __nonzero__(self):
+        return bool(self._head)
+
+    __bool__ = __nonzero__
+
+    def __iter__(self):
+        return itertools.chain(self._head, self._iterator)
+
+
 class TaskCommands(object):
     """Task management.
 
@@ -291,9 +315,9 @@ class TaskCommands(object):
                                 formatters=formatters)
             print()
 
-        task = db.task_get_detailed(task_id)
-
-        if task is None:
+        try:
+            task = db.task_get(task_id)
+        except exceptions.TaskNotFound:
             print("The task %s can not be found" % task_id)
             return(1)
 
@@ -316,7 +340,7 @@ class TaskCommands(object):
                 print(yaml.safe_load(verification[2]))
             return
 
-        for result in task["results"]:
+        for result in objects.Task(task=task).iter_results(load_raw=False):
             key = result["key"]
             print("-" * 80)
             print()
@@ -325,7 +349,16 @@ class TaskCommands(object):
             print("args values:")
             pprint.pprint(key["kw"])
 
-            raw = result["data"]["raw"]
+            # NOTE(rally): raw iterations are loaded only if they are really
+            #              needed, results of old tasks have no summary
+            summary = result["data"].get("summary")
+            raw = None
+            if (summary is None or iterations_data or
+                    summary["output_errors"]):
+                raw = list(objects.Task.iter_raw_results(result))
+            if summary is None:
+                summary = utils.get_summary(raw)
+
             table_cols = ["action", "min (sec)", "avg (sec)", "max (sec)",
                           "90 percentile", "95 percentile", "success",
                           "count"]
@@ -336,21 +369,16 @@ class TaskCommands(object):
                                    for col in float_cols]))
             table_rows = []
 
-            actions_data = utils.get_atomic_actions_data(raw)
-            for action in actions_data:
-                durations = actions_data[action]
-                if durations:
-                    data = [action,
-                            min(durations),
-                            utils.mean(durations),
-                            max(durations),
-                            utils.percentile(durations, 0.90),
-                            utils.percentile(durations, 0.95),
-                            "%.1f%%" % (len(durations) * 100.0 / len(raw)),
-                            len(raw)]
+            iterations = summary["iterations"]
+            for action in summary["atomic_actions"]:
+                if action["count"]:
+                    data = [action["name"], action["min"], action["mean"],
+                            action["max"], action["p90"], action["p95"],
+                            "%.1f%%" % (action["count"] * 100.0 / iterations),
+                            iterations]
                 else:
-                    data = [action, None, None, None, None, None,
-                            "0.0%", len(raw)]
+                    data = [action["name"], None, None, None, None, None,
+                            "0.0%", iterations]
                 table_rows.append(rutils.Struct(**dict(zip(table_cols, data))))
 
             cliutils.print_list(table_rows, fields=table_cols,
@@ -359,19 +387,50 @@ class TaskCommands(object):
             if iterations_data:
                 _print_iterations_data(raw)
 
+            if summary["load_levels"]:
+                headers = ["load level", "throughput (iter/sec)",
+                           "avg (sec)", "90 percentile", "max (sec)",
+                           "success", "count"]
+                float_cols = ["throughput (iter/sec)", "avg (sec)",
+                              "90 percentile", "max (sec)"]
+                formatters = dict(zip(float_cols,
+                                  [cliutils.pretty_float_formatter(col, 3)
+                                   for col in float_cols]))
+                table_rows = []
+                for level in summary["load_levels"]:
+                    duration = level["duration"]
+                    row = [level["load_level"], level["throughput"],
+                           duration["mean"], duration["p90"], duration["max"],
+                           "%.1f%%" % (level["success"] * 100.0 /
+                                       level["count"]),
+                           level["count"]]
+                    row = dict(zip(headers, row))
+                    table_rows.append(rutils.Struct(**row))
+                print("\nLoad Levels\n")
+                cliutils.print_list(table_rows, fields=headers,
+                                    formatters=formatters)
+
             print(_("Load duration: %s") % result["data"]["load_duration"])
             print(_("Full duration: %s") % result["data"]["full_duration"])
 
+            context_durations = result["data"].get("context_durations")
+            if context_durations:
+                headers = ["context", "setup (sec)", "cleanup (sec)"]
+                formatters = dict(zip(headers[1:],
+                                  [cliutils.pretty_float_formatter(col, 3)
+                                   for col in headers[1:]]))
+                table_rows = []
+                for name, durations in sorted(context_durations.items()):
+                    row = [name, durations.get("setup"),
+                           durations.get("cleanup")]
+                    table_rows.append(rutils.Struct(**dict(zip(headers,
+                                                               row))))
+                print("\nContexts\n")
+                cliutils.print_list(table_rows, fields=headers,
+                                    formatters=formatters)
+
             # NOTE(hughsaunders): ssrs=scenario specific results
-            ssrs = []
-            for result in raw:
-                data = result["scenario_output"].get("data")
-                if data:
-                    ssrs.append(data)
-            if ssrs:
-                keys = set()
-                for ssr in ssrs:
-                    keys.update(ssr.keys())
+            if summary["output"]:
                 headers = ["key", "max", "avg", "min",
                            "90 pecentile", "95 pecentile"]
                 float_cols = ["max", "avg", "min",
@@ -380,26 +439,18 @@ class TaskCommands(object):
                                   [cliutils.pretty_float_formatter(col, 3)
                                    for col in float_cols]))
                 table_rows = []
-                for key in keys:
-                    values = [float(ssr[key]) for ssr in ssrs if key in ssr]
-
-                    if values:
-                        row = [str(key),
-                               max(values),
-                               utils.mean(values),
-                               min(values),
-                               utils.percentile(values, 0.90),
-                               utils.percentile(values, 0.95)]
-                    else:
-                        row = [str(key)] + ["n/a"] * 5
+                for output in summary["output"]:
+                    row = [str(output["key"]), output["max"], output["mean"],
+                           output["min"], output["p90"], output["p95"]]
                     table_rows.append(rutils.Struct(**dict(zip(headers, row))))
                 print("\nScenario Specific Results\n")
                 cliutils.print_list(table_rows,
                                     fields=headers,
                                     formatters=formatters)
 
-                for result in raw:
-                    errors = result["scenario_output"].get("errors")
+            if summary["output_errors"]:
+                for iteration in raw:
+                    errors = iteration["scenario_output"].get("errors")
                     if errors:
                         print(errors)
 
@@ -422,14 +473,20 @@ class TaskCommands(object):
         :param task_id: Task uuid
         """
 
-        results = [{"key": x["key"], "result": x["data"]["raw"],
-                    "sla": x["data"]["sla"],
-                    "load_duration": x["data"]["load_duration"],
-                    "full_duration": x["data"]["full_duration"]}
-                   for x in objects.Task.get(task_id).get_results()]
+        # NOTE(rally): results are written while they are loaded from DB,
+        #              so raw iterations of the task are never all in memory
+        results = _JSONStream(
+            {"key": x["key"],
+             "result": _JSONStream(objects.Task.iter_raw_results(x)),
+             "sla": x["data"]["sla"],
+             "load_duration": x["data"]["load_duration"],
+             "full_duration": x["data"]["full_duration"],
+             "context_durations": x["data"].get("context_durations", {})}
+            for x in objects.Task.get(task_id).iter_results(load_raw=False))
 
         if results:
-            print(json.dumps(results, sort_keys=True, indent=4))
+            json.dump(results, sys.stdout, sort_keys=True, indent=4)
+            print()
         else:
             print(_("The task %s can not be found") % task_id)
             return(1)
@@ -534,13 +591,17 @@ class TaskCommands(object):
                             return 1
 
             elif uuidutils.is_uuid_like(task_file_or_uuid):
+                # NOTE(rally): raw iterations are streamed from DB when
+                #              the report is built
                 tasks_results = map(
                     lambda x: {"key": x["key"],
                                "sla": x["data"]["sla"],
-                               "result": x["data"]["raw"],
+                               "result": objects.Task.iter_raw_results(x),
                                "load_duration": x["data"]["load_duration"],
-                               "full_duration": x["data"]["full_duration"]},
-                    objects.Task.get(task_file_or_uuid).get_results())
+                               "full_duration": x["data"]["full_duration"],
+                               "summary": x["data"].get("summary")},
+                    objects.Task.get(task_file_or_uuid).iter_results(
+                        load_raw=False))
             else:
                 print(_("ERROR: Invalid UUID or file name passed: %s"
                         ) % task_file_or_uuid,
@@ -601,7 +662,7 @@ class TaskCommands(object):
         :param task_id: Task uuid.
         :returns: Number of failed criteria.
         """
-        results = objects.Task.get(task_id).get_results()
+        results = objects.Task.get(task_id).iter_results(load_raw=False)
         failed_criteria = 0
         data = []
         STATUS_PASS = "PASS"
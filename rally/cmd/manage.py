@@ -33,6 +33,12 @@ class DBCommands(object):
         db.db_create()
         envutils.clear_env()
 
+    def upgrade(self):
+        """Create tables, columns and indexes missing in existing DB."""
+        created = db.db_upgrade()
+        if created:
+            print("Created columns and indexes: %s" % ", ".join(created))
+
 
 class TempestCommands(object):
     """Commands for Tempest management."""
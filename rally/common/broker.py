@@ -13,9 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import collections
+import os
+import sys
 import threading
-import time
+
+import six
+from six.moves import queue as Queue
 
 from rally.common.i18n import _
 from rally.common import log as logging
@@ -23,57 +26,137 @@ from rally.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
+# NOTE(rally): Max number of published items per consumer, that are not
+#              consumed yet. publish() blocks when the queue is full.
+QUEUE_SIZE_PER_CONSUMER = 100
+
+_STOP = object()
+
+
+class _Executor(object):
+    """Pool of daemon threads shared by all broker runs.
+
+    Tasks are started immediately: an idle thread is reused if there is
+    one, otherwise a new thread is started, so nested broker runs never
+    wait for each other. Threads that are idle for IDLE_TIMEOUT seconds
+    exit. The pool is dropped in forked processes, as threads don't
+    survive fork.
+    """
+
+    IDLE_TIMEOUT = 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._tasks = Queue.Queue()
+        self._idle = 0
+
+    def submit(self, func, *args):
+        """Run func(*args) in a thread of the pool."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            if self._idle:
+                self._idle -= 1
+            else:
+                thread = threading.Thread(target=self._worker,
+                                          args=(self._tasks,))
+                thread.daemon = True
+                thread.start()
+            self._tasks.put((func, args))
+
+    def _worker(self, tasks):
+        while True:
+            try:
+                func, args = tasks.get(timeout=self.IDLE_TIMEOUT)
+            except Queue.Empty:
+                with self._lock:
+                    # NOTE(rally): if there are no idle threads, the thread
+                    #              is reserved by submit() and the task is
+                    #              about to be put to the queue
+                    if self._idle:
+                        self._idle -= 1
+                        return
+                continue
+
+            try:
+                func(*args)
+            except Exception as e:
+                LOG.exception(e)
+
+            with self._lock:
+                self._idle += 1
+
+
+_executor = _Executor()
+
+
+class _BlockingQueue(object):
+    """Queue passed to publish(), blocks when consumers lag behind."""
+
+    def __init__(self, maxsize):
+        self._queue = Queue.Queue(maxsize)
+
+    def append(self, item):
+        self._queue.put(item)
+
+    def get(self):
+        return self._queue.get()
+
 
-def _consumer(consume, queue, is_published):
-    """Infinity worker that consumes tasks from queue.
+def _consumer(consume, queue, errors, finished):
+    """Worker that consumes tasks from queue until the stop marker.
 
-    This finishes it's work only in case if is_published.isSet().
+    Each consumer has its own cache, that is passed to every consume()
+    call, e.g. to keep clients between calls.
 
     :param consume: method that consumes an object removed from the queue
-    :param queue: deque object to popleft() objects from
-    :param is_published: threading.Event that is used to stop the consumer
-                         when the queue is empty
+    :param queue: _BlockingQueue to get objects from
+    :param errors: list to append sys.exc_info() of failed calls to
+    :param finished: threading.Semaphore released when consumer stops
     """
     cache = {}
-    while True:
-        if queue:
+    try:
+        while True:
+            item = queue.get()
+            if item is _STOP:
+                break
             try:
-                consume(cache, queue.popleft())
-            except IndexError:
-                # NOTE(boris-42): queue is accessed from multiple threads so
-                #                 it's quite possible to have 2 queue accessing
-                #                 at the same point queue with only 1 element
-                pass
+                consume(cache, item)
             except Exception as e:
+                errors.append(sys.exc_info())
                 LOG.warning(_("Failed to consume a task from the queue: "
                               "%s") % e)
                 if logging.is_debug():
                     LOG.exception(e)
-        elif is_published.isSet():
-            break
-        else:
-            time.sleep(0.1)
+    finally:
+        finished.release()
 
 
-def _publisher(publish, queue, is_published):
+def _publisher(publish, queue, errors, consumers_count):
     """Calls a publish method that fills queue with jobs.
 
-    After running publish method it sets is_published variable, that is used to
-    stop workers (consumers).
+    After running publish method it puts stop markers to the queue, one
+    for each consumer.
 
     :param publish: method that fills the queue
-    :param queue: deque object to be filled by the publish() method
-    :param is_published: threading.Event that is used to stop consumers and
-                         finish task
+    :param queue: _BlockingQueue to be filled by the publish() method
+    :param errors: list to append sys.exc_info() of failed call to
+    :param consumers_count: number of consumers to stop
     """
     try:
         publish(queue)
     except Exception as e:
+        errors.append(sys.exc_info())
         LOG.warning(_("Failed to publish a task to the queue: %s") % e)
         if logging.is_debug():
             LOG.exception(e)
     finally:
-        is_published.set()
+        for i in range(consumers_count):
+            queue.append(_STOP)
 
 
 def run(publish, consume, consumers_count=1):
@@ -81,23 +164,110 @@ def run(publish, consume, consumers_count=1):
 
     publish() put to queue, consume() process one element from queue.
 
-    When publish() is finished and elements from queue are processed process
-    is finished all consumers threads are cleaned.
+    Consumers are run in the threads of the shared executor, publish() is
+    run in the calling thread. When publish() is finished and elements
+    from queue are processed, consumers are stopped.
 
     :param publish: Function that puts values to the queue
     :param consume: Function that processes a single value from the queue
     :param consumers_count: Number of consumers
+    :returns: List of sys.exc_info() of failed publish() and consume()
+              calls, in the order of failures
     """
-    queue = collections.deque()
-    is_published = threading.Event()
+    queue = _BlockingQueue(QUEUE_SIZE_PER_CONSUMER * consumers_count)
+    errors = []
+    finished = threading.Semaphore(0)
+
+    for i in range(consumers_count):
+        _executor.submit(_consumer, consume, queue, errors, finished)
 
-    consumers = []
+    _publisher(publish, queue, errors, consumers_count)
     for i in range(consumers_count):
-        consumer = threading.Thread(target=_consumer,
-                                    args=(consume, queue, is_published))
-        consumer.start()
-        consumers.append(consumer)
-
-    _publisher(publish, queue, is_published)
-    for consumer in consumers:
-        consumer.join()
+        finished.acquire()
+    return errors
+
+
+def raise_errors(errors):
+    """Re-raise the first of errors returned by run(), if any.
+
+    :param errors: list of sys.exc_info()
+    """
+    if errors:
+        six.reraise(*errors[0])
+
+
+def run_each(func, items, consumers_count=1):
+    """Call func for each of the items using a pool of consumers.
+
+    When all the items are processed, the first exception is re-raised,
+    so callers like context setup fail the same way as if the items were
+    processed one by one.
+
+    :param func: Function that processes a single item
+    :param items: Iterable of items
+    :param consumers_count: Number of consumers
+    :returns: List of results of func in the order of items
+    """
+    items = list(items)
+    results = [None] * len(items)
+
+    def publish(queue):
+        for i, item in enumerate(items):
+            queue.append((i, item))
+
+    def consume(cache, args):
+        i, item = args
+        results[i] = func(item)
+
+    raise_errors(run(publish, consume, min(consumers_count, len(items)) or 1))
+    return results
+
+
+def run_graph(func, items, waits_for, workers=None, stop_on_error=False):
+    """Call func for each of the items once the items it waits for end.
+
+    Items are processed in the threads of the shared executor, an item is
+    started when all the items it waits for are processed, successfully
+    or not.
+
+    :param func: Function that processes a single item
+    :param items: List of items
+    :param waits_for: List of sets of indexes of items, which have to be
+                      processed before the item with the same index
+    :param workers: Max number of items processed at the same time,
+                    None means no limit
+    :param stop_on_error: Don't start new items after a failure
+    :returns: List of sys.exc_info() of failed func() calls
+    """
+    finished = threading.Condition()
+    done = set()
+    errors = []
+
+    def target(i):
+        try:
+            func(items[i])
+        except Exception:
+            with finished:
+                errors.append(sys.exc_info())
+        finally:
+            with finished:
+                done.add(i)
+                finished.notify_all()
+
+    pending = list(range(len(items)))
+    started = 0
+    with finished:
+        while True:
+            if not (stop_on_error and errors):
+                for i in list(pending):
+                    if workers and started - len(done) >= workers:
+                        break
+                    if waits_for[i] <= done:
+                        pending.remove(i)
+                        started += 1
+                        _executor.submit(target, i)
+            if len(done) == started and (
+                    not pending or (stop_on_error and errors)):
+                break
+            finished.wait()
+    return errors
@@ -14,12 +14,18 @@
 
 import itertools
 
+from rally.benchmark.context import base as context_base
+from rally.benchmark.context.cleanup import manager as cleanup_manager
 from rally.benchmark.context import users
+from rally.benchmark import engine
+from rally.benchmark.processing import plot
+from rally.benchmark.runners import base as runner_base
 from rally.benchmark.scenarios.cinder import utils as cinder_utils
 from rally.benchmark.scenarios.glance import utils as glance_utils
 from rally.benchmark.scenarios.heat import utils as heat_utils
 from rally.benchmark.scenarios.nova import utils as nova_utils
 from rally.benchmark.scenarios.sahara import utils as sahara_utils
+from rally.benchmark import utils as benchmark_utils
 from rally.common import log
 from rally import exceptions
 from rally import osclients
@@ -33,7 +39,13 @@ def list_opts():
                          exceptions.EXC_LOG_OPTS,
                          osclients.OSCLIENTS_OPTS)),
         ("benchmark",
-         itertools.chain(cinder_utils.CINDER_BENCHMARK_OPTS,
+         itertools.chain(engine.ENGINE_OPTS,
+                         runner_base.RUNNER_OPTS,
+                         benchmark_utils.POLLER_OPTS,
+                         context_base.CONTEXT_OPTS,
+                         cleanup_manager.CLEANUP_OPTS,
+                         plot.REPORT_OPTS,
+                         cinder_utils.CINDER_BENCHMARK_OPTS,
                          glance_utils.GLANCE_BENCHMARK_OPTS,
                          heat_utils.HEAT_BENCHMARK_OPTS,
                          nova_utils.NOVA_BENCHMARK_OPTS,
@@ -134,9 +134,9 @@ class RAMInt(object):
     def next(self):
         return self.__next__()
 
-    def reset(self):
+    def reset(self, value=0):
         with self.__lock:
-            self.__int.value = 0
+            self.__int.value = value
 
 
 def itersubclasses(cls, _seen=None):
@@ -70,6 +70,17 @@ def db_drop():
     IMPL.db_drop()
 
 
+def db_upgrade():
+    """Create tables, columns and indexes missing in existing DB.
+
+    Existing data is kept, so it is safe to run it for DB created by an
+    older version of Rally.
+
+    :returns: list of names of created columns and indexes.
+    """
+    return IMPL.db_upgrade()
+
+
 def task_get(uuid):
     """Returns task by uuid.
 
@@ -151,6 +162,37 @@ def task_result_get_all_by_uuid(task_uuid):
     return IMPL.task_result_get_all_by_uuid(task_uuid)
 
 
+def task_result_iter_by_uuid(task_uuid):
+    """Iterate over task results loading them from DB one by one.
+
+    :param task_uuid: string with UUID of Task instance.
+    :returns: generator of TaskResult instances in order they were created.
+    """
+    return IMPL.task_result_iter_by_uuid(task_uuid)
+
+
+def task_result_meta_iter_by_uuid(task_uuid):
+    """Iterate over task results without loading raw iterations.
+
+    :param task_uuid: string with UUID of Task instance.
+    :returns: generator of dicts with id, key, created_at and data of task
+              results, where data has everything but raw iterations, e.g.
+              summary, sla and durations.
+    """
+    return IMPL.task_result_meta_iter_by_uuid(task_uuid)
+
+
+def task_result_get(result_id):
+    """Get task result.
+
+    :param result_id: ID of TaskResult instance.
+    :raises: :class:`rally.exceptions.NotFoundException` if the task result
+             does not exist.
+    :returns: TaskResult instance.
+    """
+    return IMPL.task_result_get(result_id)
+
+
 def task_result_create(task_uuid, key, data):
     """Append result record to task.
 
@@ -162,6 +204,40 @@ def task_result_create(task_uuid, key, data):
     return IMPL.task_result_create(task_uuid, key, data)
 
 
+def task_result_update(result_id, data):
+    """Replace data of the task result.
+
+    :param result_id: ID of TaskResult instance.
+    :param data: new data of the task result.
+    :raises: :class:`rally.exceptions.NotFoundException` if the task result
+             does not exist.
+    :returns: updated TaskResult instance.
+    """
+    return IMPL.task_result_update(result_id, data)
+
+
+def task_result_chunk_create(result_id, raw):
+    """Append a chunk of raw iteration results to task result.
+
+    :param result_id: ID of TaskResult instance.
+    :param raw: list of iteration results.
+    :returns: TaskResultChunk instance appended.
+    """
+    return IMPL.task_result_chunk_create(result_id, raw)
+
+
+def task_result_chunk_iter(result_id):
+    """Iterate over raw iteration results stored in chunks.
+
+    Chunks are loaded from DB one by one, so the whole list of iterations
+    is never kept in memory.
+
+    :param result_id: ID of TaskResult instance.
+    :returns: generator of iteration results in order they were appended.
+    """
+    return IMPL.task_result_chunk_iter(result_id)
+
+
 def deployment_create(values):
     """Create a deployment from the values dictionary.
 
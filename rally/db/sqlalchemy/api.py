@@ -70,6 +70,15 @@ class Connection(object):
     def db_drop(self):
         models.drop_db()
 
+    def db_upgrade(self):
+        created = models.upgrade_db()
+        # NOTE(rally): results stored by older versions have no meta
+        query = (self.model_query(models.TaskResult).
+                 filter(models.TaskResult.meta.is_(None)))
+        for result in self._iter_by_id(query, models.TaskResult):
+            self.task_result_update(result.id, result.data)
+        return created
+
     def model_query(self, model, session=None):
         """The helper method to create query.
 
@@ -93,6 +102,25 @@ class Connection(object):
 
         return query
 
+    @staticmethod
+    def _iter_by_id(query, model):
+        """Iterate over rows of the query in order of ids, one by one.
+
+        Every row is loaded with a separate query, unlike yield_per(),
+        which doesn't stream rows with DB drivers that buffer whole result
+        sets, e.g. with the default cursor of MySQL drivers.
+        """
+        last_id = None
+        while True:
+            page = query
+            if last_id is not None:
+                page = page.filter(model.id > last_id)
+            row = page.order_by(model.id).first()
+            if row is None:
+                return
+            last_id = row.id
+            yield row
+
     def _task_get(self, uuid, session=None):
         task = (self.model_query(models.Task, session=session).
                 filter_by(uuid=uuid).first())
@@ -149,6 +177,14 @@ class Connection(object):
             if status is not None:
                 query = base_query.filter_by(status=status)
 
+            result_ids = (self.model_query(models.TaskResult).
+                          filter_by(task_uuid=uuid).
+                          with_entities(models.TaskResult.id))
+            (self.model_query(models.TaskResultChunk).
+             filter(models.TaskResultChunk.task_result_id.in_(
+                 result_ids.subquery())).
+             delete(synchronize_session=False))
+
             (self.model_query(models.TaskResult).filter_by(task_uuid=uuid).
              delete(synchronize_session=False))
 
@@ -162,16 +198,78 @@ class Connection(object):
                                                            actual=task.status)
                 raise exceptions.TaskNotFound(uuid=uuid)
 
+    @staticmethod
+    def _task_result_meta(data):
+        return dict((k, v) for k, v in data.items() if k != "raw")
+
     def task_result_create(self, task_uuid, key, data):
         result = models.TaskResult()
-        result.update({"task_uuid": task_uuid, "key": key, "data": data})
+        result.update({"task_uuid": task_uuid, "key": key, "data": data,
+                       "meta": self._task_result_meta(data)})
         result.save()
         return result
 
+    def task_result_get(self, result_id):
+        result = (self.model_query(models.TaskResult).
+                  filter_by(id=result_id).first())
+        if not result:
+            raise exceptions.NotFoundException(
+                "Can't find any task result with following ID '%s'." %
+                result_id)
+        return result
+
     def task_result_get_all_by_uuid(self, uuid):
         return (self.model_query(models.TaskResult).
                 filter_by(task_uuid=uuid).all())
 
+    def task_result_iter_by_uuid(self, uuid):
+        query = (self.model_query(models.TaskResult).
+                 filter_by(task_uuid=uuid))
+        return self._iter_by_id(query, models.TaskResult)
+
+    def task_result_meta_iter_by_uuid(self, uuid):
+        query = (self.model_query(models.TaskResult).
+                 filter_by(task_uuid=uuid).
+                 with_entities(models.TaskResult.id,
+                               models.TaskResult.key,
+                               models.TaskResult.meta,
+                               models.TaskResult.created_at))
+        for row in self._iter_by_id(query, models.TaskResult):
+            meta = row.meta
+            if meta is None:
+                # NOTE(rally): DB isn't upgraded yet, so meta of results
+                #              stored by older versions is built from data
+                meta = self._task_result_meta(
+                    self.task_result_get(row.id)["data"])
+            yield {"id": row.id, "key": row.key, "data": meta,
+                   "created_at": row.created_at}
+
+    def task_result_update(self, result_id, data):
+        session = get_session()
+        with session.begin():
+            result = (self.model_query(models.TaskResult, session=session).
+                      filter_by(id=result_id).first())
+            if not result:
+                raise exceptions.NotFoundException(
+                    "Can't find any task result with following ID '%s'." %
+                    result_id)
+            result.update({"data": data,
+                           "meta": self._task_result_meta(data)})
+        return result
+
+    def task_result_chunk_create(self, result_id, raw):
+        chunk = models.TaskResultChunk()
+        chunk.update({"task_result_id": result_id, "data": {"raw": raw}})
+        chunk.save()
+        return chunk
+
+    def task_result_chunk_iter(self, result_id):
+        query = (self.model_query(models.TaskResultChunk).
+                 filter_by(task_result_id=result_id))
+        for chunk in self._iter_by_id(query, models.TaskResultChunk):
+            for iteration in chunk["data"]["raw"]:
+                yield iteration
+
     def _deployment_get(self, deployment, session=None):
         stored_deployment = self.model_query(
             models.Deployment,
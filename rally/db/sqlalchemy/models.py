@@ -166,12 +166,18 @@ class Task(BASE, RallyBase):
 
 class TaskResult(BASE, RallyBase):
     __tablename__ = "task_results"
-    __table_args__ = ()
+    __table_args__ = (
+        sa.Index("task_result_task_uuid", "task_uuid"),
+    )
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
 
     key = sa.Column(sa_types.MutableJSONEncodedDict, nullable=False)
     data = sa.Column(sa_types.BigMutableJSONEncodedDict, nullable=False)
+    # NOTE(rally): copy of data without raw iterations (summary, sla and
+    #              durations), so results can be listed without loading
+    #              iterations stored in data by older versions of Rally
+    meta = sa.Column(sa_types.BigJSONEncodedDict, nullable=True)
 
     task_uuid = sa.Column(sa.String(36), sa.ForeignKey("tasks.uuid"))
     task = sa.orm.relationship(Task,
@@ -180,6 +186,22 @@ class TaskResult(BASE, RallyBase):
                                primaryjoin="TaskResult.task_uuid == Task.uuid")
 
 
+class TaskResultChunk(BASE, RallyBase):
+    """Represents a chunk of raw iteration results of a task result."""
+    __tablename__ = "task_result_chunks"
+    __table_args__ = (
+        sa.Index("task_result_chunk_result_id", "task_result_id"),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+
+    # NOTE(rally): dict with the "raw" key that contains list of iterations
+    data = sa.Column(sa_types.BigJSONEncodedDict, nullable=False)
+
+    task_result_id = sa.Column(sa.Integer, sa.ForeignKey("task_results.id"),
+                               nullable=False)
+
+
 class Verification(BASE, RallyBase):
     """Represents a verifier result."""
 
@@ -236,6 +258,42 @@ def create_db():
     BASE.metadata.create_all(sa_api.get_engine())
 
 
+def upgrade_db():
+    """Create tables, columns and indexes missing in existing database.
+
+    Only nullable columns are added to existing tables.
+
+    :returns: list of names of created columns and indexes
+    """
+    from rally.db.sqlalchemy import api as sa_api
+
+    engine = sa_api.get_engine()
+    # NOTE(rally): create_all() creates missing tables with their indexes,
+    #              but doesn't touch tables that already exist
+    BASE.metadata.create_all(engine)
+
+    inspector = sa.inspect(engine)
+    created = []
+    for table in BASE.metadata.sorted_tables:
+        existing = set(column["name"]
+                       for column in inspector.get_columns(table.name))
+        for column in table.columns:
+            if column.name not in existing:
+                column_ddl = schema.CreateColumn(column).compile(
+                    dialect=engine.dialect)
+                engine.execute("ALTER TABLE %s ADD COLUMN %s"
+                               % (table.name, column_ddl))
+                created.append("%s.%s" % (table.name, column.name))
+
+        existing = set(index["name"]
+                       for index in inspector.get_indexes(table.name))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing:
+                index.create(engine)
+                created.append(index.name)
+    return created
+
+
 # TODO(boris-42): Remove it after oslo.db > 1.4.1 will be released.
 def drop_all_objects(engine):
     """Drop all database objects.
@@ -97,6 +97,20 @@ TASK_RESULT_SCHEMA = {
         "full_duration": {
             "type": "number",
         },
+        "context_durations": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "properties": {
+                    "setup": {
+                        "type": "number"
+                    },
+                    "cleanup": {
+                        "type": "number"
+                    }
+                }
+            }
+        },
     },
     "required": ["key", "sla", "result", "load_duration",
                  "full_duration"],
@@ -158,11 +172,54 @@ class Task(object):
         self._update({"status": consts.TaskStatus.FAILED,
                       "verification_log": json.dumps(log)})
 
+    @staticmethod
+    def iter_raw_results(result):
+        """Iterate over raw iteration results of the task result.
+
+        Iterations stored in the result itself go first, then iterations
+        stored in chunks are loaded from DB one chunk at a time.
+
+        :param result: task result, as returned by db or iter_results()
+        """
+        if "raw" in result["data"]:
+            raw = result["data"]["raw"]
+        else:
+            raw = db.task_result_get(result["id"])["data"].get("raw", [])
+        for iteration in raw:
+            yield iteration
+        for iteration in db.task_result_chunk_iter(result["id"]):
+            yield iteration
+
+    def iter_results(self, load_raw=True):
+        """Iterate over task results, loading them from DB one by one.
+
+        :param load_raw: whether to load raw iteration results, if False
+                         data of results has no raw key and only summary,
+                         sla and durations are loaded, iterations can be
+                         loaded later with iter_raw_results()
+        """
+        if not load_raw:
+            for result in db.task_result_meta_iter_by_uuid(self.task["uuid"]):
+                yield result
+            return
+        for result in db.task_result_iter_by_uuid(self.task["uuid"]):
+            result = dict(result)
+            result["data"] = dict(result["data"])
+            result["data"].setdefault("raw", [])
+            result["data"]["raw"] = list(self.iter_raw_results(result))
+            yield result
+
     def get_results(self):
-        return db.task_result_get_all_by_uuid(self.task["uuid"])
+        return list(self.iter_results())
 
     def append_results(self, key, value):
-        db.task_result_create(self.task["uuid"], key, value)
+        return db.task_result_create(self.task["uuid"], key, value)
+
+    def update_results(self, result_id, value):
+        db.task_result_update(result_id, value)
+
+    def append_raw_results(self, result_id, raw):
+        db.task_result_chunk_create(result_id, raw)
 
     def delete(self, status=None):
         db.task_delete(self.task["uuid"], status=status)
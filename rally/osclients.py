@@ -13,7 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import os
+import threading
 
 from ceilometerclient import client as ceilometer
 from cinderclient import client as cinder
@@ -28,8 +30,10 @@ from keystoneclient.v3 import client as keystone_v3
 from neutronclient.neutron import client as neutron
 from novaclient import client as nova
 from oslo_config import cfg
+from requests import adapters as requests_adapters
 from saharaclient import client as sahara
 from swiftclient import client as swift
+from six.moves.urllib import parse
 from troveclient import client as trove
 from zaqarclient.queues import client as zaqar
 
@@ -47,7 +51,19 @@ OSCLIENTS_OPTS = [
     cfg.BoolOpt("https_insecure", default=False,
                 help="Use SSL for all OpenStack API interfaces"),
     cfg.StrOpt("https_cacert", default=None,
-               help="Path to CA server cetrificate for SSL")
+               help="Path to CA server cetrificate for SSL"),
+    cfg.BoolOpt("keystone_client_cache", default=True,
+                help="Share authenticated keystone clients among all the "
+                     "clients of the same endpoint created in the process"),
+    cfg.IntOpt("keystone_token_refresh_margin", default=300,
+               help="Re-authenticate a shared keystone client when its "
+                    "token expires in less than this number of seconds"),
+    cfg.BoolOpt("openstack_client_http_pool", default=True,
+                help="Share HTTP connections to OpenStack services among "
+                     "all the clients created in the process"),
+    cfg.IntOpt("openstack_client_http_pool_size", default=10,
+               help="Maximum number of HTTP connections kept open to each "
+                    "OpenStack service in the process")
 ]
 CONF.register_opts(OSCLIENTS_OPTS)
 
@@ -84,6 +100,139 @@ def create_keystone_client(args):
         "Failed to discover keystone version for url %(auth_url)s.", **args)
 
 
+class _KeystoneClientCache(object):
+    """Process-wide cache of authenticated keystone clients.
+
+    Benchmark iterations create new Clients objects for the same few
+    endpoints all the time, so without the cache every iteration pays
+    for keystone version discovery and a token request. Clients are
+    keyed by endpoint and are replaced when their token is about to
+    expire. The cache is dropped in forked processes, so HTTP connections
+    of the parent process are never shared.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._clients = {}
+        self._locks = {}
+
+    @staticmethod
+    def _key(endpoint):
+        return tuple(sorted(endpoint.to_dict(include_permission=True).items()))
+
+    def get(self, endpoint, create):
+        """Return cached client of the endpoint, create it if required.
+
+        :param endpoint: objects.Endpoint instance
+        :param create: callable which returns new authenticated client
+        """
+        key = self._key(endpoint)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        # NOTE(rally): only one thread authenticates, the rest wait for it
+        with lock:
+            client = self._clients.get(key)
+            if client is None or client.auth_ref.will_expire_soon(
+                    CONF.keystone_token_refresh_margin):
+                client = self._clients[key] = create()
+            return client
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+
+_keystone_client_cache = _KeystoneClientCache()
+
+
+ConnectionStats = collections.namedtuple("ConnectionStats",
+                                         ["opened", "reused"])
+
+
+class _HTTPConnectionPool(object):
+    """Process-wide pool of HTTP adapters keyed by service URL.
+
+    Clients are re-created for each benchmark iteration, so connections
+    kept by their own sessions are closed after every iteration. Shared
+    adapters keep connections to a service alive and reuse them in the
+    following iterations. Adapters are thread-safe, each client still
+    has its own session. The pool is dropped in forked processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._adapters = {}
+
+    @staticmethod
+    def _service_url(url):
+        parts = parse.urlsplit(url)
+        return "%s://%s" % (parts.scheme, parts.netloc)
+
+    def get(self, url):
+        """Return adapter for the service of the url.
+
+        :param url: any url of the service
+        """
+        service_url = self._service_url(url)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            adapter = self._adapters.get(service_url)
+            if adapter is None:
+                adapter = requests_adapters.HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=CONF.openstack_client_http_pool_size)
+                self._adapters[service_url] = adapter
+            return adapter
+
+    def mount(self, session, url):
+        """Make requests session use pooled connections for the service.
+
+        :param session: requests.Session instance
+        :param url: any url of the service
+        """
+        if parse.urlsplit(url).scheme not in ("http", "https"):
+            # NOTE(rally): custom schemes are served by their own adapters
+            return
+        session.mount(self._service_url(url), self.get(url))
+
+    def stats(self):
+        """Return numbers of opened and reused connections of the process."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            adapters = list(self._adapters.values())
+
+        opened = requests = 0
+        for adapter in adapters:
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+                    requests += pool.num_requests
+        return ConnectionStats(opened, max(requests - opened, 0))
+
+
+_http_connection_pool = _HTTPConnectionPool()
+
+
+def get_http_connection_stats():
+    """Return ConnectionStats of pooled HTTP connections of the process."""
+    return _http_connection_pool.stats()
+
+
 class Clients(object):
     """This class simplify and unify work with openstack python clients."""
 
@@ -107,8 +256,19 @@ class Clients(object):
         self.cache = {}
 
     @cached
-    def keystone(self):
-        """Return keystone client."""
+    def keystone(self, use_cache=True):
+        """Return keystone client.
+
+        :param use_cache: reuse authenticated client of the same endpoint
+                          created in this process, if it is enabled in
+                          config. Set it to False to always authenticate.
+        """
+        if use_cache and CONF.keystone_client_cache:
+            return _keystone_client_cache.get(self.endpoint,
+                                              self._create_keystone)
+        return self._create_keystone()
+
+    def _create_keystone(self):
         new_kw = {
             "timeout": CONF.openstack_client_http_timeout,
             "insecure": CONF.https_insecure, "cacert": CONF.https_cacert
@@ -152,7 +312,12 @@ class Clients(object):
                              http_log_debug=logging.is_debug(),
                              timeout=CONF.openstack_client_http_timeout,
                              insecure=CONF.https_insecure,
-                             cacert=CONF.https_cacert)
+                             cacert=CONF.https_cacert,
+                             connection_pool=CONF.openstack_client_http_pool)
+        if CONF.openstack_client_http_pool:
+            # NOTE(rally): novaclient keeps adapters per client instance,
+            #              share them among all the clients instead
+            client.client._connection_pool = _http_connection_pool
         client.set_management_url(compute_api_url)
         return client
 
@@ -186,6 +351,9 @@ class Clients(object):
                                timeout=CONF.openstack_client_http_timeout,
                                insecure=CONF.https_insecure,
                                cacert=CONF.https_cacert)
+        if CONF.openstack_client_http_pool:
+            _http_connection_pool.mount(client.http_client.session,
+                                        client.http_client.endpoint)
         return client
 
     @cached
@@ -459,11 +459,11 @@
                 </span>
               <th class="sortable"
                   title="Number of errors occured"
-                  ng-click="ov_srt='errors.length'; ov_dir=!ov_dir">
+                  ng-click="ov_srt='errors_num'; ov_dir=!ov_dir">
                 Errors
                 <span class="arrow">
-                  <b ng-show="ov_srt=='errors.length' && !ov_dir">&#x25b4;</b>
-                  <b ng-show="ov_srt=='errors.length' && ov_dir">&#x25be;</b>
+                  <b ng-show="ov_srt=='errors_num' && !ov_dir">&#x25b4;</b>
+                  <b ng-show="ov_srt=='errors_num' && ov_dir">&#x25be;</b>
                 </span>
               <th class="sortable"
                   title="Whether SLA check is successful"
@@ -483,7 +483,7 @@
               <td>{{sc.full_duration | number:3}}
               <td>{{sc.iterations_num}}
               <td>{{sc.runner}}
-              <td>{{sc.errors.length}}
+              <td>{{sc.errors_num}}
               <td>
                 <span ng-show="sc.sla_success" class="status-pass">&#x2714;</span>
                 <span ng-hide="sc.sla_success" class="status-fail">&#x2716;</span>
@@ -517,7 +517,7 @@
             Load duration: <b>{{scenario.load_duration | number:3}} s</b> &nbsp;
             Full duration: <b>{{scenario.full_duration | number:3}} s</b> &nbsp;
             Iterations: <b>{{scenario.iterations_num}}</b> &nbsp;
-            Failures: <b>{{scenario.errors.length}}</b>
+            Failures: <b>{{scenario.errors_num}}</b>
           </p>
 
           <div ng-show="scenario.sla.length">
@@ -607,14 +607,15 @@
 
         <script type="text/ng-template" id="failures">
           <h2>Benchmark failures (<ng-pluralize
-            count="scenario.errors.length"
+            count="scenario.errors_num"
             when="{'1': '1 iteration', 'other': '{} iterations'}"></ng-pluralize> failed)
           </h2>
           <table class="striped">
             <thead>
               <tr>
                 <th>
-                <th>Iteration
+                <th>Count
+                <th>Iterations
                 <th>Exception type
                 <th>Exception message
               </tr>
@@ -626,12 +627,14 @@
                 <td>
                   <span ng-hide="i.expanded">&#9658;</span>
                   <span ng-show="i.expanded">&#9660;</span>
-                <td>{{i.iteration}}
+                <td>{{i.count}}
+                <td>{{i.iterations.join(", ")}}<span
+                    ng-show="i.count > i.iterations.length">, ...</span>
                 <td>{{i.type}}
                 <td class="failure-mesg">{{i.message}}
               </tr>
               <tr ng-show="i.expanded" ng-repeat-end>
-                <td colspan="4" class="failure-trace">{{i.traceback}}
+                <td colspan="5" class="failure-trace">{{i.traceback}}
               </tr>
             </tbody>
           </table>
@@ -45,7 +45,8 @@ class AdminCleanupTestCase(test.TestCase):
                           context.AdminCleanup.validate, {})
 
     @mock.patch("%s.manager.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_service="a", _order=1),
+                              mock.MagicMock(_service="a", _order=2)])
     @mock.patch("%s.manager.SeekAndDestroy" % BASE)
     def test_cleanup(self, mock_seek_and_destroy, mock_find_res_mgr):
 
@@ -93,7 +94,8 @@ class UserCleanupTestCase(test.TestCase):
                           context.UserCleanup.validate, {})
 
     @mock.patch("%s.manager.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_service="a", _order=1),
+                              mock.MagicMock(_service="a", _order=2)])
     @mock.patch("%s.manager.SeekAndDestroy" % BASE)
     def test_cleanup(self, mock_seek_and_destroy, mock_find_res_mgr):
 
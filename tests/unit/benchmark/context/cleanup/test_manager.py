@@ -13,11 +13,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 import mock
+from oslo_config import fixture
+from oslotest import mockpatch
 import six
 
 from rally.benchmark.context.cleanup import base
 from rally.benchmark.context.cleanup import manager
+from rally.benchmark.context.cleanup import resources  # noqa
+from rally import exceptions
 from tests.unit import test
 
 
@@ -261,6 +267,117 @@ class SeekAndDestroyTestCase(test.TestCase):
                                                 consumers_count=5)
 
 
+class FakeResource(object):
+
+    def __init__(self, id, status="ACTIVE"):
+        self.id = id
+        self.status = status
+
+
+class FakeResourceManager(base.ResourceManager):
+
+    _service = "fake"
+    _resource = "res"
+    _order = 100
+    _admin_required = False
+    _perform_for_admin_only = False
+    _tenant_resource = True
+    _max_attempts = 1
+    _timeout = 0.05
+    _interval = 0.001
+    _threads = 2
+
+    def list(self):
+        return list(self.resources[self.tenant_uuid])
+
+    def delete(self):
+        if self.id() == "broken":
+            raise Exception("broken")
+        if self.id() == "stuck":
+            return
+        self.resources[self.tenant_uuid].remove(self.raw_resource)
+
+
+class BulkSeekAndDestroyTestCase(test.TestCase):
+
+    def setUp(self):
+        super(BulkSeekAndDestroyTestCase, self).setUp()
+        self.admin = {"endpoint": "admin"}
+        self.users = [{"endpoint": "u1", "tenant_id": "t1"},
+                      {"endpoint": "u2", "tenant_id": "t1"},
+                      {"endpoint": "u3", "tenant_id": "t2"}]
+        self.resources = {
+            "t1": [FakeResource("a"), FakeResource("b"),
+                   FakeResource("broken")],
+            "t2": [FakeResource("c"), FakeResource("stuck"),
+                   FakeResource("d", status="DELETED")]
+        }
+        FakeResourceManager.resources = self.resources
+        self.addCleanup(delattr, FakeResourceManager, "resources")
+        self.useFixture(mockpatch.Patch("%s.osclients.Clients" % BASE))
+
+    @mock.patch("%s.LOG" % BASE)
+    def test_exterminate(self, mock_log):
+        summaries = manager.BulkSeekAndDestroy(
+            [FakeResourceManager], self.admin, self.users).exterminate()
+
+        self.assertEqual(1, len(summaries))
+        summary = summaries[0]
+        self.assertEqual(
+            {"service": "fake", "resource": "res", "listed": 6,
+             "deleted": 4, "failed": 1, "unconfirmed": 1},
+            dict((k, summary[k]) for k in ("service", "resource", "listed",
+                                           "deleted", "failed",
+                                           "unconfirmed")))
+        self.assertEqual(["broken"], [r.id for r in self.resources["t1"]])
+        self.assertEqual(["stuck"], [r.id for r in self.resources["t2"]])
+        # NOTE(rally): one warning per failed delete and per resource
+        #              that didn't disappear in time
+        self.assertEqual(2, mock_log.warning.call_count)
+        self.assertEqual(1, mock_log.info.call_count)
+
+    @mock.patch("%s.time.sleep" % BASE)
+    def test_exterminate_synchronized_deletion(self, mock_sleep):
+        class FakeSyncManager(FakeResourceManager):
+            _synchronized_deletion = True
+
+        summaries = manager.BulkSeekAndDestroy(
+            [FakeSyncManager], self.admin, self.users).exterminate()
+
+        self.assertFalse(mock_sleep.called)
+        self.assertEqual(5, summaries[0]["deleted"])
+        self.assertEqual(0, summaries[0]["unconfirmed"])
+
+    @mock.patch("%s.LOG" % BASE)
+    def test_exterminate_list_failed(self, mock_log):
+        list_calls = []
+
+        class FakeBrokenListManager(FakeResourceManager):
+            def list(self):
+                list_calls.append(self.tenant_uuid)
+                if len(list_calls) > 2:
+                    raise Exception("list failed")
+                return super(FakeBrokenListManager, self).list()
+
+        self.resources["t2"] = [FakeResource("c")]
+        summaries = manager.BulkSeekAndDestroy(
+            [FakeBrokenListManager], self.admin, self.users).exterminate()
+
+        self.assertEqual(0, summaries[0]["deleted"])
+        self.assertEqual(3, summaries[0]["unconfirmed"])
+        self.assertEqual(["broken"], [r.id for r in self.resources["t1"]])
+
+    def test_exterminate_nothing_listed(self):
+        self.resources["t1"] = []
+        self.resources["t2"] = []
+
+        summaries = manager.BulkSeekAndDestroy(
+            [FakeResourceManager], self.admin, self.users).exterminate()
+
+        self.assertEqual(0, summaries[0]["listed"])
+        self.assertEqual(0, summaries[0]["throughput"])
+
+
 class ResourceManagerTestCase(test.TestCase):
 
     def _get_res_mock(self, **kw):
@@ -321,10 +438,60 @@ class ResourceManagerTestCase(test.TestCase):
                          manager.find_resource_managers(names=["fake"],
                                                         admin_required=False))
 
+    def test_get_service_groups(self):
+        managers = [
+            self._get_res_mock(_service="heat", _order=1, _depends_on=()),
+            self._get_res_mock(_service="nova", _order=2,
+                               _depends_on=("heat",)),
+            self._get_res_mock(_service="nova", _order=3,
+                               _depends_on=("heat",)),
+            self._get_res_mock(_service="zaqar", _order=4,
+                               _depends_on=("keystone",)),
+            self._get_res_mock(_service="keystone", _order=5,
+                               _depends_on=None)
+        ]
+
+        groups, dependencies = manager.get_service_groups(managers)
+
+        self.assertEqual([managers[0:1], managers[1:3], managers[3:4],
+                          managers[4:]], groups)
+        # NOTE(rally): zaqar waits for keystone despite the higher order
+        self.assertEqual([set(), set([0]), set([3]), set([0, 1])],
+                         dependencies)
+
+    def test_get_service_groups_cyclic(self):
+        managers = [
+            self._get_res_mock(_service="heat", _order=1, _depends_on=()),
+            self._get_res_mock(_service="nova", _order=2,
+                               _depends_on=("zaqar",)),
+            self._get_res_mock(_service="zaqar", _order=3,
+                               _depends_on=("nova",))
+        ]
+
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          manager.get_service_groups, managers)
+
+    def test_get_service_groups_resources(self):
+        groups, dependencies = manager.get_service_groups(
+            manager.find_resource_managers(
+                ["heat", "nova", "neutron", "cinder", "sahara"]))
+
+        services = [group[0]._service for group in groups]
+        waits_for = dict(
+            (services[i], set(services[j] for j in dependencies[i]))
+            for i in range(len(services)))
+        self.assertIn("sahara", waits_for["neutron"])
+        self.assertIn("sahara", waits_for["cinder"])
+        self.assertEqual(set(["heat"]), waits_for["sahara"])
+
     @mock.patch("%s.SeekAndDestroy" % BASE)
-    @mock.patch("%s.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+    @mock.patch("%s.find_resource_managers" % BASE)
     def test_cleanup(self, mock_find, mock_seek_and_destroy):
+        mock_find.return_value = [
+            self._get_res_mock(_service="a", _order=1, _depends_on=None),
+            self._get_res_mock(_service="a", _order=2, _depends_on=None)
+        ]
+
         manager.cleanup(names=["a", "b"], admin_required=True,
                         admin="admin", users=["user"])
 
@@ -336,3 +503,68 @@ class ResourceManagerTestCase(test.TestCase):
             mock.call(mock_find.return_value[1], "admin", ["user"]),
             mock.call().exterminate()
         ])
+
+    @mock.patch("%s.BulkSeekAndDestroy" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_bulk(self, mock_find, mock_bulk):
+        self.useFixture(fixture.Config()).config(cleanup_mode="bulk",
+                                                 group="benchmark")
+        managers = [
+            self._get_res_mock(_service="a", _order=1, _depends_on=None),
+            self._get_res_mock(_service="a", _order=1, _depends_on=None),
+            self._get_res_mock(_service="a", _order=2, _depends_on=None)
+        ]
+        mock_find.return_value = managers
+
+        manager.cleanup(names=["a"], admin="admin", users=["user"])
+
+        mock_bulk.assert_has_calls([
+            mock.call(managers[0:2], "admin", ["user"]),
+            mock.call().exterminate(),
+            mock.call(managers[2:], "admin", ["user"]),
+            mock.call().exterminate()
+        ])
+
+    @mock.patch("%s.SeekAndDestroy" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_independent_services(self, mock_find,
+                                          mock_seek_and_destroy):
+        managers = [
+            self._get_res_mock(_service="a", _order=1, _depends_on=()),
+            self._get_res_mock(_service="b", _order=2, _depends_on=()),
+            self._get_res_mock(_service="c", _order=3, _depends_on=None)
+        ]
+        mock_find.return_value = managers
+        cleaned = []
+        started = threading.Event()
+
+        def exterminate(manager):
+            # NOTE(rally): "a" is cleaned up only after "b" is started
+            if manager._service == "a":
+                self.assertTrue(started.wait(5))
+            else:
+                started.set()
+            cleaned.append(manager._service)
+            return mock.MagicMock()
+
+        mock_seek_and_destroy.side_effect = (
+            lambda manager, admin, users: exterminate(manager))
+
+        manager.cleanup(names=["a", "b", "c"], admin="admin",
+                        users=["user"])
+
+        self.assertEqual(["b", "a", "c"], cleaned)
+
+    @mock.patch("%s.SeekAndDestroy" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_failed(self, mock_find, mock_seek_and_destroy):
+        mock_find.return_value = [
+            self._get_res_mock(_service="a", _order=1, _depends_on=()),
+            self._get_res_mock(_service="b", _order=2, _depends_on=())
+        ]
+        mock_seek_and_destroy.return_value.exterminate.side_effect = [
+            KeyError, None]
+
+        self.assertRaises(KeyError, manager.cleanup, names=["a", "b"],
+                          admin="admin", users=["user"])
+        self.assertEqual(2, mock_seek_and_destroy.call_count)
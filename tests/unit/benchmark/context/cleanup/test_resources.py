@@ -38,7 +38,8 @@ class AllResourceManagerTestCase(test.TestCase):
                 "_admin_required", "_perform_for_admin_only",
                 "_tenant_resource", "_service", "_resource", "_order",
                 "_max_attempts", "_timeout", "_interval", "_threads",
-                "_manager", "id", "is_deleted", "delete", "list"
+                "_synchronized_deletion", "_depends_on", "_manager", "id",
+                "is_deleted", "delete", "list"
             ])
 
             extra_opts = set(fields) - available_opts
@@ -14,8 +14,11 @@
 #    under the License.
 
 
+import threading
+
 import jsonschema
 import mock
+from oslo_config import fixture
 
 from rally.benchmark.context import base
 from rally import exceptions
@@ -260,3 +263,113 @@ class ContextManagerTestCase(test.TestCase):
         finally:
             mock_setup.assert_called_once_with()
             mock_cleanup.assert_called_once_with()
+
+
+class ContextManagerDependenciesTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ContextManagerDependenciesTestCase, self).setUp()
+        self.events = []
+        self.b_started = threading.Event()
+        self.c_started = threading.Event()
+        events = self.events
+        b_started = self.b_started
+        c_started = self.c_started
+
+        class FakeCtx(base.Context):
+
+            def setup(self):
+                events.append(("setup", self.get_name()))
+
+            def cleanup(self):
+                events.append(("cleanup", self.get_name()))
+
+        @base.context(name="a", order=1)
+        class A(FakeCtx):
+            pass
+
+        @base.context(name="b", order=2, depends_on=("a",))
+        class B(FakeCtx):
+
+            def setup(self):
+                b_started.set()
+                # NOTE(rally): c doesn't depend on b, so it runs meanwhile
+                c_started.wait(5)
+                super(B, self).setup()
+
+        @base.context(name="c", order=3, depends_on=("a", "d"))
+        class C(FakeCtx):
+
+            def setup(self):
+                c_started.set()
+                b_started.wait(5)
+                super(C, self).setup()
+
+        @base.context(name="d", order=4)
+        class D(FakeCtx):
+            pass
+
+        self.classes = [A, B, C, D]
+        self.ctx_object = {"task": mock.MagicMock()}
+        self.contexts = [cls(self.ctx_object) for cls in self.classes]
+        self.manager = base.ContextManager(self.ctx_object)
+        mock.patch.object(self.manager, "_get_sorted_context_lst",
+                          return_value=self.contexts).start()
+
+    def test__get_dependencies(self):
+        self.assertEqual([set(), set([0]), set([0]), set([0, 1, 2])],
+                         base.ContextManager._get_dependencies(self.contexts))
+
+    def test_setup(self):
+        self.assertEqual(self.ctx_object, self.manager.setup())
+
+        self.assertEqual(("setup", "a"), self.events[0])
+        self.assertEqual(set([("setup", "b"), ("setup", "c")]),
+                         set(self.events[1:3]))
+        self.assertEqual(("setup", "d"), self.events[3])
+        self.assertEqual(["a", "b", "c", "d"],
+                         [ctx.get_name() for ctx in sorted(
+                             self.manager._visited)])
+        self.assertEqual(["a", "b", "c", "d"],
+                         sorted(self.manager.durations))
+
+    def test_setup_failed(self):
+        self.contexts[1].setup = mock.MagicMock(side_effect=KeyError("b"))
+        self.b_started.set()
+
+        self.assertRaises(KeyError, self.manager.setup)
+
+        self.assertNotIn(("setup", "d"), self.events)
+        self.assertNotIn(self.contexts[3], self.manager._visited)
+        self.assertIn("setup", self.manager.durations["b"])
+
+    def test_cleanup(self):
+        self.manager.cleanup()
+
+        self.assertEqual(("cleanup", "d"), self.events[0])
+        self.assertEqual(set([("cleanup", "b"), ("cleanup", "c")]),
+                         set(self.events[1:3]))
+        self.assertEqual(("cleanup", "a"), self.events[3])
+        self.assertEqual(["a", "b", "c", "d"],
+                         sorted(self.manager.durations))
+
+    def test_cleanup_failed(self):
+        self.contexts[3].cleanup = mock.MagicMock(side_effect=KeyError("d"))
+
+        self.manager.cleanup()
+
+        self.assertEqual(3, len(self.events))
+        self.assertEqual(("cleanup", "a"), self.events[-1])
+
+    def test_setup_and_cleanup_sequential(self):
+        self.useFixture(fixture.Config()).config(
+            parallel_context_setup=False, group="benchmark")
+        self.b_started.set()
+        self.c_started.set()
+
+        self.manager.setup()
+        self.manager.cleanup()
+
+        self.assertEqual([("setup", "a"), ("setup", "b"), ("setup", "c"),
+                          ("setup", "d"), ("cleanup", "d"), ("cleanup", "c"),
+                          ("cleanup", "b"), ("cleanup", "a")], self.events)
@@ -105,9 +105,8 @@ class UserGeneratorTestCase(test.TestCase):
                                                           "nova-network")
         nova_admin.networks.disassociate.assert_called_once_with(networks[0])
 
-    @mock.patch("rally.benchmark.context.users.broker.time.sleep")
     @mock.patch("rally.benchmark.context.users.keystone")
-    def test__create_tenants(self, mock_keystone, mock_sleep):
+    def test__create_tenants(self, mock_keystone):
         user_generator = users.UserGenerator(self.context)
         user_generator.config["tenants"] = 1
         tenants = user_generator._create_tenants()
@@ -115,9 +114,8 @@ class UserGeneratorTestCase(test.TestCase):
         id, tenant = tenants.popitem()
         self.assertIn("name", tenant)
 
-    @mock.patch("rally.benchmark.context.users.broker.time.sleep")
     @mock.patch("rally.benchmark.context.users.keystone")
-    def test__create_users(self, mock_keystone, mock_sleep):
+    def test__create_users(self, mock_keystone):
         user_generator = users.UserGenerator(self.context)
         user_generator.context["tenants"] = {"t1": dict(id="t1", name="t1"),
                                              "t2": dict(id="t2", name="t2")}
@@ -0,0 +1,37 @@
+# Copyright 2015: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from rally.benchmark.processing.charts import histogram
+from tests.unit import test
+
+
+class HistogramTestCase(test.TestCase):
+
+    def test_histogram(self):
+        hist = histogram.Histogram([1, 2, 2, 3, 3.5, 5], 4, "method", "key")
+        self.assertEqual([2.0, 3.0, 4.0, 5.0], hist.x_axis)
+        self.assertEqual([3, 1, 1, 1], hist.y_axis)
+        self.assertEqual("method", hist.method)
+        self.assertEqual("key", hist.key)
+
+    def test_histogram_equal_values(self):
+        hist = histogram.Histogram([2, 2, 2], 3)
+        self.assertEqual([3, 0, 0], hist.y_axis)
+
+    def test_hvariety(self):
+        self.assertEqual([10, 8, 10, 50],
+                         [v["number_of_bins"]
+                          for v in histogram.hvariety(list(range(100)))])
+        self.assertRaises(ValueError, histogram.hvariety, [])
@@ -17,9 +17,12 @@ import json
 import sys
 
 import mock
+from oslo_config import fixture
 import testtools
 
 from rally.benchmark.processing import plot
+from rally.benchmark.processing import utils
+from rally.benchmark import results as bench_results
 from tests.unit import test
 
 PLOT = "rally.benchmark.processing.plot."
@@ -40,18 +43,22 @@ class PlotTestCase(test.TestCase):
 
         self.assertEqual(result, "plot_html")
         mock_render.assert_called_once_with(
-            data=json.dumps(task_data),
+            data=json.dumps(task_data, separators=(",", ":")),
             source=json.dumps(task_source)
         )
         mock_utils.get_template.assert_called_once_with("task/report.mako")
 
+    @mock.patch(PLOT + "bench_results.IterationResults", side_effect=list)
     @mock.patch(PLOT + "json.dumps")
     @mock.patch(PLOT + "_prepare_data")
     @mock.patch(PLOT + "_process_atomic")
     @mock.patch(PLOT + "_get_atomic_action_durations")
     @mock.patch(PLOT + "_process_main_duration")
     def test__process_results(self, mock_main_duration, mock_get_atomic,
-                              mock_atomic, mock_prepare, mock_dumps):
+                              mock_atomic, mock_prepare, mock_dumps,
+                              mock_iteration_results):
+        self.useFixture(fixture.Config()).config(report_workers=1,
+                                                 group="benchmark")
         sla = [{"success": True}]
         result = ["iter_1", "iter_2"]
         iterations = len(result)
@@ -61,6 +68,7 @@ class PlotTestCase(test.TestCase):
                     "name": "Class.method",
                     "kw": kw},
             "result": result,
+            "summary": "summary",
             "sla": sla}
         results = [result_(i) for i in (0, 1, 2)]
         table_cols = ["Action",
@@ -73,6 +81,7 @@ class PlotTestCase(test.TestCase):
                       "Count"]
         atomic_durations = [["atomic_1"], ["atomic_2"]]
         mock_prepare.side_effect = lambda i: {"errors": "errors_list",
+                                              "errors_num": 3,
                                               "output": [],
                                               "output_errors": [],
                                               "sla": i["sla"],
@@ -109,6 +118,7 @@ class PlotTestCase(test.TestCase):
                 "table_cols": table_cols,
                 "table_rows": atomic_durations,
                 "errors": "errors_list",
+                "errors_num": 3,
                 "output": [],
                 "output_errors": [],
                 "runner": "foo_runner",
@@ -150,6 +160,7 @@ class PlotTestCase(test.TestCase):
             "full_duration": 6789.1
         }
 
+        result["result"] = bench_results.IterationResults(result["result"])
         output = plot._process_main_duration(result,
                                              plot._prepare_data(result))
 
@@ -172,18 +183,18 @@ class PlotTestCase(test.TestCase):
                 {
                     "key": "task",
                     "method": "Square Root Choice",
-                    "values": [{"x": 1.0, "y": 1.0}, {"x": 1.0, "y": 0.0}]
+                    "values": [{"x": 1.5, "y": 1.0}, {"x": 2.0, "y": 1.0}]
                 },
                 {
                     "key": "task",
                     "method": "Sturges Formula",
-                    "values": [{"x": 1.0, "y": 1.0}, {"x": 1.0, "y": 0.0}]
+                    "values": [{"x": 1.5, "y": 1.0}, {"x": 2.0, "y": 1.0}]
                 },
                 {
                     "key": "task",
                     "method": "Rice Rule",
-                    "values": [{"x": 1.0, "y": 1.0}, {"x": 1.0, "y": 0.0},
-                               {"x": 1.0, "y": 0.0}]
+                    "values": [{"x": 1.33, "y": 1.0}, {"x": 1.67, "y": 0.0},
+                               {"x": 2.0, "y": 1.0}]
                 },
                 {
                     "key": "task",
@@ -199,6 +210,7 @@ class PlotTestCase(test.TestCase):
             "result": [
                 {
                     "error": [],
+                    "duration": 1,
                     "atomic_actions": {
                         "action1": 1,
                         "action2": 2
@@ -207,6 +219,7 @@ class PlotTestCase(test.TestCase):
                 },
                 {
                     "error": ["some", "error", "occurred"],
+                    "duration": 1,
                     "atomic_actions": {
                         "action1": 1,
                         "action2": 2
@@ -215,6 +228,7 @@ class PlotTestCase(test.TestCase):
                 },
                 {
                     "error": [],
+                    "duration": 1,
                     "atomic_actions": {
                         "action1": 3,
                         "action2": 4
@@ -224,6 +238,7 @@ class PlotTestCase(test.TestCase):
             ]
         }
 
+        result["result"] = bench_results.IterationResults(result["result"])
         data = {
             "atomic_durations": {
                 "action1": [(1, 1.0), (2, 0.0), (3, 3.0)],
@@ -250,8 +265,8 @@ class PlotTestCase(test.TestCase):
                         "key": "action1",
                         "disabled": 0,
                         "method": "Rice Rule",
-                        "values": [{"x": 1, "y": 1}, {"x": 1, "y": 0},
-                                   {"x": 1, "y": 0}]
+                        "values": [{"x": 1.67, "y": 1}, {"x": 2.33, "y": 0},
+                                   {"x": 3, "y": 1}]
                     },
                     {
                         "key": "action1",
@@ -277,8 +292,8 @@ class PlotTestCase(test.TestCase):
                         "key": "action2",
                         "disabled": 1,
                         "method": "Rice Rule",
-                        "values": [{"x": 2, "y": 1}, {"x": 2, "y": 0},
-                                   {"x": 2, "y": 0}]
+                        "values": [{"x": 2.67, "y": 1}, {"x": 3.33, "y": 0},
+                                   {"x": 4, "y": 1}]
                     },
                     {
                         "key": "action2",
@@ -304,6 +319,60 @@ class PlotTestCase(test.TestCase):
             ]
         }, output)
 
+    @mock.patch(PLOT + "_load_result", side_effect=lambda r: "loaded_" + r)
+    @mock.patch(PLOT + "multiprocessing.Pool")
+    def test__process_results_parallel(self, mock_pool, mock_load_result):
+        self.useFixture(fixture.Config()).config(report_workers=4,
+                                                 group="benchmark")
+        processed = [("A.b", {"kw": 1}, {"cls": "A", "name": "b [2]"}),
+                     ("A.b", {"kw": 0}, {"cls": "A", "name": "b"})]
+        mock_pool.return_value.map.return_value = processed
+
+        source, scenarios = plot._process_results(["r1", "r2"])
+
+        mock_pool.assert_called_once_with(2)
+        mock_pool.return_value.map.assert_called_once_with(
+            plot._process_result, ["loaded_r1", "loaded_r2"], chunksize=1)
+        mock_pool.return_value.join.assert_called_once_with()
+        self.assertEqual({"A.b": [{"kw": 1}, {"kw": 0}]}, json.loads(source))
+        self.assertEqual([{"cls": "A", "name": "b"},
+                          {"cls": "A", "name": "b [2]"}], scenarios)
+
+    def test__process_result_without_summary(self):
+        raw = [{"duration": 2.0, "idle_duration": 0, "error": [],
+                "atomic_actions": {"a": 1.0},
+                "scenario_output": {"data": {}, "errors": ""}}]
+        result = {"key": {"name": "A.b", "pos": 0,
+                          "kw": {"runner": {"type": "constant"}}},
+                  "result": iter(raw), "sla": [], "load_duration": 2.0,
+                  "full_duration": 3.0}
+
+        name, kw, scenario = plot._process_result(plot._load_result(result))
+
+        self.assertEqual("A.b", name)
+        self.assertEqual([["a", 1.0, 1.0, 1.0, 1.0, 1.0, "100.0%", 1],
+                          ["total", 2.0, 2.0, 2.0, 2.0, 2.0, "100.0%", 1]],
+                         scenario["table_rows"])
+        self.assertEqual(1, scenario["iterations_num"])
+
+    def test__get_atomic_action_durations(self):
+        raw = [{"duration": 2.0, "idle_duration": 0, "error": [],
+                "atomic_actions": {"a": 1.0},
+                "scenario_output": {"data": {}, "errors": ""}},
+               {"duration": 3.0, "idle_duration": 0, "error": ["e", "r", ""],
+                "atomic_actions": {"a": 1.5},
+                "scenario_output": {"data": {}, "errors": ""}},
+               {"duration": 4.0, "idle_duration": 0, "error": [],
+                "atomic_actions": {"a": 2.5},
+                "scenario_output": {"data": {}, "errors": ""}}]
+        table = plot._get_atomic_action_durations(
+            {"result": bench_results.IterationResults(raw),
+             "summary": utils.get_summary(raw)})
+
+        self.assertEqual([["a", 1.0, 1.667, 2.5, 2.3, 2.4, "100.0%", 3],
+                          ["total", 2.0, 3.0, 4.0, 3.8, 3.9, "66.7%", 3]],
+                         table)
+
     @mock.patch("rally.benchmark.processing.utils.compress")
     def test__prepare_data(self, mock_compress):
 
@@ -323,56 +392,79 @@ class PlotTestCase(test.TestCase):
                 "idle_duration": i * 0.2,
                 "error": [],
                 "atomic_actions": atomic_actions,
-                "scenario_output": {"errors": ["err"],
-                                    "data": {"out_key": "out_value"}}
+                "scenario_output": {"errors": "err",
+                                    "data": {"out_key": 42}}
             }
             data.append(row)
 
         data[42]["error"] = ["foo", "bar", "spam"]
         data[52]["error"] = ["spam", "bar", "foo"]
+        data[62]["error"] = ["foo", "bar", "eggs"]
 
         values_atomic_a1 = [i + 0.1 for i in range(rows_num)]
         values_atomic_a2 = [i + 0.8 for i in range(rows_num)]
         values_duration = [i * 3.1 for i in range(rows_num)]
         values_duration[42] = 0
         values_duration[52] = 0
+        values_duration[62] = 0
         values_idle = [i * 0.2 for i in range(rows_num)]
         values_idle[42] = 0
         values_idle[52] = 0
+        values_idle[62] = 0
 
+        data = bench_results.IterationResults(data)
         prepared_data = plot._prepare_data({"result": data,
                                             "load_duration": load_duration,
                                             "full_duration": full_duration,
                                             "sla": sla,
                                             "key": "foo_key"})
-        self.assertEqual(2, len(prepared_data["errors"]))
 
-        calls = [mock.call(values_atomic_a1),
-                 mock.call(values_atomic_a2),
-                 mock.call(values_duration),
-                 mock.call(values_idle)]
+        calls = [mock.call(values_atomic_a1, limit=plot.MAX_POINTS),
+                 mock.call(values_atomic_a2, limit=plot.MAX_POINTS),
+                 mock.call(values_duration, limit=plot.MAX_POINTS),
+                 mock.call(values_idle, limit=plot.MAX_POINTS)]
         mock_compress.assert_has_calls(calls)
 
         expected_output = [{"key": "out_key",
-                            "values": ["out_value"] * rows_num}]
-        expected_output_errors = [(i, [e])
-                                  for i, e in enumerate(["err"] * rows_num)]
+                            "values": [42] * rows_num}]
+        expected_output_errors = [(i, "err")
+                                  for i in range(plot.MAX_ERRORS)]
         self.assertEqual({
             "total_durations": {"duration": values_duration,
                                 "idle_duration": values_idle},
             "atomic_durations": {"a1": values_atomic_a1,
                                  "a2": values_atomic_a2},
-            "errors": [{"iteration": 42,
+            "errors": [{"iterations": [42, 62],
+                        "count": 2,
                         "message": "bar",
                         "traceback": "spam",
                         "type": "foo"},
-                       {"iteration": 52,
+                       {"iterations": [52],
+                        "count": 1,
                         "message": "bar",
                         "traceback": "foo",
                         "type": "spam"}],
+            "errors_num": 3,
             "output": expected_output,
             "output_errors": expected_output_errors,
             "load_duration": load_duration,
             "full_duration": full_duration,
             "sla": sla,
         }, prepared_data)
+
+    @mock.patch(PLOT + "MAX_ERROR_ITERATIONS", 2)
+    @mock.patch(PLOT + "MAX_ERRORS", 2)
+    def test__group_errors(self):
+        errors = {0: ["A", "a", "tb0"], 1: ["B", "b", "tb1"],
+                  2: ["A", "a", "tb2"], 3: ["C", "c", "tb3"],
+                  4: ["A", "a", "tb4"], 5: ["B", "b", "tb5"]}
+        iterations = bench_results.IterationResults(
+            [{"duration": 1, "idle_duration": 0, "atomic_actions": {},
+              "error": errors.get(i, [])} for i in range(8)])
+
+        self.assertEqual(
+            [{"type": "A", "message": "a", "traceback": "tb0", "count": 3,
+              "iterations": [0, 2]},
+             {"type": "B", "message": "b", "traceback": "tb1", "count": 2,
+              "iterations": [1, 5]}],
+            plot._group_errors(iterations))
@@ -137,3 +137,146 @@ class AtomicActionsDataTestCase(test.TestCase):
 
         output = utils.get_atomic_actions_data(raw_data)
         self.assertEqual(output, atomic_actions_data)
+
+
+class LoadLevelDataTestCase(test.TestCase):
+
+    def test_get_load_level_data(self):
+        raw_data = [
+            {"error": [], "duration": 1.0, "idle_duration": 0,
+             "timestamp": 10, "load_level": 1},
+            {"error": [], "duration": 1.0, "idle_duration": 0,
+             "timestamp": 11, "load_level": 1},
+            {"error": [], "duration": 2.0, "idle_duration": 1.0,
+             "timestamp": 12, "load_level": 2},
+            {"error": ["some", "error", "occurred"], "duration": 3.0,
+             "timestamp": 13, "load_level": 2},
+            {"error": [], "duration": 5.0, "timestamp": 14}
+        ]
+
+        output = utils.get_load_level_data(raw_data)
+
+        self.assertEqual([1, 2], list(output))
+        self.assertEqual({"count": 2, "success": 2, "throughput": 1.0,
+                          "durations": [1.0, 1.0]}, output[1])
+        self.assertEqual({"count": 2, "success": 1, "throughput": 0.25,
+                          "durations": [2.0]}, output[2])
+
+    def test_get_load_level_data_without_levels(self):
+        raw_data = [{"error": [], "duration": 1.0, "timestamp": 10}]
+        self.assertEqual({}, utils.get_load_level_data(raw_data))
+
+
+class StatsTestCase(test.TestCase):
+
+    def test_get_stats(self):
+        stats = utils.get_stats([5, 1, 3, 2, 4])
+        self.assertEqual({"count": 5, "min": 1, "mean": 3.0, "max": 5,
+                          "p50": 3, "p90": 4.6, "p95": 4.8, "p99": 4.96},
+                         dict(stats, p90=round(stats["p90"], 2),
+                              p95=round(stats["p95"], 2),
+                              p99=round(stats["p99"], 2)))
+
+    def test_get_stats_empty(self):
+        self.assertEqual({"count": 0, "min": None, "mean": None, "max": None,
+                          "p50": None, "p90": None, "p95": None, "p99": None},
+                         utils.get_stats([]))
+
+
+class StreamingStatsTestCase(test.TestCase):
+
+    def test_exact(self):
+        stats = utils.StreamingStats()
+        for value in range(100, 0, -1):
+            stats.add(value)
+        self.assertEqual(100, stats.count)
+        self.assertEqual(1, stats.min)
+        self.assertEqual(100, stats.max)
+        self.assertEqual(50.5, stats.mean)
+        self.assertEqual(utils.percentile(list(range(1, 101)), 0.9),
+                         stats.percentile(0.9))
+        self.assertEqual([1, 50.5, 100], stats.percentiles([0, 0.5, 1]))
+
+    def test_bucketed(self):
+        stats = utils.StreamingStats(exact_limit=100, precision=0.01)
+        values = [i / 1000.0 for i in range(1, 10001)]
+        for value in values:
+            stats.add(value)
+        self.assertIsNone(stats._values)
+        self.assertLess(len(stats._buckets), 1000)
+        self.assertEqual(10000, stats.count)
+        self.assertEqual(0.001, stats.min)
+        self.assertEqual(10.0, stats.max)
+        self.assertAlmostEqual(utils.mean(values), stats.mean)
+        for percent in (0.5, 0.9, 0.95, 0.99):
+            exact = utils.percentile(values, percent)
+            self.assertLess(abs(stats.percentile(percent) - exact) / exact,
+                            0.01)
+        self.assertEqual(10.0, stats.percentile(1))
+        self.assertEqual(0.001, stats.percentile(0))
+
+    def test_bucketed_zero_and_negative(self):
+        stats = utils.StreamingStats(exact_limit=0)
+        for value in (-2.0, -2.0, 0, 0, 0, 3.0, 3.0):
+            stats.add(value)
+        self.assertAlmostEqual(-2.0, stats.percentile(0.2), delta=0.02)
+        self.assertEqual(0, stats.percentile(0.5))
+        self.assertAlmostEqual(3.0, stats.percentile(0.9), delta=0.03)
+        self.assertEqual(-2.0, stats.percentile(0))
+        self.assertEqual(3.0, stats.percentile(1))
+
+    def test_empty(self):
+        stats = utils.StreamingStats()
+        self.assertIsNone(stats.mean)
+        self.assertIsNone(stats.percentile(0.5))
+        self.assertEqual(utils.get_stats([]), stats.to_dict())
+
+
+class SummaryTestCase(test.TestCase):
+
+    def test_get_summary(self):
+        raw_data = [
+            {"error": [], "duration": 3.0, "idle_duration": 0,
+             "timestamp": 10, "load_level": 1,
+             "atomic_actions": {"action1": 1.0, "action2": 2.0},
+             "scenario_output": {"data": {"a": 1}, "errors": ""}},
+            {"error": ["some", "error", "occurred"], "duration": 1.9,
+             "idle_duration": 0, "timestamp": 11, "load_level": 1,
+             "atomic_actions": {"action1": 0.5, "action2": None},
+             "scenario_output": {"data": {}, "errors": "out error"}},
+            {"error": [], "duration": 8.0, "idle_duration": 0,
+             "timestamp": 12, "load_level": 2,
+             "atomic_actions": {"action1": 4.0, "action2": 4.0},
+             "scenario_output": {"data": {"a": "3"}, "errors": ""}}
+        ]
+
+        summary = utils.get_summary(raw_data)
+
+        self.assertEqual(3, summary["iterations"])
+        self.assertEqual(1, summary["errors"])
+        self.assertEqual(0.2, summary["throughput"])
+        self.assertEqual(1, summary["output_errors"])
+        actions = dict((a["name"], a) for a in summary["atomic_actions"])
+        self.assertEqual("total", summary["atomic_actions"][-1]["name"])
+        self.assertEqual(dict(utils.get_stats([1.0, 0.5, 4.0]),
+                              name="action1"), actions["action1"])
+        self.assertEqual(dict(utils.get_stats([2.0, 4.0]), name="action2"),
+                         actions["action2"])
+        self.assertEqual(dict(utils.get_stats([3.0, 8.0]), name="total"),
+                         actions["total"])
+        self.assertEqual([1, 2], [level["load_level"]
+                                  for level in summary["load_levels"]])
+        self.assertEqual({"load_level": 1, "count": 2, "success": 1,
+                          "throughput": 1 / 3.0,
+                          "duration": utils.get_stats([3.0])},
+                         summary["load_levels"][0])
+        self.assertEqual([dict(utils.get_stats([1.0, 3.0]), key="a")],
+                         summary["output"])
+
+    def test_get_summary_empty(self):
+        summary = utils.get_summary([])
+        self.assertEqual({"iterations": 0, "errors": 0, "throughput": None,
+                          "atomic_actions": [dict(utils.get_stats([]),
+                                                  name="total")],
+                          "load_levels": [], "output": [],
+                          "output_errors": 0}, summary)
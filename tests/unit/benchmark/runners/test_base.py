@@ -15,14 +15,18 @@
 
 import collections
 import multiprocessing
+import threading
 
 import jsonschema
 import mock
+from oslo_config import fixture
+from six.moves import queue as Queue
 
 from rally.benchmark.runners import base
 from rally.benchmark.runners import serial
 from rally.benchmark.scenarios import base as scenario_base
 from rally import exceptions
+from rally import osclients
 from tests.unit import fakes
 from tests.unit import test
 
@@ -186,6 +190,54 @@ class ScenarioRunnerResultTestCase(test.TestCase):
         self.assertRaises(jsonschema.ValidationError,
                           base.ScenarioRunnerResult, config)
 
+    @mock.patch(BASE + "jsonschema.validate")
+    def test_validate_jsonschema(self, mock_validate):
+        self.useFixture(fixture.Config()).config(
+            runner_result_validation="jsonschema", group="benchmark")
+        result = {"duration": 1.0}
+        base.ScenarioRunnerResult(result)
+        mock_validate.assert_called_once_with(
+            result, base.ScenarioRunnerResult.RESULT_SCHEMA)
+
+    def test__validate_fast(self):
+        valid = [
+            {},
+            {"duration": 1, "timestamp": 1.5, "idle_duration": 0},
+            {"start_lag": -0.001, "load_level": 10},
+            {"scenario_output": {"data": {"a": 1.0}, "errors": ""}},
+            {"scenario_output": {}},
+            {"atomic_actions": {"a": 1.0, "b": None}},
+            {"error": ["a", u"b"]}
+        ]
+        invalid = [
+            [],
+            {"a": 10},
+            {"duration": "1"},
+            {"duration": True},
+            {"timestamp": None},
+            {"start_lag": "0"},
+            {"load_level": None},
+            {"scenario_output": []},
+            {"scenario_output": {"data": {"a": "1"}}},
+            {"scenario_output": {"data": []}},
+            {"scenario_output": {"errors": None}},
+            {"scenario_output": {"foo": ""}},
+            {"atomic_actions": []},
+            {"atomic_actions": {"a": "1"}},
+            {"error": "error"},
+            {"error": [1]}
+        ]
+        for result in valid:
+            jsonschema.validate(result,
+                                base.ScenarioRunnerResult.RESULT_SCHEMA)
+            base.ScenarioRunnerResult._validate_fast(result)
+        for result in invalid:
+            self.assertRaises(jsonschema.ValidationError, jsonschema.validate,
+                              result, base.ScenarioRunnerResult.RESULT_SCHEMA)
+            self.assertRaises(jsonschema.ValidationError,
+                              base.ScenarioRunnerResult._validate_fast,
+                              result)
+
 
 class ScenarioRunnerTestCase(test.TestCase):
 
@@ -284,10 +336,11 @@ class ScenarioRunnerTestCase(test.TestCase):
 
         processes_to_start = 10
 
-        def worker_process(i):
+        def worker_process(queue, i):
             pass
 
-        counter = ((i,) for i in range(100))
+        result_queue = multiprocessing.Queue()
+        counter = ((result_queue, i) for i in range(100))
 
         process_pool = runner._create_process_pool(processes_to_start,
                                                    worker_process,
@@ -295,14 +348,125 @@ class ScenarioRunnerTestCase(test.TestCase):
         self.assertEqual(processes_to_start, len(process_pool))
         for process in process_pool:
             self.assertIsInstance(process, multiprocessing.Process)
+            process.join()
+        for i in range(processes_to_start):
+            self.assertEqual(osclients.ConnectionStats(0, 0),
+                             result_queue.get(timeout=1))
+            self.assertIsNone(result_queue.get(timeout=1))
+
+    @mock.patch(BASE + "_run_scenario_once")
+    def test__run_scenario_once_with_timeout(self, mock_run_scenario_once):
+        self.assertEqual(
+            mock_run_scenario_once.return_value,
+            base._run_scenario_once_with_timeout(("some_args",), timeout=10))
+        mock_run_scenario_once.assert_called_once_with(("some_args",))
+
+    @mock.patch(BASE + "_run_scenario_once")
+    def test__run_scenario_once_with_timeout_releases_slot(
+            self, mock_run_scenario_once):
+        for timeout in (0, 10):
+            slot = mock.MagicMock()
+            self.assertEqual(
+                mock_run_scenario_once.return_value,
+                base._run_scenario_once_with_timeout(("some_args",),
+                                                     timeout, slot))
+            slot.release.assert_called_once_with()
+
+    @mock.patch(BASE + "_run_scenario_once", side_effect=KeyError)
+    def test__run_scenario_once_with_timeout_releases_slot_on_error(
+            self, mock_run_scenario_once):
+        slot = mock.MagicMock()
+        self.assertRaises(KeyError, base._run_scenario_once_with_timeout,
+                          ("some_args",), 0, slot)
+        slot.release.assert_called_once_with()
+
+    @mock.patch(BASE + "LOG")
+    @mock.patch(BASE + "format_result_on_timeout")
+    @mock.patch(BASE + "_run_scenario_once")
+    def test__run_scenario_once_with_timeout_timed_out(
+            self, mock_run_scenario_once, mock_format_result_on_timeout,
+            mock_log):
+        finish = threading.Event()
+        finished = threading.Event()
+
+        def run(args):
+            finish.wait()
+            return {}
+
+        mock_run_scenario_once.side_effect = run
+        mock_log.info.side_effect = lambda *args: finished.set()
+        slot = mock.MagicMock()
+        abandoned = base._abandoned_iterations.count
+
+        result = base._run_scenario_once_with_timeout(("some_args",),
+                                                      timeout=0.01,
+                                                      slot=slot)
+
+        self.assertEqual(mock_format_result_on_timeout.return_value, result)
+        exc, timeout = mock_format_result_on_timeout.call_args[0]
+        self.assertIsInstance(exc, multiprocessing.TimeoutError)
+        self.assertEqual(0.01, timeout)
+        # NOTE: the abandoned iteration is counted and holds the slot
+        self.assertEqual(abandoned + 1, base._abandoned_iterations.count)
+        self.assertFalse(slot.release.called)
+        self.assertTrue(mock_log.warning.called)
+
+        finish.set()
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(abandoned, base._abandoned_iterations.count)
+        slot.release.assert_called_once_with()
+
+    @mock.patch(BASE + "_run_scenario_once_with_timeout")
+    def test__worker_thread(self, mock_run_scenario_once_with_timeout):
+        mock_queue = mock.MagicMock()
+        base._worker_thread(mock_queue, ("some_args",), 10, "slot")
+        mock_run_scenario_once_with_timeout.assert_called_once_with(
+            ("some_args",), 10, "slot")
+        mock_queue.put.assert_called_once_with(
+            mock_run_scenario_once_with_timeout.return_value)
+
+    def test__run_worker_process(self):
+        mock_worker = mock.MagicMock()
+        mock_queue = mock.MagicMock()
+        base._run_worker_process(mock_worker, mock_queue, 1, 2)
+        mock_worker.assert_called_once_with(mock_queue, 1, 2)
+        self.assertEqual(
+            [mock.call(osclients.ConnectionStats(0, 0)), mock.call(None)],
+            mock_queue.put.mock_calls)
+
+    @mock.patch(BASE + "osclients.get_http_connection_stats")
+    def test__run_worker_process_http_connections(self, mock_get_stats):
+        mock_get_stats.side_effect = [osclients.ConnectionStats(1, 2),
+                                      osclients.ConnectionStats(4, 10)]
+        mock_queue = mock.MagicMock()
+        base._run_worker_process(mock.MagicMock(), mock_queue)
+        self.assertEqual(
+            [mock.call(osclients.ConnectionStats(3, 8)), mock.call(None)],
+            mock_queue.put.mock_calls)
+
+    @mock.patch(BASE + "LOG")
+    @mock.patch(BASE + "_abandoned_iterations")
+    def test__run_worker_process_abandoned_iterations(
+            self, mock_abandoned_iterations, mock_log):
+        mock_abandoned_iterations.count = 2
+        base._run_worker_process(mock.MagicMock(), mock.MagicMock())
+        self.assertEqual(1, mock_log.warning.call_count)
+
+    def test__run_worker_process_exception(self):
+        mock_worker = mock.MagicMock(side_effect=KeyError)
+        mock_queue = mock.MagicMock()
+        self.assertRaises(KeyError, base._run_worker_process,
+                          mock_worker, mock_queue)
+        mock_queue.put.assert_called_with(None)
 
     @mock.patch(BASE + "ScenarioRunner._send_result")
     def test__join_processes(self, mock_send_result):
-        process = mock.MagicMock(is_alive=mock.MagicMock(return_value=False))
+        process = mock.MagicMock(is_alive=mock.MagicMock(return_value=True))
         processes = 10
         process_pool = collections.deque([process] * processes)
-        mock_result_queue = mock.MagicMock(
-                                    empty=mock.MagicMock(return_value=True))
+        mock_result_queue = mock.MagicMock()
+        mock_result_queue.get.side_effect = (
+            [Queue.Empty, "r1", None, "r2"] + [None] * (processes - 1))
 
         runner = serial.SerialScenarioRunner(
             mock.MagicMock(),
@@ -310,5 +474,61 @@ class ScenarioRunnerTestCase(test.TestCase):
 
         runner._join_processes(process_pool, mock_result_queue)
 
+        self.assertEqual([mock.call("r1"), mock.call("r2")],
+                         mock_send_result.mock_calls)
         self.assertEqual(processes, process.join.call_count)
         mock_result_queue.close.assert_called_once_with()
+
+    @mock.patch(BASE + "ScenarioRunner._send_result")
+    def test__join_processes_http_connections(self, mock_send_result):
+        process_pool = collections.deque([mock.MagicMock()] * 2)
+        mock_result_queue = mock.MagicMock()
+        mock_result_queue.get.side_effect = [
+            "r1", osclients.ConnectionStats(1, 5), None,
+            osclients.ConnectionStats(2, 3), None]
+        runner = serial.SerialScenarioRunner(mock.MagicMock(),
+                                             mock.MagicMock())
+
+        runner._join_processes(process_pool, mock_result_queue)
+
+        mock_send_result.assert_called_once_with("r1")
+        self.assertEqual(osclients.ConnectionStats(3, 8),
+                         runner.http_connections)
+
+    @mock.patch(BASE + "ScenarioRunner._send_result")
+    def test__join_processes_killed(self, mock_send_result):
+        process = mock.MagicMock(is_alive=mock.MagicMock(return_value=False))
+        process_pool = collections.deque([process] * 2)
+        mock_result_queue = mock.MagicMock()
+        mock_result_queue.get.side_effect = [None, Queue.Empty]
+
+        runner = serial.SerialScenarioRunner(
+            mock.MagicMock(),
+            mock.MagicMock())
+
+        runner._join_processes(process_pool, mock_result_queue)
+
+        self.assertFalse(mock_send_result.called)
+        self.assertEqual(2, process.join.call_count)
+        mock_result_queue.close.assert_called_once_with()
+
+    def test_wait_for_results(self):
+        runner = serial.SerialScenarioRunner(
+            mock.MagicMock(),
+            mock.MagicMock())
+        runner.result_queue.append("result")
+        runner.result_added = mock.MagicMock()
+        runner.wait_for_results(timeout=1)
+        self.assertFalse(runner.result_added.wait.called)
+
+        runner.result_queue.clear()
+        runner.wait_for_results(timeout=1)
+        runner.result_added.wait.assert_called_once_with(1)
+
+    def test_notify(self):
+        runner = serial.SerialScenarioRunner(
+            mock.MagicMock(),
+            mock.MagicMock())
+        runner.result_added = mock.MagicMock()
+        runner.notify()
+        runner.result_added.notify_all.assert_called_once_with()
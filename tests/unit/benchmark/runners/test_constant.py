@@ -13,11 +13,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
 import jsonschema
 import mock
 
 from rally.benchmark.runners import base
 from rally.benchmark.runners import constant
+from rally.common import utils
 from rally import consts
 from tests.unit import fakes
 from tests.unit import test
@@ -61,42 +64,79 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
                                                  consts.RunnerType.CONSTANT})
         self.assertIsNotNone(runner)
 
-    @mock.patch(RUNNERS + "constant.time")
+    @mock.patch(RUNNERS + "constant.threading.Semaphore")
     @mock.patch(RUNNERS + "constant.threading.Thread")
     @mock.patch(RUNNERS + "constant.multiprocessing.Queue")
     @mock.patch(RUNNERS + "constant.base")
     def test__worker_process(self, mock_base, mock_queue, mock_thread,
-                             mock_time):
+                             mock_semaphore):
 
-        mock_thread_instance = mock.MagicMock(
-            isAlive=mock.MagicMock(return_value=False))
+        mock_thread_instance = mock.MagicMock()
         mock_thread.return_value = mock_thread_instance
 
         mock_event = mock.MagicMock(
             is_set=mock.MagicMock(return_value=False))
 
         times = 4
+        concurrency = 2
 
         fake_ram_int = iter(range(10))
 
         context = {"users": [{"tenant_id": "t1", "endpoint": "e1",
                               "id": "uuid1"}]}
 
-        constant._worker_process(mock_queue, fake_ram_int, 1, 2, times,
-                                 context, "Dummy", "dummy", (), mock_event)
+        constant._worker_process(mock_queue, fake_ram_int, 1, concurrency,
+                                 times, context, "Dummy", "dummy", (),
+                                 mock_event)
+
+        self.assertEqual(concurrency, mock_thread.call_count)
+        self.assertEqual(concurrency, mock_thread_instance.start.call_count)
+        self.assertEqual(concurrency, mock_thread_instance.join.call_count)
+        mock_semaphore.assert_called_once_with(concurrency)
+        mock_thread.assert_called_with(
+            target=constant._worker_thread_loop,
+            args=(mock_queue, fake_ram_int, 1, times, context, "Dummy",
+                  "dummy", (), mock_event, mock_semaphore.return_value))
+
+    @mock.patch(RUNNERS + "constant.base")
+    def test__worker_thread_loop(self, mock_base):
+        mock_queue = mock.MagicMock()
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False))
+        times = 4
+        fake_ram_int = iter(range(10))
+        context = {"users": [{"tenant_id": "t1", "endpoint": "e1",
+                              "id": "uuid1"}]}
+
+        slots = mock.MagicMock()
+
+        constant._worker_thread_loop(mock_queue, fake_ram_int, 3, times,
+                                     context, "Dummy", "dummy", (),
+                                     mock_event, slots)
 
-        self.assertEqual(times, mock_thread.call_count)
-        self.assertEqual(times, mock_thread_instance.start.call_count)
-        self.assertEqual(times, mock_thread_instance.join.call_count)
         self.assertEqual(times, mock_base._get_scenario_context.call_count)
+        scenario_context = mock_base._get_scenario_context.return_value
+        self.assertEqual(
+            [mock.call(mock_queue,
+                       (i, "Dummy", "dummy", scenario_context, ()), 3,
+                       slots)
+             for i in range(times)],
+            mock_base._worker_thread.mock_calls)
+        # NOTE: slots taken by iterations are released by base._worker_thread
+        self.assertEqual(times + 1, slots.acquire.call_count)
+        slots.release.assert_called_once_with()
+        # NOTE: the counter is shared, so the iteration that exceeds times
+        # is consumed and thrown away
+        self.assertEqual(times + 1, next(fake_ram_int))
 
-        for i in range(times):
-            scenario_context = mock_base._get_scenario_context(context)
-            call = mock.call(args=(mock_queue,
-                                   (i, "Dummy", "dummy",
-                                    scenario_context, ())),
-                             target=mock_base._worker_thread)
-            self.assertIn(call, mock_thread.mock_calls)
+    @mock.patch(RUNNERS + "constant.base")
+    def test__worker_thread_loop_aborted(self, mock_base):
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=True))
+        constant._worker_thread_loop(mock.MagicMock(), iter(range(10)), 0,
+                                     4, {}, "Dummy", "dummy", (), mock_event,
+                                     mock.MagicMock())
+        self.assertFalse(mock_base._worker_thread.called)
 
     @mock.patch(RUNNERS + "constant.base._run_scenario_once")
     def test__worker_thread(self, mock_run_scenario_once):
@@ -120,6 +160,23 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
         for result in runner.result_queue:
             self.assertIsNotNone(base.ScenarioRunnerResult(result))
 
+    @mock.patch.object(fakes.FakeScenario, "too_long",
+                       side_effect=lambda **kwargs: time.sleep(0.5))
+    def test__run_scenario_timeout(self, mock_too_long):
+        self.config.update({"timeout": 0.01, "times": 4})
+        runner = constant.ConstantScenarioRunner(self.task, self.config)
+
+        with utils.Timer() as timer:
+            runner._run_scenario(fakes.FakeScenario, "too_long",
+                                 self.context, {})
+
+        self.assertEqual(4, len(runner.result_queue))
+        for result in runner.result_queue:
+            self.assertEqual("TimeoutError", result["error"][0])
+        # NOTE: hung iterations hold concurrency slots until they are
+        # finished, so the last two iterations wait for the first two
+        self.assertGreaterEqual(timer.duration(), 0.5)
+
     def test__run_scenario_exception(self):
         runner = constant.ConstantScenarioRunner(self.task, self.config)
 
@@ -158,10 +215,57 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
         self.context = fakes.FakeUserContext({"task":
                                              {"uuid": "uuid"}}).context
         self.args = {"a": 1}
+        self.task = mock.MagicMock()
 
     def test_validate(self):
         constant.ConstantForDurationScenarioRunner.validate(self.config)
 
+    @mock.patch(RUNNERS + "constant.threading.Semaphore")
+    @mock.patch(RUNNERS + "constant.threading.Thread")
+    @mock.patch(RUNNERS + "constant.base")
+    def test__worker_process_for_duration(self, mock_base, mock_thread,
+                                          mock_semaphore):
+        mock_queue = mock.MagicMock()
+        mock_event = mock.MagicMock()
+        fake_ram_int = iter(range(10))
+
+        constant._worker_process_for_duration(
+            mock_queue, fake_ram_int, 1, 3, 100, 10, {}, "Dummy", "dummy",
+            (), mock_event)
+
+        self.assertEqual(
+            [mock.call(target=constant._worker_thread_loop_for_duration,
+                       args=(mock_queue, fake_ram_int, 1, 100, 10, {},
+                             "Dummy", "dummy", (), mock_event,
+                             mock_semaphore.return_value))] * 3,
+            [c for c in mock_thread.mock_calls if c[0] == ""])
+        self.assertEqual(3, mock_thread.return_value.start.call_count)
+        self.assertEqual(3, mock_thread.return_value.join.call_count)
+
+    @mock.patch(RUNNERS + "constant.time.time")
+    @mock.patch(RUNNERS + "constant.base")
+    def test__worker_thread_loop_for_duration(self, mock_base, mock_time):
+        mock_time.side_effect = [100, 103, 110.5]
+        mock_queue = mock.MagicMock()
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False))
+        fake_ram_int = iter(range(10))
+
+        slots = mock.MagicMock()
+
+        constant._worker_thread_loop_for_duration(
+            mock_queue, fake_ram_int, 1, 100, 10, {}, "Dummy", "dummy", (),
+            mock_event, slots)
+
+        scenario_context = mock_base._get_scenario_context.return_value
+        self.assertEqual(
+            [mock.call(mock_queue,
+                       (i, "Dummy", "dummy", scenario_context, ()), 1, slots)
+             for i in range(3)],
+            mock_base._worker_thread.mock_calls)
+        self.assertEqual(4, slots.acquire.call_count)
+        slots.release.assert_called_once_with()
+
     def test_validate_failed(self):
         self.config["type"] = consts.RunnerType.CONSTANT
         self.assertRaises(jsonschema.ValidationError, constant.
@@ -170,7 +274,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration(self):
         runner = constant.ConstantForDurationScenarioRunner(
-                        None, self.config)
+                        self.task, self.config)
 
         runner._run_scenario(fakes.FakeScenario, "do_it",
                              self.context, self.args)
@@ -182,7 +286,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration_exception(self):
         runner = constant.ConstantForDurationScenarioRunner(
-                        None, self.config)
+                        self.task, self.config)
 
         runner._run_scenario(fakes.FakeScenario,
                              "something_went_wrong", self.context, self.args)
@@ -195,7 +299,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration_timeout(self):
         runner = constant.ConstantForDurationScenarioRunner(
-            None, self.config)
+            self.task, self.config)
 
         runner._run_scenario(fakes.FakeScenario,
                              "raise_timeout", self.context, self.args)
@@ -207,7 +311,8 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
         self.assertIn("error", runner.result_queue[0])
 
     def test__run_scenario_constantly_aborted(self):
-        runner = constant.ConstantForDurationScenarioRunner(None, self.config)
+        runner = constant.ConstantForDurationScenarioRunner(self.task,
+                                                            self.config)
 
         runner.abort()
         runner._run_scenario(fakes.FakeScenario,
@@ -215,7 +320,8 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
         self.assertEqual(len(runner.result_queue), 0)
 
     def test_abort(self):
-        runner = constant.ConstantForDurationScenarioRunner(None, self.config)
+        runner = constant.ConstantForDurationScenarioRunner(self.task,
+                                                            self.config)
         self.assertFalse(runner.aborted.is_set())
         runner.abort()
         self.assertTrue(runner.aborted.is_set())
@@ -0,0 +1,129 @@
+# Copyright 2015: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import jsonschema
+import mock
+
+from rally.benchmark.runners import base
+from rally.benchmark.runners import distributed
+from rally import consts
+from rally import exceptions
+from tests.unit import fakes
+from tests.unit import test
+
+
+RUNNERS = "rally.benchmark.runners."
+
+
+class DistributedScenarioRunnerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(DistributedScenarioRunnerTestCase, self).setUp()
+        self.task = {"uuid": "fake_uuid"}
+        self.config = {"type": consts.RunnerType.DISTRIBUTED, "workers": 3,
+                       "times": 10, "concurrency": 4, "timeout": 2}
+        self.context = fakes.FakeUserContext({"task":
+                                             {"uuid": "uuid"}}).context
+        self.args = {"a": 1}
+
+    def test_validate(self):
+        distributed.DistributedScenarioRunner.validate(self.config)
+
+    def test_validate_failed(self):
+        self.config["workers"] = 0
+        self.assertRaises(jsonschema.ValidationError,
+                          distributed.DistributedScenarioRunner.validate,
+                          self.config)
+
+    def test__get_shard(self):
+        shards = [distributed._get_shard(i, 3, 8) for i in range(3)]
+        self.assertEqual([[0, 3, 6, 8], [1, 4, 7, 8], [2, 5, 8, 8]],
+                         [[next(shard) for i in range(4)]
+                          for shard in shards])
+
+    @mock.patch(RUNNERS + "distributed.socket.gethostname",
+                return_value="host")
+    @mock.patch(RUNNERS + "distributed.db")
+    def test__run_scenario(self, mock_db, mock_gethostname):
+        runner = distributed.DistributedScenarioRunner(self.task, self.config)
+
+        runner._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                             self.args)
+
+        self.assertEqual(self.config["times"], len(runner.result_queue))
+        for result in runner.result_queue:
+            self.assertIsNotNone(base.ScenarioRunnerResult(result))
+        hostnames = ["host-fake_uuid-%d" % i for i in range(3)]
+        self.assertEqual(
+            [mock.call({"hostname": hostname}) for hostname in hostnames],
+            mock_db.register_worker.mock_calls)
+        self.assertEqual([mock.call(hostname) for hostname in hostnames],
+                         mock_db.unregister_worker.mock_calls)
+
+    @mock.patch(RUNNERS + "distributed.constant._worker_process")
+    @mock.patch(RUNNERS + "distributed.db")
+    def test__run_scenario_shards(self, mock_db, mock_worker_process):
+        queue_iterations = []
+
+        def fake_worker_process(queue, iteration_gen, timeout, concurrency,
+                                times, *args):
+            iterations = []
+            for i in iteration_gen:
+                if i >= times:
+                    break
+                iterations.append(i)
+            queue.put({"duration": float(len(iterations)),
+                       "idle_duration": float(concurrency),
+                       "atomic_actions": dict(("it%d" % i, 0)
+                                              for i in iterations),
+                       "error": []})
+
+        mock_worker_process.side_effect = fake_worker_process
+        runner = distributed.DistributedScenarioRunner(self.task, self.config)
+
+        runner._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                             self.args)
+
+        for result in runner.result_queue:
+            queue_iterations.extend(result["atomic_actions"])
+        self.assertEqual(sorted("it%d" % i for i in range(10)),
+                         sorted(queue_iterations))
+        self.assertEqual([4, 3, 3], sorted(
+            (r["duration"] for r in runner.result_queue), reverse=True))
+        self.assertEqual([1, 1, 2], sorted(
+            r["idle_duration"] for r in runner.result_queue))
+
+    @mock.patch(RUNNERS + "distributed.db")
+    def test__run_scenario_register_failed(self, mock_db):
+        mock_db.register_worker.side_effect = [
+            None, exceptions.WorkerAlreadyRegistered(worker="w")]
+        runner = distributed.DistributedScenarioRunner(self.task, self.config)
+
+        self.assertRaises(exceptions.WorkerAlreadyRegistered,
+                          runner._run_scenario, fakes.FakeScenario, "do_it",
+                          self.context, self.args)
+        self.assertEqual(1, mock_db.unregister_worker.call_count)
+        self.assertEqual(0, len(runner.result_queue))
+
+    @mock.patch(RUNNERS + "distributed.db")
+    def test__run_scenario_aborted(self, mock_db):
+        runner = distributed.DistributedScenarioRunner(self.task, self.config)
+
+        runner.abort()
+        runner._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                             self.args)
+
+        self.assertEqual(0, len(runner.result_queue))
+        self.assertEqual(3, mock_db.unregister_worker.call_count)
@@ -42,6 +42,20 @@ class RPSScenarioRunnerTestCase(test.TestCase):
         }
         rps.RPSScenarioRunner.validate(config)
 
+    def test_validate_open_loop(self):
+        config = {
+            "type": consts.RunnerType.RPS,
+            "times": 10,
+            "rps": 100,
+            "arrival": "ramp",
+            "start_rps": 0.5
+        }
+        rps.RPSScenarioRunner.validate(config)
+
+        config["arrival"] = "bursty"
+        self.assertRaises(jsonschema.ValidationError,
+                          rps.RPSScenarioRunner.validate, config)
+
     def test_validate_failed(self):
         config = {"type": consts.RunnerType.RPS,
                   "a": 10}
@@ -61,11 +75,12 @@ class RPSScenarioRunnerTestCase(test.TestCase):
 
     @mock.patch(RUNNERS + "rps.LOG")
     @mock.patch(RUNNERS + "rps.time")
+    @mock.patch(RUNNERS + "rps.threading.BoundedSemaphore")
     @mock.patch(RUNNERS + "rps.threading.Thread")
     @mock.patch(RUNNERS + "rps.multiprocessing.Queue")
     @mock.patch(RUNNERS + "rps.base")
     def test__worker_process(self, mock_base, mock_queue, mock_thread,
-                             mock_time, mock_log):
+                             mock_semaphore, mock_time, mock_log):
 
         def time_side():
             time_side.last += 0.03
@@ -103,15 +118,102 @@ class RPSScenarioRunnerTestCase(test.TestCase):
         self.assertEqual(times, mock_thread_instance.isAlive.call_count)
         self.assertEqual(times * 4 - 1, mock_time.time.count)
         self.assertEqual(times, mock_base._get_scenario_context.call_count)
+        mock_semaphore.assert_called_once_with(max_concurrent)
+        slots = mock_semaphore.return_value
+        self.assertEqual(times, slots.acquire.call_count)
 
         for i in range(times):
             scenario_context = mock_base._get_scenario_context(context)
             call = mock.call(args=(mock_queue,
                                    (i, "Dummy", "dummy",
-                                    scenario_context, ())),
+                                    scenario_context, ()), 1, slots),
                              target=mock_base._worker_thread)
             self.assertIn(call, mock_thread.mock_calls)
 
+    def test__get_schedule_constant(self):
+        self.assertEqual([0.0, 0.25, 0.5, 0.75],
+                         list(rps._get_schedule("constant", 4, 4)))
+
+    def test__get_schedule_ramp(self):
+        self.assertEqual([0.0, 1.0, 1.0 + 1 / 1.5],
+                         list(rps._get_schedule("ramp", 2, 3, start_rps=1)))
+        self.assertEqual([0.0], list(rps._get_schedule("ramp", 2, 1, 1)))
+
+    @mock.patch(RUNNERS + "rps.random.expovariate")
+    def test__get_schedule_poisson(self, mock_expovariate):
+        mock_expovariate.side_effect = [0.5, 0.25, 1]
+        self.assertEqual([0.0, 0.5, 0.75],
+                         list(rps._get_schedule("poisson", 2, 3)))
+        mock_expovariate.assert_called_with(2)
+
+    @mock.patch(RUNNERS + "rps.time.time", return_value=10.5)
+    @mock.patch(RUNNERS + "rps.base._run_scenario_once_with_timeout")
+    def test__scheduled_worker_thread(self, mock_run_scenario_once,
+                                      mock_time):
+        mock_run_scenario_once.return_value = {"duration": 1}
+        mock_queue = mock.MagicMock()
+        slots = mock.MagicMock()
+
+        rps._scheduled_worker_thread(mock_queue, ("some_args",), 3, 10,
+                                     slots)
+
+        mock_run_scenario_once.assert_called_once_with(("some_args",), 3,
+                                                       slots)
+        mock_queue.put.assert_called_once_with({"duration": 1,
+                                                "start_lag": 0.5})
+
+    @mock.patch(RUNNERS + "rps.time.time", return_value=100.2)
+    @mock.patch(RUNNERS + "rps.threading")
+    @mock.patch(RUNNERS + "rps.base")
+    def test__open_loop_worker_process(self, mock_base, mock_threading,
+                                       mock_time):
+        mock_thread = mock_threading.Thread
+        mock_thread.return_value.isAlive.return_value = False
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False),
+            wait=mock.MagicMock(return_value=False))
+        mock_queue = mock.MagicMock()
+        context = {"users": []}
+        schedule = [0.0, 0.1, 0.5]
+
+        rps._open_loop_worker_process(mock_queue, iter(range(10)), 0, 3,
+                                      schedule, 100, 2, context, "Dummy",
+                                      "dummy", (), mock_event)
+
+        # NOTE(rally): the first two iterations are already late
+        mock_event.wait.assert_called_once_with(mock.ANY)
+        self.assertAlmostEqual(0.3, mock_event.wait.call_args[0][0])
+        self.assertEqual(3, mock_thread.call_count)
+        self.assertEqual(3, mock_thread.return_value.start.call_count)
+        self.assertEqual(3, mock_thread.return_value.join.call_count)
+        for i, scheduled_at in enumerate([100.0, 100.1, 100.5]):
+            scenario_context = mock_base._get_scenario_context(context)
+            call = mock.call(
+                target=rps._scheduled_worker_thread,
+                args=(mock_queue,
+                      (i, "Dummy", "dummy", scenario_context, ()), 0,
+                      scheduled_at,
+                      mock_threading.BoundedSemaphore.return_value))
+            self.assertIn(call, mock_thread.mock_calls)
+        self.assertEqual(3, mock_threading.BoundedSemaphore.return_value
+                         .acquire.call_count)
+
+    @mock.patch(RUNNERS + "rps.time.time", return_value=0)
+    @mock.patch(RUNNERS + "rps.threading.Thread")
+    @mock.patch(RUNNERS + "rps.base")
+    def test__open_loop_worker_process_aborted_while_waiting(
+            self, mock_base, mock_thread, mock_time):
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False),
+            wait=mock.MagicMock(return_value=True))
+
+        rps._open_loop_worker_process(mock.MagicMock(), iter(range(10)), 0,
+                                      3, [3600.0] * 3, 0, 2, {}, "Dummy",
+                                      "dummy", (), mock_event)
+
+        mock_event.wait.assert_called_once_with(3600.0)
+        self.assertFalse(mock_thread.called)
+
     @mock.patch(RUNNERS + "rps.base._run_scenario_once")
     def test__worker_thread(self, mock_run_scenario_once):
         mock_queue = mock.MagicMock()
@@ -140,6 +242,21 @@ class RPSScenarioRunnerTestCase(test.TestCase):
         for result in runner.result_queue:
             self.assertIsNotNone(base.ScenarioRunnerResult(result))
 
+    def test__run_scenario_open_loop(self):
+        context = fakes.FakeUserContext({}).context
+        context["task"] = {"uuid": "fake_uuid"}
+
+        config = {"times": 10, "rps": 1000, "arrival": "poisson",
+                  "max_concurrency": 4}
+        runner = rps.RPSScenarioRunner(self.task, config)
+
+        runner._run_scenario(fakes.FakeScenario, "do_it", context, {})
+
+        self.assertEqual(config["times"], len(runner.result_queue))
+        for result in runner.result_queue:
+            self.assertIn("start_lag", result)
+            self.assertIsNotNone(base.ScenarioRunnerResult(result))
+
     @mock.patch(RUNNERS + "rps.time.sleep")
     def test__run_scenario_exception(self, mock_sleep):
         context = fakes.FakeUserContext({}).context
@@ -0,0 +1,114 @@
+# Copyright 2015: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+import jsonschema
+import mock
+
+from rally.benchmark.runners import base
+from rally.benchmark.runners import step
+from rally import consts
+from tests.unit import fakes
+from tests.unit import test
+
+
+RUNNERS = "rally.benchmark.runners."
+
+
+class StepScenarioRunnerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(StepScenarioRunnerTestCase, self).setUp()
+        self.task = {"uuid": "fake_uuid"}
+        self.config = {"type": consts.RunnerType.STEP, "start": 1,
+                       "step": 2, "steps": 3, "times": 4}
+        self.context = fakes.FakeUserContext({"task":
+                                             {"uuid": "uuid"}}).context
+        self.args = {"a": 1}
+
+    def test_validate(self):
+        step.StepScenarioRunner.validate(self.config)
+        self.config.update({"load": "rps", "max_concurrency": 5,
+                            "timeout": 10})
+        step.StepScenarioRunner.validate(self.config)
+
+    def test_validate_failed(self):
+        del self.config["steps"]
+        self.assertRaises(jsonschema.ValidationError,
+                          step.StepScenarioRunner.validate, self.config)
+
+    def test_get_runner(self):
+        runner = base.ScenarioRunner.get_runner(self.task, self.config)
+        self.assertIsInstance(runner, step.StepScenarioRunner)
+
+    @mock.patch(RUNNERS + "step.utils.RAMInt")
+    @mock.patch(RUNNERS + "step.StepScenarioRunner._run_concurrency_step")
+    def test__run_scenario_steps(self, mock_run_step, mock_ram_int):
+        runner = step.StepScenarioRunner(self.task, self.config)
+        levels = []
+        mock_run_step.side_effect = (
+            lambda *args: levels.append(runner.load_level))
+
+        runner._run_scenario("cls", "method", self.context, self.args)
+
+        iteration_gen = mock_ram_int.return_value
+        self.assertEqual([mock.call(0), mock.call(4), mock.call(8)],
+                         iteration_gen.reset.mock_calls)
+        self.assertEqual(
+            [mock.call(iteration_gen, 4, 1, "cls", "method", self.context,
+                       self.args),
+             mock.call(iteration_gen, 8, 3, "cls", "method", self.context,
+                       self.args),
+             mock.call(iteration_gen, 12, 5, "cls", "method", self.context,
+                       self.args)],
+            mock_run_step.mock_calls)
+        self.assertEqual([1, 3, 5], levels)
+
+    def test__run_scenario_concurrency(self):
+        runner = step.StepScenarioRunner(self.task, self.config)
+
+        runner._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                             self.args)
+
+        self.assertEqual(12, len(runner.result_queue))
+        levels = collections.defaultdict(int)
+        for result in runner.result_queue:
+            levels[result["load_level"]] += 1
+        self.assertEqual({1: 4, 3: 4, 5: 4}, levels)
+
+    def test__run_scenario_rps(self):
+        self.config.update({"load": "rps", "start": 100, "step": 100})
+        runner = step.StepScenarioRunner(self.task, self.config)
+
+        runner._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                             self.args)
+
+        self.assertEqual(12, len(runner.result_queue))
+        levels = collections.defaultdict(int)
+        for result in runner.result_queue:
+            levels[result["load_level"]] += 1
+        self.assertEqual({100: 4, 200: 4, 300: 4}, levels)
+        for result in runner.result_queue:
+            self.assertIn("start_lag", result)
+
+    def test__run_scenario_aborted(self):
+        runner = step.StepScenarioRunner(self.task, self.config)
+
+        runner.abort()
+        runner._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                             self.args)
+
+        self.assertEqual(0, len(runner.result_queue))
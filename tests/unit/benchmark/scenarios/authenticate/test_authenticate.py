@@ -31,4 +31,4 @@ class AuthenticateTestCase(test.TestCase):
                                              clients=mock_osclients)
 
         scenario.keystone()
-        self.assertEqual(scenario._clients.keystone.call_count, 1)
+        scenario._clients.keystone.assert_called_once_with(use_cache=False)
@@ -403,27 +403,20 @@ class NovaScenarioTestCase(test.TestCase):
         self._test_atomic_action_timer(nova_scenario.atomic_actions(),
                                        "nova.delete_image")
 
+    @mock.patch(NOVA_UTILS + ".bench_utils.wait_for_all")
     @mock.patch(NOVA_UTILS + ".NovaScenario.clients")
-    def test__boot_servers(self, mock_clients):
+    def test__boot_servers(self, mock_clients, mock_wait_for_all):
         mock_clients("nova").servers.list.return_value = [self.server,
                                                           self.server1]
         nova_scenario = utils.NovaScenario()
-        nova_scenario._boot_servers("prefix", "image", "flavor", 2)
-        expected = [
-            mock.call(
-                self.server, is_ready=self.res_is.mock(),
-                update_resource=self.gfm(),
-                check_interval=CONF.benchmark.nova_server_boot_poll_interval,
-                timeout=CONF.benchmark.nova_server_boot_timeout
-            ),
-            mock.call(
-                self.server1, is_ready=self.res_is.mock(),
-                update_resource=self.gfm(),
-                check_interval=CONF.benchmark.nova_server_boot_poll_interval,
-                timeout=CONF.benchmark.nova_server_boot_timeout
-            )
-        ]
-        self.assertEqual(expected, self.wait_for.mock.mock_calls)
+        servers = nova_scenario._boot_servers("prefix", "image", "flavor", 2)
+        mock_wait_for_all.assert_called_once_with(
+            [self.server, self.server1], is_ready=self.res_is.mock(),
+            update_resource=self.gfm(),
+            check_interval=CONF.benchmark.nova_server_boot_poll_interval,
+            timeout=CONF.benchmark.nova_server_boot_timeout)
+        self.assertEqual(mock_wait_for_all.return_value, servers)
+        self.assertFalse(self.wait_for.mock.called)
         self.res_is.mock.assert_has_calls([mock.call("ACTIVE")])
         self._test_atomic_action_timer(nova_scenario.atomic_actions(),
                                        "nova.boot_servers")
@@ -228,3 +228,109 @@ class MaxAverageDurationTestCase(test.TestCase):
         self.assertTrue(sla.add_iteration({"duration": 5.0}))   # avg = 3.667
         self.assertFalse(sla.add_iteration({"duration": 7.0}))  # avg = 4.5
         self.assertTrue(sla.add_iteration({"duration": 1.0}))   # avg = 3.8
+
+    def test_add_iteration_failed_first(self):
+        sla = base.MaxAverageDuration(4.0)
+        self.assertTrue(sla.add_iteration({"duration": 9.0,
+                                           "error": ["Error", "msg", ""]}))
+        self.assertFalse(sla.add_iteration({"duration": 5.0}))
+        self.assertEqual(5.0, sla.avg)
+
+
+class PercentileDurationTestCase(test.TestCase):
+    def test_config_schema(self):
+        base.PercentileDuration.validate(
+            {"max_percentile_duration": {
+                "p95": 5.0, "atomic_actions": {"a": {"p90": 1.0}}}})
+        for config in ({"p95": 0}, {"p42": 1.0},
+                       {"atomic_actions": {"a": {"p42": 1.0}}}):
+            self.assertRaises(jsonschema.ValidationError,
+                              base.PercentileDuration.validate,
+                              {"max_percentile_duration": config})
+
+    def test_result(self):
+        sla1 = base.PercentileDuration({"p90": 9.0})
+        sla2 = base.PercentileDuration({"p90": 8.5})
+        for sla in [sla1, sla2]:
+            for duration in range(1, 11):
+                sla.add_iteration({"duration": duration})
+        self.assertTrue(sla1.result()["success"])   # 9 of 10 are <= 9.0
+        self.assertFalse(sla2.result()["success"])  # 8 of 10 are <= 8.5
+        self.assertEqual("Passed", sla1.status())
+        self.assertEqual("Failed", sla2.status())
+        self.assertEqual("Maximum percentile durations: iteration p90 <= "
+                         "8.50s (80.0% of 10) - Failed",
+                         sla2.result()["detail"])
+
+    def test_result_no_iterations(self):
+        sla = base.PercentileDuration({"p99": 1.0})
+        self.assertTrue(sla.result()["success"])
+
+    def test_add_iteration(self):
+        sla = base.PercentileDuration({"p50": 2.0})
+        self.assertTrue(sla.add_iteration({"duration": 1.0}))
+        self.assertTrue(sla.add_iteration({"duration": 3.0, "error": []}))
+        self.assertFalse(sla.add_iteration({"duration": 3.0}))
+        self.assertFalse(sla.add_iteration({"duration": 1.0,
+                                            "error": ["Error", "msg", ""]}))
+        self.assertTrue(sla.add_iteration({"duration": 2.0}))
+
+    def test_add_iteration_first_iterations(self):
+        sla = base.PercentileDuration({"p95": 1.0})
+        # NOTE(rally): p95 can't be checked before there are 20 durations,
+        #              so the first slow iteration doesn't abort the load
+        self.assertTrue(sla.add_iteration({"duration": 2.0}))
+        self.assertFalse(sla.result()["success"])
+        for i in range(18):
+            self.assertTrue(sla.add_iteration({"duration": 0.5}))
+        self.assertFalse(sla.result()["success"])  # 18 of 19 are <= 1.0
+        self.assertTrue(sla.add_iteration({"duration": 0.5}))
+        self.assertTrue(sla.result()["success"])   # 19 of 20 are <= 1.0
+        self.assertFalse(sla.add_iteration({"duration": 2.0}))
+        self.assertFalse(sla.result()["success"])
+
+    def test_add_iteration_atomic_actions(self):
+        sla = base.PercentileDuration(
+            {"p95": 10.0, "atomic_actions": {"a": {"p50": 1.0},
+                                             "b": {"p99": 5.0}}})
+        self.assertTrue(sla.add_iteration(
+            {"duration": 3.0, "atomic_actions": {"a": 0.5, "b": 2.0}}))
+        self.assertTrue(sla.add_iteration(
+            {"duration": 3.0, "atomic_actions": {"a": 1.5, "b": None}}))
+        self.assertFalse(sla.add_iteration(
+            {"duration": 3.0, "atomic_actions": {"a": 2.5}}))
+        self.assertEqual({None: 3, "a": 3, "b": 1}, sla.counts)
+        self.assertEqual("Maximum percentile durations: iteration p95 <= "
+                         "10.00s (100.0% of 3); a p50 <= 1.00s (33.3% of 3); "
+                         "b p99 <= 5.00s (100.0% of 1) - Failed",
+                         sla.details())
+
+
+class MinThroughputTestCase(test.TestCase):
+    def test_config_schema(self):
+        self.assertRaises(jsonschema.ValidationError,
+                          base.MinThroughput.validate,
+                          {"min_throughput": 0})
+
+    def test_result(self):
+        sla1 = base.MinThroughput(1.0)
+        sla2 = base.MinThroughput(2.0)
+        for sla in [sla1, sla2]:
+            self.assertTrue(sla.add_iteration(
+                {"duration": 1.0, "idle_duration": 0.5, "timestamp": 10}))
+            self.assertTrue(sla.add_iteration(
+                {"duration": 1.0, "timestamp": 11}))
+            self.assertTrue(sla.add_iteration(
+                {"duration": 0.5, "timestamp": 11.5,
+                 "error": ["Error", "msg", ""]}))
+        self.assertTrue(sla1.result()["success"])   # 2 iterations in 2 sec
+        self.assertFalse(sla2.result()["success"])
+        self.assertEqual("Minimum throughput 1.00 >= 2.00 iterations/sec - "
+                         "Failed", sla2.details())
+
+    def test_result_no_iterations(self):
+        sla = base.MinThroughput(1.0)
+        result = sla.result()
+        self.assertTrue(result["success"])
+        self.assertEqual("Minimum throughput n/a >= 1.00 iterations/sec - "
+                         "Passed", result["detail"])
@@ -20,8 +20,11 @@ import copy
 
 import jsonschema
 import mock
+from oslo_config import fixture
 
 from rally.benchmark import engine
+from rally.benchmark import types
+from rally.benchmark import validation
 from rally import consts
 from rally import exceptions
 from tests.unit import fakes
@@ -56,6 +59,25 @@ class BenchmarkEngineTestCase(test.TestCase):
         ]
         mock_validate.assert_has_calls(expected_calls)
 
+    @mock.patch("rally.benchmark.engine.jsonschema.validate")
+    def test_validate_and_run_share_resource_cache(self, mock_json_validate):
+        eng = engine.BenchmarkEngine({}, mock.MagicMock())
+        caches = []
+
+        def semantic(config):
+            caches.append(types.get_resource_cache())
+
+        eng._validate_config_scenarios_name = mock.MagicMock()
+        eng._validate_config_syntax = mock.MagicMock()
+        eng._validate_config_semantic = semantic
+        eng._run = lambda: caches.append(types.get_resource_cache())
+
+        eng.validate()
+        eng.run()
+
+        self.assertEqual([eng.resource_cache, eng.resource_cache], caches)
+        self.assertIsNone(types.get_resource_cache())
+
     def test_validate__wrong_schema(self):
         config = {
             "wrong": True
@@ -178,6 +200,37 @@ class BenchmarkEngineTestCase(test.TestCase):
                           eng._validate_config_semantic_helper, "a", "u", "n",
                           "p", mock.MagicMock(), {})
 
+    @mock.patch("rally.benchmark.engine.LOG")
+    @mock.patch("rally.benchmark.engine.osclients.Clients")
+    @mock.patch("rally.benchmark.engine.users_ctx")
+    @mock.patch("rally.benchmark.engine.objects.Deployment.get")
+    def test__validate_config_semantic_deduplicated(self, mock_deployment_get,
+                                                    mock_userctx,
+                                                    mock_osclients,
+                                                    mock_log):
+        mock_userctx.UserGenerator = fakes.FakeUserContext
+        calls = []
+
+        @validation.validator
+        def fake_validator(config, clients, deployment):
+            calls.append(config)
+
+        @fake_validator()
+        def scenario():
+            pass
+
+        config = {"a": [{"args": {"x": 1}}, {"args": {"x": 1}},
+                        {"args": {"x": 2}}]}
+        eng = engine.BenchmarkEngine(config, mock.MagicMock())
+        with mock.patch("rally.benchmark.engine.base_scenario.Scenario"
+                        ".meta", return_value=scenario.validators):
+            eng._validate_config_semantic(config)
+
+        self.assertEqual(2, len(calls))
+        mock_log.info.assert_called_once_with(
+            "Task %s | Validator fake_validator: 3 calls (1 deduplicated) "
+            "in 0.00 sec" % eng.task["uuid"])
+
     @mock.patch("rally.benchmark.engine.osclients.Clients")
     @mock.patch("rally.benchmark.engine.users_ctx")
     @mock.patch("rally.benchmark.engine.BenchmarkEngine"
@@ -247,6 +300,9 @@ class BenchmarkEngineTestCase(test.TestCase):
         task = mock.MagicMock()
         eng = engine.BenchmarkEngine(config, task)
         eng.run()
+        runner = mock_runner.get_runner.return_value
+        self.assertEqual([mock.call(), mock.call()],
+                         runner.notify.mock_calls)
 
     @mock.patch("rally.benchmark.engine.BenchmarkEngine.consume_results")
     @mock.patch("rally.benchmark.engine.base_scenario.Scenario")
@@ -303,8 +359,9 @@ class BenchmarkEngineTestCase(test.TestCase):
         self.assertEqual(result, expected_result)
         mock_meta.assert_called_once_with(name, "context")
 
+    @mock.patch("rally.benchmark.engine.processing_utils.ScenarioSummary")
     @mock.patch("rally.benchmark.sla.base.SLAChecker")
-    def test_consume_results(self, mock_sla):
+    def test_consume_results(self, mock_sla, mock_summary):
         mock_sla_instance = mock.MagicMock()
         mock_sla.return_value = mock_sla_instance
         key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
@@ -319,14 +376,56 @@ class BenchmarkEngineTestCase(test.TestCase):
         eng = engine.BenchmarkEngine(config, task)
         eng.duration = 123
         eng.full_duration = 456
+        eng.context_durations = {"users": {"setup": 1.0, "cleanup": 2.0}}
         eng.consume_results(key, task, is_done, runner)
         mock_sla.assert_called_once_with({"fake": 2})
         expected_iteration_calls = [mock.call(1), mock.call(2)]
         self.assertEqual(expected_iteration_calls,
                          mock_sla_instance.add_iteration.mock_calls)
+        self.assertEqual([mock.call(timeout=1)] * 2,
+                         runner.wait_for_results.mock_calls)
+        task_result = task.append_results.return_value
+        task.append_results.assert_called_once_with(
+            key, {"raw": [], "load_duration": 0, "full_duration": 0,
+                  "sla": []})
+        task.append_raw_results.assert_called_once_with(
+            task_result["id"], [1, 2])
+        task.update_results.assert_called_once_with(
+            task_result["id"], {"raw": [], "load_duration": 123,
+                                "full_duration": 456,
+                                "context_durations": {
+                                    "users": {"setup": 1.0, "cleanup": 2.0}},
+                                "sla": mock_sla_instance.results.return_value,
+                                "summary":
+                                    mock_summary.return_value.to_dict.
+                                    return_value})
+        self.assertEqual([mock.call(1), mock.call(2)],
+                         mock_summary.return_value.add.mock_calls)
+
+    @mock.patch("rally.benchmark.engine.processing_utils.ScenarioSummary")
+    @mock.patch("rally.benchmark.sla.base.SLAChecker")
+    def test_consume_results_flushes_chunks(self, mock_sla, mock_summary):
+        self.useFixture(fixture.Config()).config(
+            results_chunk_size=2, group="benchmark")
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque([1, 2, 3, 4, 5])
+        is_done = mock.MagicMock()
+        is_done.isSet.return_value = True
+        eng = engine.BenchmarkEngine({}, task)
+        eng.duration = 123
+        eng.full_duration = 456
+        eng.consume_results(key, task, is_done, runner)
+        task_result = task.append_results.return_value
+        self.assertEqual([mock.call(task_result["id"], [1, 2]),
+                          mock.call(task_result["id"], [3, 4]),
+                          mock.call(task_result["id"], [5])],
+                         task.append_raw_results.mock_calls)
 
+    @mock.patch("rally.benchmark.engine.processing_utils.ScenarioSummary")
     @mock.patch("rally.benchmark.sla.base.SLAChecker")
-    def test_consume_results_sla_failure_abort(self, mock_sla):
+    def test_consume_results_sla_failure_abort(self, mock_sla, mock_summary):
         mock_sla_instance = mock.MagicMock()
         mock_sla.return_value = mock_sla_instance
         mock_sla_instance.add_iteration.side_effect = [True, True, False,
@@ -347,8 +446,10 @@ class BenchmarkEngineTestCase(test.TestCase):
         mock_sla.assert_called_once_with({"fake": 2})
         self.assertTrue(runner.abort.called)
 
+    @mock.patch("rally.benchmark.engine.processing_utils.ScenarioSummary")
     @mock.patch("rally.benchmark.sla.base.SLAChecker")
-    def test_consume_results_sla_failure_continue(self, mock_sla):
+    def test_consume_results_sla_failure_continue(self, mock_sla,
+                                                  mock_summary):
         mock_sla_instance = mock.MagicMock()
         mock_sla.return_value = mock_sla_instance
         mock_sla_instance.add_iteration.side_effect = [True, True, False,
@@ -0,0 +1,86 @@
+# Copyright 2015: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from rally.benchmark import results
+from tests.unit import test
+
+
+def _iteration(duration, error=None, atomic_actions=None, data=None,
+               errors="", timestamp=None):
+    iteration = {
+        "duration": duration,
+        "idle_duration": duration / 10.0,
+        "error": error or [],
+        "scenario_output": {"data": data or {}, "errors": errors},
+        "atomic_actions": atomic_actions or {}
+    }
+    if timestamp is not None:
+        iteration["timestamp"] = timestamp
+    return iteration
+
+
+class IterationResultsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(IterationResultsTestCase, self).setUp()
+        self.iterations = [
+            _iteration(1.0, atomic_actions={"a": 0.5, "b": 0.4},
+                       data={"x": 1}, timestamp=10),
+            _iteration(2.0, error=["KeyError", "foo", "tb"],
+                       atomic_actions={"a": 0.7, "b": None},
+                       errors="out err", timestamp=11),
+            dict(_iteration(3.0, atomic_actions={"a": 1.1, "c": 2.0},
+                            data={"y": 2}, timestamp=12), start_lag=0.01,
+                 load_level=2),
+            _iteration(4.0, error=["KeyError", "foo", "tb"])
+        ]
+
+    def test_round_trip(self):
+        store = results.IterationResults(self.iterations)
+        self.assertEqual(4, len(store))
+        self.assertEqual(self.iterations, store.to_list())
+        self.assertEqual(self.iterations[-1], store[-1])
+        self.assertRaises(IndexError, store.__getitem__, 4)
+
+    def test_columns(self):
+        store = results.IterationResults(self.iterations)
+        self.assertEqual([1.0, 2.0, 3.0, 4.0], list(store.durations))
+        self.assertEqual(["a", "b", "c"], list(store.atomic_actions))
+        self.assertEqual(["x", "y"], list(store.output_data))
+        self.assertEqual([0.5, 0.7, 1.1], store.atomic_action_durations("a"))
+        self.assertEqual([0.4], store.atomic_action_durations("b"))
+        self.assertEqual([2.0], store.atomic_action_durations("c"))
+        self.assertEqual([], store.atomic_action_durations("no_such"))
+        self.assertEqual([1.0, 3.0], store.successful_durations())
+        self.assertEqual({1: "out err"}, store.output_errors)
+        self.assertEqual(0.01, store.start_lags[2])
+        self.assertEqual(2, store.load_levels[2])
+
+    def test_errors(self):
+        store = results.IterationResults(self.iterations)
+        self.assertFalse(store.is_error(0))
+        self.assertTrue(store.is_error(1))
+        self.assertEqual(["KeyError", "foo", "tb"], store.error(3))
+        self.assertEqual([], store.error(2))
+        # NOTE(rally): equal strings are stored once
+        self.assertEqual(store.errors[1], store.errors[3])
+        self.assertEqual(["KeyError", "foo", "tb"], store._strings)
+
+    def test_append(self):
+        store = results.IterationResults()
+        self.assertEqual(0, len(store))
+        store.append(self.iterations[0])
+        self.assertEqual(1, len(store))
+        self.assertEqual(self.iterations[0], store[0])
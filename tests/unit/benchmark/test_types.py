@@ -17,6 +17,7 @@ import mock
 
 from rally.benchmark import types
 from rally import exceptions
+from rally import objects
 from tests.unit import fakes
 from tests.unit import test
 
@@ -223,6 +224,101 @@ class NeutronNetworkResourceTypeTestCase(test.TestCase):
                           self.clients, resource_config)
 
 
+class ResourceIndexTestCase(test.TestCase):
+
+    def test_find(self):
+        resources = [fakes.FakeResource(name="m1.tiny", id="1"),
+                     fakes.FakeResource(name="m1.small", id="2"),
+                     fakes.FakeResource(name="m1.small", id="3")]
+        index = types.ResourceIndex(resources)
+
+        self.assertEqual(resources[:1], index.find_by_name("m1.tiny"))
+        self.assertEqual(resources[1:], index.find_by_name("m1.small"))
+        self.assertEqual([], index.find_by_name("m1"))
+        self.assertEqual(resources, index.find_by_pattern("^m1"))
+        self.assertEqual(resources[:1], index.find_by_pattern("tiny$"))
+        self.assertEqual([], index.find_by_pattern("large"))
+
+    def test_find_get_name(self):
+        resources = [{"name": "net", "id": "1"}]
+        index = types.ResourceIndex(resources,
+                                    get_name=lambda r: r["name"])
+
+        self.assertEqual(resources, index.find_by_name("net"))
+        self.assertEqual(resources, index.find_by_pattern("n.t"))
+
+
+class ResourceCacheTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ResourceCacheTestCase, self).setUp()
+        self.flavors = [fakes.FakeResource(name="m1.tiny", id="1")]
+        self.clients = mock.MagicMock()
+        self.clients.endpoint = objects.Endpoint("http://fake", "user",
+                                                 "password", "tenant")
+        self.clients.nova.return_value.flavors.list.side_effect = (
+            lambda: list(self.flavors))
+
+    def _transform(self, name):
+        return types.FlavorResourceType.transform(
+            clients=self.clients, resource_config={"name": name})
+
+    def test_get(self):
+        cache = types.ResourceCache()
+        list_resources = mock.MagicMock(return_value=self.flavors)
+
+        index = cache.get("key", list_resources)
+        self.assertIs(index, cache.get("key", list_resources))
+        self.assertEqual(self.flavors, index.resources)
+        self.assertIsNot(index, cache.get("key", list_resources,
+                                          refresh=True))
+        self.assertEqual(2, list_resources.call_count)
+
+        cache.clear()
+        cache.get("key", list_resources)
+        self.assertEqual(3, list_resources.call_count)
+
+    def test_enter(self):
+        self.assertIsNone(types.get_resource_cache())
+        with types.ResourceCache() as cache:
+            self.assertEqual(cache, types.get_resource_cache())
+            with types.ResourceCache() as nested_cache:
+                self.assertEqual(nested_cache, types.get_resource_cache())
+            self.assertEqual(cache, types.get_resource_cache())
+        self.assertIsNone(types.get_resource_cache())
+
+    def test_transform_without_cache(self):
+        self.assertEqual("1", self._transform("m1.tiny"))
+        self.assertEqual("1", self._transform("m1.tiny"))
+        self.assertEqual(
+            2, self.clients.nova.return_value.flavors.list.call_count)
+
+    def test_transform_cached(self):
+        with types.ResourceCache():
+            self.assertEqual("1", self._transform("m1.tiny"))
+            self.assertEqual("1", self._transform("m1.tiny"))
+            self.assertEqual(
+                1, self.clients.nova.return_value.flavors.list.call_count)
+
+            # NOTE(rally): resources created after the listing are found
+            self.flavors.append(fakes.FakeResource(name="m1.small", id="2"))
+            self.assertEqual("2", self._transform("m1.small"))
+            self.assertEqual(
+                2, self.clients.nova.return_value.flavors.list.call_count)
+
+            self.assertRaises(exceptions.InvalidScenarioArgument,
+                              self._transform, "m1.large")
+
+    def test_transform_cached_per_endpoint(self):
+        with types.ResourceCache():
+            self._transform("m1.tiny")
+            self.clients.endpoint = objects.Endpoint("http://fake", "other",
+                                                     "password", "tenant")
+            self._transform("m1.tiny")
+        self.assertEqual(
+            2, self.clients.nova.return_value.flavors.list.call_count)
+
+
 class PreprocessTestCase(test.TestCase):
 
     @mock.patch("rally.benchmark.types.base.Scenario.meta")
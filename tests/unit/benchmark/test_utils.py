@@ -14,8 +14,10 @@
 #    under the License.
 
 import datetime
+import threading
 
 import mock
+from oslo_config import fixture
 
 from rally.benchmark import utils
 from rally import exceptions
@@ -215,3 +217,323 @@ class WaitForTestCase(test.TestCase):
 
         self.assertIn("FakeResource", str(exc))
         self.assertIn("fake_new_status", str(exc))
+
+
+class StatusPollerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(StatusPollerTestCase, self).setUp()
+        self.manager = mock.MagicMock()
+        self.manager.get.side_effect = lambda id: fakes.FakeResource(
+            manager=self.manager, id=id, status=self.statuses[id].pop(0))
+        self.manager.list.side_effect = lambda: [
+            fakes.FakeResource(manager=self.manager, id=id,
+                               status=statuses.pop(0))
+            for id, statuses in self.statuses.items() if len(statuses) > 1]
+        self.statuses = {}
+        self.poller = utils.StatusPoller()
+
+    def _wait_for(self, id, statuses, timeout=1, status="ACTIVE",
+                  error_statuses=None):
+        self.statuses[id] = list(statuses)
+        return self.poller.wait_for(
+            fakes.FakeResource(manager=self.manager, id=id),
+            utils.resource_is(status),
+            utils.get_from_manager(error_statuses), timeout, 0.001)
+
+    def _waiters(self, ids, manager=None):
+        return [utils._Waiter(
+            fakes.FakeResource(manager=manager or self.manager, id=id),
+            utils.resource_is("ACTIVE"), utils.get_from_manager(), 0.001)
+            for id in ids]
+
+    def _poll(self, waiters):
+        key = utils._poll_key(waiters[0].resource.manager)
+        self.poller._waiters[key] = list(waiters)
+        self.poller._wakeups[key] = threading.Event()
+        self.poller._poll(key)
+
+    def test_wait_for(self):
+        resource = self._wait_for("a", ["BUILD", "BUILD", "ACTIVE"])
+        self.assertEqual("a", resource.id)
+        self.assertEqual("ACTIVE", resource.status)
+        # NOTE(rally): a single resource is not worth listing all of them
+        self.assertFalse(self.manager.list.called)
+        self.assertEqual(3, self.manager.get.call_count)
+
+    def test_wait_for_missing_in_list(self):
+        resource = self._wait_for("a", ["ACTIVE"])
+        self.assertEqual("ACTIVE", resource.status)
+        self.manager.get.assert_called_once_with("a")
+
+    def test_wait_for_not_found(self):
+        exc = Exception()
+        exc.code = 404
+        self.manager.get.side_effect = exc
+        self.assertRaises(exceptions.GetResourceNotFound,
+                          self._wait_for, "a", [])
+
+    def test_wait_for_error_status(self):
+        self.assertRaises(exceptions.GetResourceErrorStatus,
+                          self._wait_for, "a", ["BUILD", "FAIL", "FAIL"],
+                          error_statuses=["fail"])
+
+    def test_wait_for_timeout(self):
+        exc = self.assertRaises(exceptions.TimeoutException,
+                                self._wait_for, "a", ["BUILD"] * 1000,
+                                timeout=0.05)
+        self.assertEqual("BUILD", exc.kwargs["resource_status"])
+
+    def test_wait_for_list_failed(self):
+        self.manager.list.side_effect = Exception()
+        self.statuses = {"a": ["BUILD", "ACTIVE"], "b": ["ACTIVE"]}
+        waiters = self._waiters(["a", "b"])
+
+        self._poll(waiters)
+
+        self.assertEqual(1, self.manager.list.call_count)
+        self.assertEqual(3, self.manager.get.call_count)
+        for waiter in waiters:
+            self.assertEqual("ACTIVE", waiter.resource.status)
+
+    def test_wait_for_coalesced(self):
+        self.statuses = {"a": ["BUILD", "ACTIVE", "ACTIVE"],
+                         "b": ["BUILD", "ACTIVE", "ACTIVE"]}
+        waiters = self._waiters(["a", "b"])
+
+        self._poll(waiters)
+
+        self.assertEqual(2, self.manager.list.call_count)
+        self.assertFalse(self.manager.get.called)
+        for waiter in waiters:
+            self.assertTrue(waiter.done.is_set())
+            self.assertIsNone(waiter.error)
+            self.assertEqual("ACTIVE", waiter.resource.status)
+        self.assertEqual({}, self.poller._waiters)
+        self.assertEqual({}, self.poller._wakeups)
+
+    def test_wait_for_coalesced_managers(self):
+        # NOTE(rally): every iteration has its own clients, so resources of
+        #              the same tenant come with different manager objects
+        managers = []
+        for i in range(2):
+            manager = mock.MagicMock()
+            manager.api.client.auth_url = "http://example.com:5000/v2.0"
+            manager.api.client.tenant_id = "tenant"
+            manager.list.side_effect = self.manager.list.side_effect
+            managers.append(manager)
+        other_tenant = mock.MagicMock()
+        other_tenant.api.client.auth_url = "http://example.com:5000/v2.0"
+        other_tenant.api.client.tenant_id = "other_tenant"
+        self.assertEqual(utils._poll_key(managers[0]),
+                         utils._poll_key(managers[1]))
+        self.assertNotEqual(utils._poll_key(managers[0]),
+                            utils._poll_key(other_tenant))
+
+        self.statuses = {"a": ["BUILD", "ACTIVE", "ACTIVE"],
+                         "b": ["BUILD", "ACTIVE", "ACTIVE"]}
+        waiters = (self._waiters(["a"], managers[0]) +
+                   self._waiters(["b"], managers[1]))
+
+        self._poll(waiters)
+
+        self.assertEqual(2, managers[0].list.call_count)
+        self.assertFalse(managers[1].list.called)
+        for manager in managers:
+            self.assertFalse(manager.get.called)
+        for waiter, manager in zip(waiters, managers):
+            self.assertEqual("ACTIVE", waiter.resource.status)
+            self.assertEqual(manager, waiter.resource.manager)
+
+    def test_wait_for_list_filter(self):
+        self.statuses = {"a": ["ACTIVE", "ACTIVE"], "b": ["ACTIVE", "ACTIVE"]}
+        self.manager.list.side_effect = None
+        self.manager.list.return_value = []
+        list_filter = mock.Mock(return_value={"filters": "ids"})
+        waiters = self._waiters(["a", "b"])
+
+        with mock.patch.dict(utils._LIST_FILTERS,
+                             {"mock.MagicMock": list_filter}):
+            self.poller._list(waiters)
+
+        list_filter.assert_called_once_with(["a", "b"])
+        self.manager.list.assert_called_once_with(filters="ids")
+
+    @mock.patch("rally.benchmark.utils._status_poller")
+    def test_wait_for_front_end(self, mock_status_poller):
+        self.useFixture(fixture.Config()).config(batch_status_polling=True,
+                                                 group="benchmark")
+        resource = fakes.FakeResource(manager=self.manager)
+        is_ready = utils.resource_is("ACTIVE")
+        update_resource = utils.get_from_manager()
+
+        result = utils.wait_for(resource, is_ready, update_resource, 10, 2)
+
+        self.assertEqual(mock_status_poller.wait_for.return_value, result)
+        mock_status_poller.wait_for.assert_called_once_with(
+            resource, is_ready, update_resource, 10, 2)
+
+    @mock.patch("rally.benchmark.utils._status_poller")
+    def test_wait_for_front_end_disabled(self, mock_status_poller):
+        self.useFixture(fixture.Config()).config(batch_status_polling=False,
+                                                 group="benchmark")
+        self.statuses = {"a": ["ACTIVE"]}
+        resource = fakes.FakeResource(manager=self.manager, id="a")
+
+        utils.wait_for(resource, utils.resource_is("ACTIVE"),
+                       utils.get_from_manager(), 10, 2)
+
+        self.assertFalse(mock_status_poller.wait_for.called)
+        self.manager.get.assert_called_once_with("a")
+
+    def test_wait_for_all(self):
+        self.statuses = {"a": ["BUILD", "ACTIVE", "ACTIVE"],
+                         "b": ["BUILD", "ACTIVE", "ACTIVE"]}
+        resources = [fakes.FakeResource(manager=self.manager, id=id)
+                     for id in ("a", "b")]
+
+        result = self.poller.wait_for_all(
+            resources, utils.resource_is("ACTIVE"), utils.get_from_manager(),
+            1, 0.001)
+
+        self.assertEqual([("a", "ACTIVE"), ("b", "ACTIVE")],
+                         [(r.id, r.status) for r in result])
+        self.assertEqual(2, self.manager.list.call_count)
+        self.assertFalse(self.manager.get.called)
+
+    def test_wait_for_all_timeout(self):
+        self.statuses = {"a": ["ACTIVE"] * 1000, "b": ["BUILD"] * 1000}
+        resources = [fakes.FakeResource(manager=self.manager, id=id)
+                     for id in ("a", "b")]
+
+        exc = self.assertRaises(exceptions.TimeoutException,
+                                self.poller.wait_for_all, resources,
+                                utils.resource_is("ACTIVE"),
+                                utils.get_from_manager(), 0.05, 0.001)
+
+        self.assertEqual("b", exc.kwargs["resource_id"])
+        self.assertEqual(
+            [], self.poller._waiters.get(utils._poll_key(self.manager), []))
+
+    @mock.patch("rally.benchmark.utils._status_poller")
+    def test_wait_for_all_front_end(self, mock_status_poller):
+        resources = [fakes.FakeResource(manager=self.manager)]
+        is_ready = utils.resource_is("ACTIVE")
+        update_resource = utils.get_from_manager()
+
+        result = utils.wait_for_all(resources, is_ready, update_resource,
+                                    10, 2)
+
+        self.assertEqual(mock_status_poller.wait_for_all.return_value, result)
+        mock_status_poller.wait_for_all.assert_called_once_with(
+            resources, is_ready, update_resource, 10, 2)
+
+    @mock.patch("rally.benchmark.utils._status_poller")
+    def test_wait_for_all_front_end_not_batched(self, mock_status_poller):
+        resources = [fakes.FakeResource(id=id) for id in ("a", "b")]
+        is_ready = mock.Mock(return_value=True)
+
+        result = utils.wait_for_all(resources, is_ready)
+
+        self.assertEqual(resources, result)
+        self.assertEqual([mock.call(r) for r in resources],
+                         is_ready.mock_calls)
+        self.assertFalse(mock_status_poller.wait_for_all.called)
+
+
+class PollPolicyTestCase(test.TestCase):
+
+    def setUp(self):
+        super(PollPolicyTestCase, self).setUp()
+        self.conf = self.useFixture(fixture.Config())
+        self.conf.config(poll_min_interval=0.1, poll_jitter=0,
+                         group="benchmark")
+        utils.LearnedPollPolicy._history.clear()
+
+    def test_get_poll_policy(self):
+        policy = utils.get_poll_policy(2, "key")
+        self.assertIsInstance(policy, utils.ConstantPollPolicy)
+        self.assertEqual([2, 2], [policy.next_interval() for i in range(2)])
+
+        for name, cls in [("backoff", utils.BackoffPollPolicy),
+                          ("learned", utils.LearnedPollPolicy)]:
+            self.conf.config(poll_interval_policy=name, group="benchmark")
+            policy = utils.get_poll_policy(2, "key")
+            self.assertIsInstance(policy, cls)
+            self.assertEqual(2, policy.check_interval)
+            self.assertEqual("key", policy.key)
+
+    def test_backoff(self):
+        policy = utils.BackoffPollPolicy(1)
+        self.assertEqual([0.1, 0.2, 0.4, 0.8, 1, 1],
+                         [policy.next_interval() for i in range(6)])
+
+    @mock.patch("rally.benchmark.utils.random.uniform", return_value=1.1)
+    def test_backoff_jitter(self, mock_uniform):
+        self.conf.config(poll_jitter=0.2, group="benchmark")
+        policy = utils.BackoffPollPolicy(1)
+        self.assertAlmostEqual(0.11, policy.next_interval())
+        mock_uniform.assert_called_once_with(0.8, 1.2)
+
+    def test_learned(self):
+        policy = utils.LearnedPollPolicy(1, "key")
+        self.assertEqual([0.1, 0.2], [policy.next_interval()
+                                      for i in range(2)])
+        for duration in (5, 3, 40):
+            policy.finished(duration)
+
+        policy = utils.LearnedPollPolicy(1, "key")
+        self.assertEqual([5, 0.1, 0.2], [policy.next_interval()
+                                         for i in range(3)])
+        other_policy = utils.LearnedPollPolicy(1, "other_key")
+        self.assertEqual(0.1, other_policy.next_interval())
+
+    def test_learned_no_key(self):
+        policy = utils.LearnedPollPolicy(1)
+        policy.finished(5)
+        self.assertEqual({}, utils.LearnedPollPolicy._history)
+        self.assertEqual(0.1, policy.next_interval())
+
+    def test__wait_key(self):
+        resource = fakes.FakeResource()
+
+        def is_active(resource):
+            return True
+
+        self.assertEqual(("FakeResource", "ACTIVE"),
+                         utils._wait_key(resource,
+                                         utils.resource_is("ACTIVE")))
+        self.assertEqual(("FakeResource", "deleted"),
+                         utils._wait_key(resource, "deleted"))
+        self.assertEqual(("FakeResource", "is_active"),
+                         utils._wait_key(resource, is_active))
+        self.assertEqual(("FakeResource", "next_interval"),
+                         utils._wait_key(resource,
+                                         utils.ConstantPollPolicy(1).
+                                         next_interval))
+        self.assertIsNone(utils._wait_key(resource, lambda r: True))
+        self.assertIsNone(utils._wait_key(resource, mock.Mock(spec=[])))
+
+    @mock.patch("rally.benchmark.utils.time.sleep")
+    def test_wait_for_uses_policy(self, mock_sleep):
+        self.conf.config(poll_interval_policy="backoff", group="benchmark")
+        is_ready = mock.MagicMock(side_effect=[False, False, True])
+
+        utils.wait_for(fakes.FakeResource(), is_ready, None, 10, 1)
+
+        self.assertEqual([mock.call(0.1), mock.call(0.2)],
+                         mock_sleep.mock_calls)
+
+    @mock.patch("rally.benchmark.utils.time.sleep")
+    def test_wait_for_delete_uses_policy(self, mock_sleep):
+        self.conf.config(poll_interval_policy="learned", group="benchmark")
+        update_resource = mock.MagicMock(
+            side_effect=[None, exceptions.GetResourceNotFound(resource="r")])
+        resource = fakes.FakeResource()
+
+        utils.wait_for_delete(resource, update_resource, 10, 1)
+
+        mock_sleep.assert_called_once_with(0.1)
+        self.assertEqual(
+            1, len(utils.LearnedPollPolicy._history[("FakeResource",
+                                                     "deleted")]))
@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 from glanceclient import exc as glance_exc
 import mock
 from novaclient import exceptions as nova_exc
@@ -62,6 +64,73 @@ class ValidationUtilsTestCase(test.TestCase):
         validator, = self._get_scenario_validators(func_failure, scenario)
         self.assertFalse(validator(None, None, None).is_valid)
 
+    def test_validator_cached(self):
+        calls = []
+
+        def func(config, clients, deployment, param_name):
+            calls.append(config)
+            if config["args"].get(param_name) is None:
+                return validation.ValidationResult(False, "fail")
+
+        validator, = validation.validator(func)("name")(
+            lambda: None).validators
+        other_validator, = validation.validator(func)("name")(
+            lambda: None).validators
+        clients = mock.MagicMock()
+
+        with validation.ValidationCache() as cache:
+            self.assertEqual(cache, validation.get_validation_cache())
+            self.assertTrue(validator({"args": {"name": 1}}, clients,
+                                      None).is_valid)
+            self.assertTrue(other_validator({"args": {"name": 1}}, clients,
+                                            None).is_valid)
+            self.assertFalse(validator({"args": {}}, clients, None).is_valid)
+            self.assertFalse(validator({"args": {}}, clients, None).is_valid)
+            validator({"args": {}}, mock.MagicMock(), None)
+
+        self.assertIsNone(validation.get_validation_cache())
+        self.assertEqual(3, len(calls))
+        self.assertEqual({"calls": 5, "deduplicated": 2},
+                         dict((k, cache.stats["func"][k])
+                              for k in ("calls", "deduplicated")))
+
+        validator({"args": {"name": 1}}, clients, None)
+        self.assertEqual(4, len(calls))
+
+    def test_validation_cache_call_fails(self):
+        cache = validation.ValidationCache()
+        func = mock.MagicMock(side_effect=KeyError)
+
+        self.assertRaises(KeyError, cache.call, "key", "name", func)
+        self.assertRaises(KeyError, cache.call, "key", "name", func)
+        func.assert_called_once_with()
+        self.assertEqual(2, cache.stats["name"]["calls"])
+
+    def test_validation_cache_call_concurrent(self):
+        cache = validation.ValidationCache()
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def func():
+            started.set()
+            release.wait(5)
+            return "result"
+
+        thread = threading.Thread(
+            target=lambda: results.append(cache.call("key", "name", func)))
+        thread.start()
+        started.wait(5)
+        other = threading.Thread(
+            target=lambda: results.append(cache.call("key", "name", None)))
+        other.start()
+        release.set()
+        thread.join(5)
+        other.join(5)
+
+        self.assertEqual(["result", "result"], results)
+        self.assertEqual(1, cache.stats["name"]["deduplicated"])
+
 
 class ValidatorsTestCase(test.TestCase):
 
@@ -15,9 +15,11 @@
 
 import copy
 import datetime as date
+import json
 import os.path
 
 import mock
+import six
 
 from rally.cmd.commands import task
 from rally import consts
@@ -173,8 +175,11 @@ class TaskCommandsTestCase(test.TestCase):
         self.assertRaises(exceptions.InvalidArgumentsException,
                           self.task.status, None)
 
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_raw_results",
+                side_effect=lambda result: iter(result["data"]["raw"]))
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_results")
     @mock.patch("rally.cmd.commands.task.db")
-    def test_detailed(self, mock_db):
+    def test_detailed(self, mock_db, mock_iter_results, mock_iter_raw):
         test_uuid = "c0d874d4-7195-4fd5-8688-abe82bfad36f"
         value = {
             "id": "task",
@@ -241,12 +246,96 @@ class TaskCommandsTestCase(test.TestCase):
                 }
             ]
         }
-        mock_db.task_get_detailed = mock.MagicMock(return_value=value)
+        mock_db.task_get = mock.MagicMock(return_value=value)
+        mock_iter_results.side_effect = (
+            lambda load_raw: iter(value["results"]))
         self.task.detailed(test_uuid)
-        mock_db.task_get_detailed.assert_called_once_with(test_uuid)
+        mock_db.task_get.assert_called_once_with(test_uuid)
+        mock_iter_results.assert_called_once_with(load_raw=False)
 
         self.task.detailed(test_uuid, iterations_data=True)
 
+    @mock.patch("rally.cmd.commands.task.cliutils.print_list")
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_raw_results",
+                side_effect=lambda result: iter(result["data"]["raw"]))
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_results")
+    @mock.patch("rally.cmd.commands.task.db")
+    def test_detailed_load_levels(self, mock_db, mock_iter_results,
+                                  mock_iter_raw, mock_print_list):
+        raw = [{"duration": 1.0, "idle_duration": 0, "timestamp": 1,
+                "scenario_output": {"data": {}, "errors": ""},
+                "atomic_actions": {}, "error": [], "load_level": level}
+               for level in (1, 2)]
+        mock_db.task_get.return_value = {"id": "task",
+                                         "uuid": "task_uuid",
+                                         "status": "status"}
+        mock_iter_results.return_value = [
+            {"key": {"name": "fake_name", "pos": "fake_pos", "kw": {}},
+             "data": {"load_duration": 1.0, "full_duration": 2.0,
+                      "raw": raw}}]
+
+        self.task.detailed("task_uuid")
+
+        rows = mock_print_list.call_args_list[-1][0][0]
+        self.assertEqual([1, 2], [getattr(r, "load level") for r in rows])
+        self.assertEqual([1.0, 1.0],
+                         [getattr(r, "throughput (iter/sec)") for r in rows])
+
+    @mock.patch("rally.cmd.commands.task.cliutils.print_list")
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_raw_results",
+                side_effect=lambda result: iter(result["data"]["raw"]))
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_results")
+    @mock.patch("rally.cmd.commands.task.db")
+    def test_detailed_context_durations(self, mock_db, mock_iter_results,
+                                        mock_iter_raw, mock_print_list):
+        mock_db.task_get.return_value = {"id": "task",
+                                         "uuid": "task_uuid",
+                                         "status": "status"}
+        mock_iter_results.return_value = [
+            {"key": {"name": "fake_name", "pos": "fake_pos", "kw": {}},
+             "data": {"load_duration": 1.0, "full_duration": 2.0, "raw": [],
+                      "context_durations": {
+                          "users": {"setup": 1.5, "cleanup": 0.5},
+                          "images": {"setup": 3.0}}}}]
+
+        self.task.detailed("task_uuid")
+
+        rows = mock_print_list.call_args_list[-1][0][0]
+        self.assertEqual(["images", "users"],
+                         [getattr(r, "context") for r in rows])
+        self.assertEqual([3.0, 1.5], [getattr(r, "setup (sec)") for r in rows])
+        self.assertEqual([None, 0.5],
+                         [getattr(r, "cleanup (sec)") for r in rows])
+
+    @mock.patch("rally.cmd.commands.task.cliutils.print_list")
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_raw_results")
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_results")
+    @mock.patch("rally.cmd.commands.task.db")
+    def test_detailed_summary(self, mock_db, mock_iter_results,
+                              mock_iter_raw, mock_print_list):
+        mock_db.task_get.return_value = {"id": "task",
+                                         "uuid": "task_uuid",
+                                         "status": "status"}
+        stats = {"min": 1.0, "mean": 2.0, "max": 3.0, "p50": 2.0,
+                 "p90": 2.8, "p95": 2.9, "p99": 3.0}
+        summary = {"iterations": 4, "errors": 1, "throughput": 1.5,
+                   "atomic_actions": [dict(stats, name="a", count=2),
+                                      dict(stats, name="total", count=3)],
+                   "load_levels": [], "output": [], "output_errors": 0}
+        mock_iter_results.return_value = [
+            {"key": {"name": "fake_name", "pos": "fake_pos", "kw": {}},
+             "data": {"load_duration": 1.0, "full_duration": 2.0, "raw": [],
+                      "summary": summary}}]
+
+        self.task.detailed("task_uuid")
+
+        self.assertFalse(mock_iter_raw.called)
+        rows = mock_print_list.call_args_list[0][0][0]
+        self.assertEqual(["a", "total"], [r.action for r in rows])
+        self.assertEqual(["50.0%", "75.0%"], [r.success for r in rows])
+        self.assertEqual([2.8, 2.8], [getattr(r, "90 percentile")
+                                      for r in rows])
+
     @mock.patch("rally.cmd.commands.task.db")
     @mock.patch("rally.cmd.commands.task.logging")
     def test_detailed_task_failed(self, mock_logging, mock_db):
@@ -257,7 +346,7 @@ class TaskCommandsTestCase(test.TestCase):
             "results": [],
             "verification_log": "['1', '2', '3']"
         }
-        mock_db.task_get_detailed = mock.MagicMock(return_value=value)
+        mock_db.task_get = mock.MagicMock(return_value=value)
 
         mock_logging.is_debug.return_value = False
         self.task.detailed("task_uuid")
@@ -274,41 +363,44 @@ class TaskCommandsTestCase(test.TestCase):
     @mock.patch("rally.cmd.commands.task.db")
     def test_detailed_wrong_id(self, mock_db):
         test_uuid = "eb290c30-38d8-4c8f-bbcc-fc8f74b004ae"
-        mock_db.task_get_detailed = mock.MagicMock(return_value=None)
-        self.task.detailed(test_uuid)
-        mock_db.task_get_detailed.assert_called_once_with(test_uuid)
-
-    @mock.patch("json.dumps")
+        mock_db.task_get = mock.MagicMock(
+            side_effect=exceptions.TaskNotFound(uuid=test_uuid))
+        self.assertEqual(1, self.task.detailed(test_uuid))
+        mock_db.task_get.assert_called_once_with(test_uuid)
+
+    @mock.patch("rally.cmd.commands.task.sys.stdout",
+                new_callable=six.StringIO)
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_raw_results")
     @mock.patch("rally.cmd.commands.task.objects.Task.get")
-    def test_results(self, mock_get, mock_json):
+    def test_results(self, mock_get, mock_iter_raw, mock_stdout):
         task_id = "foo_task_id"
         data = [
-            {"key": "foo_key", "data": {"raw": "foo_raw", "sla": [],
+            {"key": "foo_key", "data": {"sla": [],
                                         "load_duration": "lo_duration",
                                         "full_duration": "fu_duration"}}
         ]
-        result = map(lambda x: {"key": x["key"],
-                                "result": x["data"]["raw"],
-                                "load_duration": x["data"]["load_duration"],
-                                "full_duration": x["data"]["full_duration"],
-                                "sla": x["data"]["sla"]}, data)
-        mock_results = mock.Mock(return_value=data)
-        mock_get.return_value = mock.Mock(get_results=mock_results)
+        result = [{"key": x["key"],
+                   "result": ["foo_raw", "bar_raw"],
+                   "load_duration": x["data"]["load_duration"],
+                   "full_duration": x["data"]["full_duration"],
+                   "context_durations": {},
+                   "sla": x["data"]["sla"]} for x in data]
+        mock_get.return_value.iter_results.return_value = iter(data)
+        mock_iter_raw.side_effect = lambda x: iter(["foo_raw", "bar_raw"])
 
         self.task.results(task_id)
-        self.assertEqual(1, mock_json.call_count)
-        self.assertEqual(1, len(mock_json.call_args[0]))
-        self.assertSequenceEqual(result, mock_json.call_args[0][0])
-        self.assertEqual({"sort_keys": True, "indent": 4},
-                         mock_json.call_args[1])
+
+        self.assertEqual(json.dumps(result, sort_keys=True, indent=4) + "\n",
+                         mock_stdout.getvalue())
         mock_get.assert_called_once_with(task_id)
+        mock_get.return_value.iter_results.assert_called_once_with(
+            load_raw=False)
+        mock_iter_raw.assert_called_once_with(data[0])
 
     @mock.patch("rally.cmd.commands.task.objects.Task.get")
     def test_invalid_results(self, mock_get):
         task_id = "foo_task_id"
-        data = []
-        mock_results = mock.Mock(return_value=data)
-        mock_get.return_value = mock.Mock(get_results=mock_results)
+        mock_get.return_value.iter_results.return_value = iter([])
 
         result = self.task.results(task_id)
         mock_get.assert_called_once_with(task_id)
@@ -323,27 +415,30 @@ class TaskCommandsTestCase(test.TestCase):
     @mock.patch("rally.cmd.commands.task.plot")
     @mock.patch("rally.cmd.commands.task.webbrowser")
     @mock.patch("rally.cmd.commands.task.objects.Task.get")
-    def test_report_one_uuid(self, mock_get, mock_web, mock_plot, mock_open,
-                             mock_os, mock_validate):
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_raw_results",
+                side_effect=lambda x: "raw_%s" % x["data"]["sla"])
+    def test_report_one_uuid(self, mock_iter_raw, mock_get, mock_web,
+                             mock_plot, mock_open, mock_os, mock_validate):
         task_id = "eb290c30-38d8-4c8f-bbcc-fc8f74b004ae"
         data = [
             {"key": {"name": "test", "pos": 0},
-             "data": {"raw": "foo_raw", "sla": "foo_sla",
+             "data": {"sla": "foo_sla",
                       "load_duration": 0.1,
                       "full_duration": 1.2}},
             {"key": {"name": "test", "pos": 0},
-             "data": {"raw": "bar_raw", "sla": "bar_sla",
+             "data": {"sla": "bar_sla",
                       "load_duration": 2.1,
                       "full_duration": 2.2}}]
 
         results = [{"key": x["key"],
-                    "result": x["data"]["raw"],
+                    "result": "raw_%s" % x["data"]["sla"],
                     "sla": x["data"]["sla"],
                     "load_duration": x["data"]["load_duration"],
-                    "full_duration": x["data"]["full_duration"]}
+                    "full_duration": x["data"]["full_duration"],
+                    "summary": None}
                    for x in data]
-        mock_results = mock.Mock(return_value=data)
-        mock_get.return_value = mock.Mock(get_results=mock_results)
+        mock_get.return_value.iter_results.side_effect = (
+            lambda load_raw: iter(data))
         mock_plot.plot.return_value = "html_report"
 
         def reset_mocks():
@@ -370,17 +465,19 @@ class TaskCommandsTestCase(test.TestCase):
     @mock.patch("rally.cmd.commands.task.plot")
     @mock.patch("rally.cmd.commands.task.webbrowser")
     @mock.patch("rally.cmd.commands.task.objects.Task.get")
-    def test_report_bunch_uuids(self, mock_get, mock_web, mock_plot, mock_open,
-                                mock_os, mock_validate):
+    @mock.patch("rally.cmd.commands.task.objects.Task.iter_raw_results",
+                side_effect=lambda x: "raw_%s" % x["data"]["sla"])
+    def test_report_bunch_uuids(self, mock_iter_raw, mock_get, mock_web,
+                                mock_plot, mock_open, mock_os, mock_validate):
         tasks = ["eb290c30-38d8-4c8f-bbcc-fc8f74b004ae",
                  "eb290c30-38d8-4c8f-bbcc-fc8f74b004af"]
         data = [
             {"key": {"name": "test", "pos": 0},
-             "data": {"raw": "foo_raw", "sla": "foo_sla",
+             "data": {"sla": "foo_sla",
                       "load_duration": 0.1,
                       "full_duration": 1.2}},
             {"key": {"name": "test", "pos": 0},
-             "data": {"raw": "bar_raw", "sla": "bar_sla",
+             "data": {"sla": "bar_sla",
                       "load_duration": 2.1,
                       "full_duration": 2.2}}]
 
@@ -388,14 +485,15 @@ class TaskCommandsTestCase(test.TestCase):
         for task_uuid in tasks:
             results.extend(
                 map(lambda x: {"key": x["key"],
-                               "result": x["data"]["raw"],
+                               "result": "raw_%s" % x["data"]["sla"],
                                "sla": x["data"]["sla"],
                                "load_duration": x["data"]["load_duration"],
-                               "full_duration": x["data"]["full_duration"]},
+                               "full_duration": x["data"]["full_duration"],
+                               "summary": None},
                     data))
 
-        mock_results = mock.Mock(return_value=data)
-        mock_get.return_value = mock.Mock(get_results=mock_results)
+        mock_get.return_value.iter_results.side_effect = (
+            lambda load_raw: iter(data))
         mock_plot.plot.return_value = "html_report"
 
         def reset_mocks():
@@ -432,7 +530,7 @@ class TaskCommandsTestCase(test.TestCase):
                       "full_duration": 2.2}}]
 
         results = [{"key": x["key"],
-                    "result": x["data"]["raw"],
+                    "result": "raw_%s" % x["data"]["sla"],
                     "sla": x["data"]["sla"],
                     "load_duration": x["data"]["load_duration"],
                     "full_duration": x["data"]["full_duration"]}
@@ -557,16 +655,17 @@ class TaskCommandsTestCase(test.TestCase):
                                    "success": False,
                                    "detail": "Max foo, actually bar"}]}}]
 
-        mock_task_get().get_results.return_value = copy.deepcopy(data)
+        mock_task_get().iter_results.return_value = copy.deepcopy(data)
         result = self.task.sla_check(task_id="fake_task_id")
         self.assertEqual(1, result)
         mock_task_get.assert_called_with("fake_task_id")
 
         data[0]["data"]["sla"][0]["success"] = True
-        mock_task_get().get_results.return_value = data
+        mock_task_get().iter_results.return_value = data
 
         result = self.task.sla_check(task_id="fake_task_id", tojson=True)
         self.assertEqual(0, result)
+        mock_task_get().iter_results.assert_called_with(load_raw=False)
 
     @mock.patch("rally.cmd.commands.task.open",
                 mock.mock_open(read_data="{\"some\": \"json\"}"),
@@ -43,6 +43,11 @@ class DBCommandsTestCase(test.TestCase):
         calls = [mock.call.db_drop(), mock.call.db_create()]
         self.assertEqual(calls, mock_db.mock_calls)
 
+    @mock.patch("rally.cmd.manage.db")
+    def test_upgrade(self, mock_db):
+        self.db_commands.upgrade()
+        mock_db.db_upgrade.assert_called_once_with()
+
 
 class TempestCommandsTestCase(test.TestCase):
 
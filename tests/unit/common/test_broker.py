@@ -13,7 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import collections
+import sys
+import threading
+import time
 
 import mock
 
@@ -21,31 +23,97 @@ from rally.common import broker
 from tests.unit import test
 
 
+class ExecutorTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ExecutorTestCase, self).setUp()
+        self.executor = broker._Executor()
+
+    def _submit_and_wait(self, func):
+        done = threading.Event()
+
+        def target():
+            try:
+                func()
+            finally:
+                done.set()
+
+        self.executor.submit(target)
+        self.assertTrue(done.wait(5))
+
+    def test_submit_reuses_idle_threads(self):
+        threads = set()
+        for i in range(3):
+            self._submit_and_wait(
+                lambda: threads.add(threading.current_thread()))
+            # NOTE(rally): let the thread become idle
+            for j in range(100):
+                if self.executor._idle:
+                    break
+                time.sleep(0.01)
+        self.assertEqual(1, len(threads))
+
+    def test_submit_starts_threads_for_busy_pool(self):
+        release = threading.Event()
+        started = threading.Semaphore(0)
+
+        def block():
+            started.release()
+            release.wait(5)
+
+        for i in range(3):
+            self.executor.submit(block)
+        for i in range(3):
+            self.assertTrue(started.acquire())
+        release.set()
+
+    def test_submit_failed_task(self):
+        self._submit_and_wait(mock.MagicMock(side_effect=KeyError))
+        self._submit_and_wait(lambda: None)
+
+    @mock.patch("rally.common.broker.os.getpid")
+    def test_submit_after_fork(self, mock_getpid):
+        mock_getpid.return_value = 1
+        self.executor._reset()
+        self.executor._idle = 5
+        mock_getpid.return_value = 2
+        self._submit_and_wait(lambda: None)
+
+
 class BrokerTestCase(test.TestCase):
 
     def test__publisher(self):
         mock_publish = mock.MagicMock()
-        mock_is_published = mock.MagicMock()
-        queue = collections.deque()
-        broker._publisher(mock_publish, queue, mock_is_published)
+        queue = mock.MagicMock()
+        errors = []
+        broker._publisher(mock_publish, queue, errors, 2)
         mock_publish.assert_called_once_with(queue)
-        mock_is_published.set.assert_called_once_with()
+        self.assertEqual([mock.call(broker._STOP)] * 2,
+                         queue.append.mock_calls)
+        self.assertEqual([], errors)
 
     def test__publisher_fails(self):
-        mock_publish = mock.MagicMock(side_effect=Exception())
-        mock_is_published = mock.MagicMock()
-        queue = collections.deque()
-        broker._publisher(mock_publish, queue, mock_is_published)
-        mock_is_published.set.assert_called_once_with()
+        mock_publish = mock.MagicMock(side_effect=KeyError())
+        queue = mock.MagicMock()
+        errors = []
+        broker._publisher(mock_publish, queue, errors, 1)
+        queue.append.assert_called_once_with(broker._STOP)
+        self.assertEqual(1, len(errors))
+        self.assertEqual(KeyError, errors[0][0])
+
+    def _queue(self, *items):
+        queue = broker._BlockingQueue(len(items))
+        for item in items:
+            queue.append(item)
+        return queue
 
     def test__consumer(self):
-        queue = collections.deque([1, 2, 3])
+        queue = self._queue(1, 2, 3, broker._STOP)
         mock_consume = mock.MagicMock()
-        mock_is_published = mock.MagicMock()
-        mock_is_published.isSet = mock.MagicMock(return_value=True)
-        broker._consumer(mock_consume, queue, mock_is_published)
+        finished = threading.Semaphore(0)
+        broker._consumer(mock_consume, queue, [], finished)
         self.assertEqual(3, mock_consume.call_count)
-        self.assertEqual(0, len(queue))
+        self.assertTrue(finished.acquire(False))
 
     def test__consumer_cache(self):
         cache_keys_history = []
@@ -54,19 +122,19 @@ class BrokerTestCase(test.TestCase):
             cache[item] = True
             cache_keys_history.append(list(cache))
 
-        queue = collections.deque([1, 2, 3])
-        mock_is_published = mock.MagicMock()
-        mock_is_published.isSet = mock.MagicMock(return_value=True)
-        broker._consumer(consume, queue, mock_is_published)
+        queue = self._queue(1, 2, 3, broker._STOP)
+        broker._consumer(consume, queue, [], threading.Semaphore(0))
         self.assertEqual([[1], [1, 2], [1, 2, 3]], cache_keys_history)
 
     def test__consumer_fails(self):
-        queue = collections.deque([1, 2, 3])
-        mock_consume = mock.MagicMock(side_effect=Exception())
-        mock_is_published = mock.MagicMock()
-        mock_is_published.isSet = mock.MagicMock(return_value=True)
-        broker._consumer(mock_consume, queue, mock_is_published)
-        self.assertEqual(0, len(queue))
+        queue = self._queue(1, 2, 3, broker._STOP)
+        mock_consume = mock.MagicMock(side_effect=KeyError())
+        errors = []
+        finished = threading.Semaphore(0)
+        broker._consumer(mock_consume, queue, errors, finished)
+        self.assertEqual(3, mock_consume.call_count)
+        self.assertEqual([KeyError] * 3, [e[0] for e in errors])
+        self.assertTrue(finished.acquire(False))
 
     def test_run(self):
 
@@ -81,5 +149,123 @@ class BrokerTestCase(test.TestCase):
             consumed.add(item)
 
         consumer_count = 2
-        broker.run(publish, consume, consumer_count)
+        self.assertEqual([], broker.run(publish, consume, consumer_count))
         self.assertEqual(set([1, 2, 3]), consumed)
+
+    @mock.patch("rally.common.broker.QUEUE_SIZE_PER_CONSUMER", new=1)
+    def test_run_backpressure(self):
+        consumed = []
+
+        def publish(queue):
+            for i in range(20):
+                queue.append(i)
+
+        def consume(cache, item):
+            consumed.append(item)
+
+        broker.run(publish, consume, 1)
+        self.assertEqual(list(range(20)), consumed)
+
+    def test_run_errors(self):
+
+        def publish(queue):
+            queue.append(1)
+            queue.append(2)
+            raise ValueError()
+
+        def consume(cache, item):
+            if item == 2:
+                raise KeyError()
+
+        errors = broker.run(publish, consume)
+        self.assertEqual(set([KeyError, ValueError]),
+                         set(e[0] for e in errors))
+
+    def test_run_nested(self):
+        consumed = []
+
+        def consume(cache, item):
+            broker.run(lambda queue: queue.append(item),
+                       lambda cache, x: consumed.append(x), 2)
+
+        broker.run(lambda queue: [queue.append(i) for i in range(4)],
+                   consume, 2)
+        self.assertEqual([0, 1, 2, 3], sorted(consumed))
+
+    def test_raise_errors(self):
+        broker.raise_errors([])
+        try:
+            raise KeyError("foo")
+        except KeyError:
+            errors = [sys.exc_info()]
+        self.assertRaises(KeyError, broker.raise_errors, errors)
+
+    def test_run_each(self):
+        self.assertEqual([2, 4, 6],
+                         broker.run_each(lambda x: x * 2, [1, 2, 3], 2))
+
+    def test_run_each_empty(self):
+        self.assertEqual([], broker.run_each(lambda x: x, [], 2))
+
+    def test_run_each_fails(self):
+        processed = []
+
+        def func(item):
+            processed.append(item)
+            if item > 1:
+                raise KeyError(item)
+
+        e = self.assertRaises(KeyError, broker.run_each, func, [1, 2, 3])
+        self.assertEqual(2, e.args[0])
+        self.assertEqual([1, 2, 3], processed)
+
+    def test_run_graph(self):
+        order = []
+        lock = threading.Lock()
+
+        def func(item):
+            with lock:
+                order.append(item)
+
+        errors = broker.run_graph(func, ["a", "b", "c"],
+                                  [set([2]), set([2]), set()])
+
+        self.assertEqual([], errors)
+        self.assertEqual("c", order[0])
+        self.assertEqual(set(["a", "b"]), set(order[1:]))
+
+    def test_run_graph_workers(self):
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def func(item):
+            with lock:
+                running.append(item)
+                max_running.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(item)
+
+        broker.run_graph(func, list(range(6)), [set()] * 6, workers=2)
+
+        self.assertEqual(6, len(max_running))
+        self.assertEqual(2, max(max_running))
+
+    def test_run_graph_errors(self):
+        processed = []
+
+        def func(item):
+            processed.append(item)
+            if item == 0:
+                raise KeyError(item)
+
+        errors = broker.run_graph(func, [0, 1], [set(), set([0])])
+        self.assertEqual([KeyError], [e[0] for e in errors])
+        self.assertEqual([0, 1], processed)
+
+        processed[:] = []
+        errors = broker.run_graph(func, [0, 1], [set(), set([0])],
+                                  stop_on_error=True)
+        self.assertEqual(1, len(errors))
+        self.assertEqual([0], processed)
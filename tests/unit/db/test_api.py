@@ -16,9 +16,11 @@
 """Tests for db.api layer."""
 
 from six import moves
+import sqlalchemy as sa
 
 from rally import consts
 from rally import db
+from rally.db.sqlalchemy import api as sa_api
 from rally import exceptions
 from tests.unit import test
 
@@ -125,6 +127,13 @@ class TasksTestCase(test.DBTestCase):
         res = db.task_result_get_all_by_uuid(task_id)
         self.assertEqual(len(res), 0)
 
+    def test_task_delete_with_result_chunks(self):
+        task_id = self._create_task()["uuid"]
+        result = db.task_result_create(task_id, {}, {})
+        db.task_result_chunk_create(result["id"], [1, 2])
+        db.task_delete(task_id)
+        self.assertEqual([], list(db.task_result_chunk_iter(result["id"])))
+
     def test_task_delete_by_uuid_and_status(self):
         values = {
             "status": consts.TaskStatus.FINISHED,
@@ -163,6 +172,89 @@ class TasksTestCase(test.DBTestCase):
             self.assertEqual(res[0]["key"], data)
             self.assertEqual(res[0]["data"], data)
 
+    def test_task_result_iter_by_uuid(self):
+        task_id = self._create_task()["uuid"]
+        db.task_result_create(task_id, {"name": "a"}, {"raw": [1]})
+        db.task_result_create(task_id, {"name": "b"}, {"raw": [2]})
+        db.task_result_create(self._create_task()["uuid"], {}, {})
+
+        results = db.task_result_iter_by_uuid(task_id)
+        self.assertEqual({"raw": [1]}, next(results)["data"])
+        self.assertEqual([{"name": "b"}], [r["key"] for r in results])
+
+    def test_task_result_iter_by_uuid_one_by_one(self):
+        task_id = self._create_task()["uuid"]
+        for name in ("a", "b", "c"):
+            db.task_result_create(task_id, {"name": name}, {"raw": []})
+
+        results = db.task_result_iter_by_uuid(task_id)
+        self.assertEqual({"name": "a"}, next(results)["key"])
+        # NOTE(rally): results are loaded one by one, so a result stored
+        #              while iterating is still returned
+        db.task_result_create(task_id, {"name": "d"}, {"raw": []})
+        self.assertEqual(["b", "c", "d"], [r["key"]["name"] for r in results])
+
+    def test_task_result_meta_iter_by_uuid(self):
+        task_id = self._create_task()["uuid"]
+        result = db.task_result_create(task_id, {"name": "a"},
+                                       {"raw": [1], "sla": []})
+        db.task_result_update(result["id"],
+                              {"raw": [], "sla": [], "summary": {"n": 1}})
+        db.task_result_create(task_id, {"name": "b"}, {"raw": [2]})
+        db.task_result_create(self._create_task()["uuid"], {}, {})
+
+        results = list(db.task_result_meta_iter_by_uuid(task_id))
+        self.assertEqual(
+            [(result["id"], {"name": "a"}, {"sla": [], "summary": {"n": 1}}),
+             (result["id"] + 1, {"name": "b"}, {})],
+            [(r["id"], r["key"], r["data"]) for r in results])
+        self.assertIsNotNone(results[0]["created_at"])
+
+    def test_task_result_meta_iter_by_uuid_not_upgraded(self):
+        task_id = self._create_task()["uuid"]
+        result = db.task_result_create(task_id, {"name": "a"},
+                                       {"raw": [1], "sla": []})
+        sa_api.get_engine().execute("UPDATE task_results SET meta = NULL")
+
+        self.assertEqual(
+            [{"id": result["id"], "key": {"name": "a"}, "data": {"sla": []},
+              "created_at": result["created_at"]}],
+            list(db.task_result_meta_iter_by_uuid(task_id)))
+
+    def test_task_result_get(self):
+        task_id = self._create_task()["uuid"]
+        result = db.task_result_create(task_id, {"name": "a"}, {"raw": [1]})
+        self.assertEqual({"raw": [1]},
+                         db.task_result_get(result["id"])["data"])
+        self.assertRaises(exceptions.NotFoundException,
+                          db.task_result_get, result["id"] + 1)
+
+    def test_task_result_update(self):
+        task_id = self._create_task()["uuid"]
+        result = db.task_result_create(task_id, {"name": "foo"}, {"a": 1})
+        db.task_result_update(result["id"], {"b": 2})
+        res = db.task_result_get_all_by_uuid(task_id)
+        self.assertEqual(1, len(res))
+        self.assertEqual({"name": "foo"}, res[0]["key"])
+        self.assertEqual({"b": 2}, res[0]["data"])
+
+    def test_task_result_update_not_found(self):
+        self.assertRaises(exceptions.NotFoundException,
+                          db.task_result_update, 42, {})
+
+    def test_task_result_chunk_iter(self):
+        task_id = self._create_task()["uuid"]
+        result1 = db.task_result_create(task_id, {}, {})
+        result2 = db.task_result_create(task_id, {}, {})
+        db.task_result_chunk_create(result1["id"], [1, 2])
+        db.task_result_chunk_create(result2["id"], [10])
+        db.task_result_chunk_create(result1["id"], [3])
+
+        self.assertEqual([1, 2, 3],
+                         list(db.task_result_chunk_iter(result1["id"])))
+        self.assertEqual([10],
+                         list(db.task_result_chunk_iter(result2["id"])))
+
     def test_task_get_detailed(self):
         task1 = self._create_task()
         key = {"name": "atata"}
@@ -188,6 +280,49 @@ class TasksTestCase(test.DBTestCase):
         self.assertEqual(results[0]["data"], data)
 
 
+class DBUpgradeTestCase(test.DBTestCase):
+
+    def test_db_upgrade(self):
+        engine = sa_api.get_engine()
+        engine.execute("DROP INDEX task_result_task_uuid")
+        task = db.task_create({"deployment_uuid":
+                               db.deployment_create({})["uuid"]})
+
+        self.assertEqual(["task_result_task_uuid"], db.db_upgrade())
+        self.assertEqual([], db.db_upgrade())
+
+        indexes = sa.inspect(engine).get_indexes("task_results")
+        self.assertEqual([["task_uuid"]],
+                         [index["column_names"] for index in indexes])
+        self.assertEqual(task["uuid"], db.task_get(task["uuid"])["uuid"])
+
+    def test_db_upgrade_columns(self):
+        engine = sa_api.get_engine()
+        task = db.task_create({"deployment_uuid":
+                               db.deployment_create({})["uuid"]})
+        # NOTE(rally): task_results table as created by older versions
+        engine.execute("DROP TABLE task_results")
+        engine.execute("CREATE TABLE task_results ("
+                       "created_at DATETIME, updated_at DATETIME, "
+                       "id INTEGER NOT NULL PRIMARY KEY, "
+                       "\"key\" TEXT NOT NULL, data TEXT NOT NULL, "
+                       "task_uuid VARCHAR(36))")
+        engine.execute("INSERT INTO task_results (id, \"key\", data, "
+                       "task_uuid) VALUES (1, '{}', "
+                       "'{\"raw\": [1], \"sla\": []}', '%s')"
+                       % task["uuid"])
+
+        self.assertEqual(["task_results.meta", "task_result_task_uuid"],
+                         db.db_upgrade())
+        self.assertEqual([], db.db_upgrade())
+
+        self.assertEqual([{"sla": []}],
+                         [r["data"] for r in
+                          db.task_result_meta_iter_by_uuid(task["uuid"])])
+        self.assertEqual({"raw": [1], "sla": []},
+                         db.task_result_get(1)["data"])
+
+
 class DeploymentTestCase(test.DBTestCase):
     def test_deployment_create(self):
         deploy = db.deployment_create({"config": {"opt": "val"}})
@@ -136,20 +136,93 @@ class TaskTestCase(test.TestCase):
             {"verification_log": json.dumps({"a": "fake"})}
         )
 
-    @mock.patch("rally.objects.task.db.task_result_get_all_by_uuid",
-                return_value="foo_results")
-    def test_get_results(self, mock_get):
+    @mock.patch("rally.objects.task.db.task_result_chunk_iter")
+    @mock.patch("rally.objects.task.db.task_result_iter_by_uuid")
+    def test_get_results(self, mock_get, mock_chunk_iter):
+        mock_get.return_value = [
+            {"id": 1, "key": "foo_key", "data": {"raw": [1, 2], "sla": []}},
+            {"id": 2, "key": "bar_key", "data": {"raw": [], "sla": []}}]
+        mock_chunk_iter.side_effect = [iter([3, 4]), iter([5])]
         task = objects.Task(task=self.task)
         results = task.get_results()
         mock_get.assert_called_once_with(self.task["uuid"])
-        self.assertEqual(results, "foo_results")
+        self.assertEqual(
+            [{"id": 1, "key": "foo_key",
+              "data": {"raw": [1, 2, 3, 4], "sla": []}},
+             {"id": 2, "key": "bar_key", "data": {"raw": [5], "sla": []}}],
+            results)
+        self.assertEqual([mock.call(1), mock.call(2)],
+                         mock_chunk_iter.mock_calls)
+
+    @mock.patch("rally.objects.task.db.task_result_chunk_iter")
+    @mock.patch("rally.objects.task.db.task_result_iter_by_uuid")
+    def test_iter_results(self, mock_iter, mock_chunk_iter):
+        loaded = []
+
+        def iter_results(uuid):
+            for result in ({"id": 1, "key": "foo", "data": {}},
+                           {"id": 2, "key": "bar", "data": {}}):
+                loaded.append(result["id"])
+                yield result
+
+        mock_iter.side_effect = iter_results
+        mock_chunk_iter.side_effect = lambda result_id: iter([result_id])
+        task = objects.Task(task=self.task)
+
+        results = task.iter_results()
+        self.assertEqual({"id": 1, "key": "foo", "data": {"raw": [1]}},
+                         next(results))
+        self.assertEqual([1], loaded)
+        self.assertEqual([{"id": 2, "key": "bar", "data": {"raw": [2]}}],
+                         list(results))
+        mock_iter.assert_called_once_with(self.task["uuid"])
+
+    @mock.patch("rally.objects.task.db.task_result_chunk_iter")
+    @mock.patch("rally.objects.task.db.task_result_iter_by_uuid")
+    @mock.patch("rally.objects.task.db.task_result_meta_iter_by_uuid")
+    def test_iter_results_without_raw(self, mock_meta_iter, mock_iter,
+                                      mock_chunk_iter):
+        mock_meta_iter.return_value = [{"id": 1, "key": "foo",
+                                        "data": {"summary": {}}}]
+        task = objects.Task(task=self.task)
+        self.assertEqual([{"id": 1, "key": "foo", "data": {"summary": {}}}],
+                         list(task.iter_results(load_raw=False)))
+        mock_meta_iter.assert_called_once_with(self.task["uuid"])
+        self.assertFalse(mock_iter.called)
+        self.assertFalse(mock_chunk_iter.called)
+
+    @mock.patch("rally.objects.task.db.task_result_chunk_iter")
+    @mock.patch("rally.objects.task.db.task_result_get")
+    def test_iter_raw_results(self, mock_get, mock_chunk_iter):
+        mock_chunk_iter.side_effect = lambda result_id: iter([3])
+        self.assertEqual([1, 2, 3], list(objects.Task.iter_raw_results(
+            {"id": 1, "data": {"raw": [1, 2]}})))
+        self.assertFalse(mock_get.called)
+
+        mock_get.return_value = {"data": {"raw": [1]}}
+        self.assertEqual([1, 3], list(objects.Task.iter_raw_results(
+            {"id": 1, "data": {"summary": {}}})))
+        mock_get.assert_called_once_with(1)
 
     @mock.patch("rally.objects.task.db.task_result_create")
     def test_append_results(self, mock_append_results):
         task = objects.Task(task=self.task)
-        task.append_results("opt", "val")
+        result = task.append_results("opt", "val")
         mock_append_results.assert_called_once_with(self.task["uuid"],
                                                     "opt", "val")
+        self.assertEqual(mock_append_results.return_value, result)
+
+    @mock.patch("rally.objects.task.db.task_result_update")
+    def test_update_results(self, mock_update):
+        task = objects.Task(task=self.task)
+        task.update_results(42, "val")
+        mock_update.assert_called_once_with(42, "val")
+
+    @mock.patch("rally.objects.task.db.task_result_chunk_create")
+    def test_append_raw_results(self, mock_chunk_create):
+        task = objects.Task(task=self.task)
+        task.append_raw_results(42, [1, 2])
+        mock_chunk_create.assert_called_once_with(42, [1, 2])
 
     @mock.patch("rally.objects.task.db.task_update")
     def test_set_failed(self, mock_update):
@@ -17,6 +17,7 @@
 from keystoneclient import exceptions as keystone_exceptions
 import mock
 from oslo_config import cfg
+from oslo_config import fixture
 
 from rally import consts
 from rally import exceptions
@@ -43,6 +44,9 @@ class OSClientsTestCase(test.TestCase):
         self.mock_create_keystone_client = keystone_patcher.start()
         self.addCleanup(keystone_patcher.stop)
         self.mock_create_keystone_client.return_value = self.fake_keystone
+        osclients._keystone_client_cache.clear()
+        self.addCleanup(osclients._keystone_client_cache.clear)
+        self.addCleanup(osclients._http_connection_pool._reset)
 
     def tearDown(self):
         super(OSClientsTestCase, self).tearDown()
@@ -73,6 +77,51 @@ class OSClientsTestCase(test.TestCase):
         self.mock_create_keystone_client.assert_called_once_with(kwargs)
         self.assertEqual(self.fake_keystone, self.clients.cache["keystone"])
 
+    def test_keystone_shared_in_process(self):
+        self.fake_keystone.auth_ref = mock.MagicMock()
+        self.fake_keystone.auth_ref.will_expire_soon.return_value = False
+        client = self.clients.keystone()
+        same_endpoint = objects.Endpoint("http://auth_url", "use", "pass",
+                                         "tenant")
+        self.assertEqual(client, osclients.Clients(same_endpoint).keystone())
+        self.assertEqual(1, self.mock_create_keystone_client.call_count)
+        self.fake_keystone.auth_ref.will_expire_soon.assert_called_once_with(
+            cfg.CONF.keystone_token_refresh_margin)
+
+        other_endpoint = objects.Endpoint("http://auth_url", "other", "pass",
+                                          "tenant")
+        osclients.Clients(other_endpoint).keystone()
+        self.assertEqual(2, self.mock_create_keystone_client.call_count)
+
+    def test_keystone_token_expires_soon(self):
+        self.fake_keystone.auth_ref = mock.MagicMock()
+        self.fake_keystone.auth_ref.will_expire_soon.return_value = True
+        self.clients.keystone()
+        osclients.Clients(self.endpoint).keystone()
+        self.assertEqual(2, self.mock_create_keystone_client.call_count)
+
+    def test_keystone_without_cache(self):
+        self.clients.keystone(use_cache=False)
+        osclients.Clients(self.endpoint).keystone(use_cache=False)
+        self.assertEqual(2, self.mock_create_keystone_client.call_count)
+
+    def test_keystone_cache_disabled(self):
+        self.useFixture(fixture.Config()).config(keystone_client_cache=False)
+        self.clients.keystone()
+        osclients.Clients(self.endpoint).keystone()
+        self.assertEqual(2, self.mock_create_keystone_client.call_count)
+
+    @mock.patch("rally.osclients.os.getpid")
+    def test_keystone_cache_dropped_after_fork(self, mock_getpid):
+        self.fake_keystone.auth_ref = mock.MagicMock()
+        self.fake_keystone.auth_ref.will_expire_soon.return_value = False
+        mock_getpid.return_value = 1
+        osclients._keystone_client_cache.clear()
+        self.clients.keystone()
+        mock_getpid.return_value = 2
+        osclients.Clients(self.endpoint).keystone()
+        self.assertEqual(2, self.mock_create_keystone_client.call_count)
+
     @mock.patch("rally.osclients.Clients.keystone")
     def test_verified_keystone_user_not_admin(self, mock_keystone):
         mock_keystone.return_value = fakes.FakeKeystoneClient()
@@ -97,6 +146,7 @@ class OSClientsTestCase(test.TestCase):
     def test_nova(self):
         with mock.patch("rally.osclients.nova") as mock_nova:
             fake_nova = fakes.FakeNovaClient()
+            fake_nova.client = mock.MagicMock()
             mock_nova.Client = mock.MagicMock(return_value=fake_nova)
             self.assertNotIn("nova", self.clients.cache)
             client = self.clients.nova()
@@ -110,7 +160,9 @@ class OSClientsTestCase(test.TestCase):
                 auth_token=self.fake_keystone.auth_token,
                 http_log_debug=False,
                 timeout=cfg.CONF.openstack_client_http_timeout,
-                insecure=False, cacert=None)
+                insecure=False, cacert=None, connection_pool=True)
+            self.assertEqual(osclients._http_connection_pool,
+                             client.client._connection_pool)
             client.set_management_url.assert_called_once_with(
                 self.service_catalog.url_for.return_value)
             self.assertEqual(fake_nova, self.clients.cache["nova"])
@@ -138,6 +190,8 @@ class OSClientsTestCase(test.TestCase):
     def test_glance(self):
         with mock.patch("rally.osclients.glance") as mock_glance:
             fake_glance = fakes.FakeGlanceClient()
+            fake_glance.http_client = mock.MagicMock(
+                endpoint="http://image:9292/")
             mock_glance.Client = mock.MagicMock(return_value=fake_glance)
             self.assertNotIn("glance", self.clients.cache)
             client = self.clients.glance()
@@ -151,6 +205,9 @@ class OSClientsTestCase(test.TestCase):
                 endpoint_type=consts.EndpointType.PUBLIC,
                 region_name=self.endpoint.region_name)
             mock_glance.Client.assert_called_once_with("1", **kw)
+            fake_glance.http_client.session.mount.assert_called_once_with(
+                "http://image:9292",
+                osclients._http_connection_pool.get("http://image:9292"))
             self.assertEqual(fake_glance, self.clients.cache["glance"])
 
     def test_cinder(self):
@@ -351,3 +408,44 @@ class OSClientsTestCase(test.TestCase):
                   "token": self.fake_keystone.auth_token}
             mock_murano.client.Client.assert_called_once_with("1", **kw)
             self.assertEqual(fake_murano, self.clients.cache["murano"])
+
+
+class HTTPConnectionPoolTestCase(test.TestCase):
+
+    def setUp(self):
+        super(HTTPConnectionPoolTestCase, self).setUp()
+        self.pool = osclients._HTTPConnectionPool()
+
+    def test_get(self):
+        adapter = self.pool.get("http://nova:8774/v2/tenant")
+        self.assertEqual(adapter, self.pool.get("http://nova:8774/v2"))
+        self.assertNotEqual(adapter, self.pool.get("http://nova:8775/v2"))
+        self.assertEqual(cfg.CONF.openstack_client_http_pool_size,
+                         adapter._pool_maxsize)
+
+    @mock.patch("rally.osclients.os.getpid")
+    def test_get_after_fork(self, mock_getpid):
+        mock_getpid.return_value = 1
+        self.pool._reset()
+        adapter = self.pool.get("http://nova:8774")
+        mock_getpid.return_value = 2
+        self.assertNotEqual(adapter, self.pool.get("http://nova:8774"))
+
+    def test_mount(self):
+        session = mock.MagicMock()
+        self.pool.mount(session, "https://glance:9292/v1")
+        session.mount.assert_called_once_with(
+            "https://glance:9292", self.pool.get("https://glance:9292"))
+
+    def test_mount_custom_scheme(self):
+        session = mock.MagicMock()
+        self.pool.mount(session, "glance+https://glance:9292")
+        self.assertFalse(session.mount.called)
+
+    def test_stats(self):
+        self.assertEqual(osclients.ConnectionStats(0, 0), self.pool.stats())
+        self.pool.get("http://nova:8774").poolmanager.pools["nova"] = (
+            mock.MagicMock(num_connections=2, num_requests=5))
+        self.pool.get("http://glance:9292").poolmanager.pools["glance"] = (
+            mock.MagicMock(num_connections=1, num_requests=1))
+        self.assertEqual(osclients.ConnectionStats(3, 3), self.pool.stats())